@@ -8,36 +8,28 @@ from htmltemplate.template import Template
 # <link  href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/css/bootstrap.min.css" rel="stylesheet">
 # <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/js/bootstrap.bundle.min.js"></script>
 beg_tagStylesheet = b'''<link  href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/css/bootstrap.min.css" rel="stylesheet"><script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/js/bootstrap.bundle.min.js"></script>'''
+def get_beginStylesheet(self):
+	return beg_tagStylesheet
+def get_endStylesheet(self):
+	return b''
 def Stylesheet(*args, **params):
 	self = Template(*(("Stylesheet",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagStylesheet
-		return beg_tagStylesheet
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginStylesheet
+	self.get_end       = get_endStylesheet
 	self.end_init(**params)
 	return self
 
 # <link href="/bootstrap.min.css" rel="stylesheet"/>
 # <script src="/bootstrap.bundle.min.js"></script>
 beg_tagStylesheetDefault = b'''<link href="/bootstrap.min.css" rel="stylesheet"/><script src="/bootstrap.bundle.min.js"></script>'''
+def get_beginStylesheetDefault(self):
+	return beg_tagStylesheetDefault
+def get_endStylesheetDefault(self):
+	return b''
 def StylesheetDefault(*args, **params):
 	self = Template(*(("StylesheetDefault",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagStylesheetDefault
-		return beg_tagStylesheetDefault
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginStylesheetDefault
+	self.get_end       = get_endStylesheetDefault
 	self.end_init(**params)
 	return self
 
@@ -46,19 +38,14 @@ def StylesheetDefault(*args, **params):
 # </div>
 beg_tagDiv = b'''<div class="%s" style="%s" id="%s">'''
 end_tagDiv = b'''</div>'''
+def get_beginDiv(self):
+	return beg_tagDiv%(self.class_,self.style,self.id)
+def get_endDiv(self):
+	return end_tagDiv
 def Div(*args, **params):
 	self = Template(*(("Div",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagDiv
-		return beg_tagDiv%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagDiv
-		return end_tagDiv
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginDiv
+	self.get_end       = get_endDiv
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -68,18 +55,14 @@ def Div(*args, **params):
 
 # <h1 class="%(class_)s" style="%(style)s" id="%(id)s">%(text)s</h1>
 beg_tagTitle1 = b'''<h1 class="%s" style="%s" id="%s">%s</h1>'''
+def get_beginTitle1(self):
+	return beg_tagTitle1%(self.class_,self.style,self.id,self.text)
+def get_endTitle1(self):
+	return b''
 def Title1(*args, **params):
 	self = Template(*(("Title1",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTitle1
-		return beg_tagTitle1%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTitle1
+	self.get_end       = get_endTitle1
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -89,18 +72,14 @@ def Title1(*args, **params):
 
 # <h2 class="%(class_)s" style="%(style)s" id="%(id)s">%(text)s</h2>
 beg_tagTitle2 = b'''<h2 class="%s" style="%s" id="%s">%s</h2>'''
+def get_beginTitle2(self):
+	return beg_tagTitle2%(self.class_,self.style,self.id,self.text)
+def get_endTitle2(self):
+	return b''
 def Title2(*args, **params):
 	self = Template(*(("Title2",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTitle2
-		return beg_tagTitle2%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTitle2
+	self.get_end       = get_endTitle2
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -110,18 +89,14 @@ def Title2(*args, **params):
 
 # <h3 class="%(class_)s" style="%(style)s" id="%(id)s">%(text)s</h3>
 beg_tagTitle3 = b'''<h3 class="%s" style="%s" id="%s">%s</h3>'''
+def get_beginTitle3(self):
+	return beg_tagTitle3%(self.class_,self.style,self.id,self.text)
+def get_endTitle3(self):
+	return b''
 def Title3(*args, **params):
 	self = Template(*(("Title3",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTitle3
-		return beg_tagTitle3%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTitle3
+	self.get_end       = get_endTitle3
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -131,18 +106,14 @@ def Title3(*args, **params):
 
 # <h4 class="%(class_)s" style="%(style)s" id="%(id)s">%(text)s</h4>
 beg_tagTitle4 = b'''<h4 class="%s" style="%s" id="%s">%s</h4>'''
+def get_beginTitle4(self):
+	return beg_tagTitle4%(self.class_,self.style,self.id,self.text)
+def get_endTitle4(self):
+	return b''
 def Title4(*args, **params):
 	self = Template(*(("Title4",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTitle4
-		return beg_tagTitle4%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTitle4
+	self.get_end       = get_endTitle4
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -152,18 +123,14 @@ def Title4(*args, **params):
 
 # <label class="%(class_)s" style="%(style)s" id="%(id)s">%(text)s</label>
 beg_tagLabel = b'''<label class="%s" style="%s" id="%s">%s</label>'''
+def get_beginLabel(self):
+	return beg_tagLabel%(self.class_,self.style,self.id,self.text)
+def get_endLabel(self):
+	return b''
 def Label(*args, **params):
 	self = Template(*(("Label",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagLabel
-		return beg_tagLabel%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginLabel
+	self.get_end       = get_endLabel
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -173,18 +140,14 @@ def Label(*args, **params):
 
 # <input class="%(class_)s" style="%(style)s" id="%(id)s" pattern="%(pattern)s" placeholder="%(placeholder)s" type="%(type)s" value="%(value)s" name="%(name)s" %(disabled)s %(event)s min="%(min)s" max="%(max)s" %(required)s/>
 beg_tagInput = b'''<input class="%s" style="%s" id="%s" pattern="%s" placeholder="%s" type="%s" value="%s" name="%s" %s %s min="%s" max="%s" %s/>'''
+def get_beginInput(self):
+	return beg_tagInput%(self.class_,self.style,self.id,self.pattern,self.placeholder,self.type,self.value,self.name, b'disabled' if self.disabled else b'',self.event,self.min,self.max, b'required' if self.required else b'')
+def get_endInput(self):
+	return b''
 def Input(*args, **params):
 	self = Template(*(("Input",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagInput
-		return beg_tagInput%(self.class_,self.style,self.id,self.pattern,self.placeholder,self.type,self.value,self.name, b'disabled' if self.disabled else b'',self.event,self.min,self.max, b'required' if self.required else b'')
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginInput
+	self.get_end       = get_endInput
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.event        = params.get("event", b"")
@@ -216,18 +179,14 @@ def Input(*args, **params):
 # </script>
 # </div>
 beg_tagSlider = b'''<div class="form-group %s"><label for="customRange">%s</label><div style="display: flex;"><input type="range" class="form-range %s" style="%s" id="slider_%s" name="%s" min="%s" max="%s" step="%s" value="%s" %s oninput="onchange_%s()" /><span id="value_%s"/></div><script type="text/javascript">function onchange_%s(){document.getElementById("value_%s").innerHTML = "&nbsp;" + document.getElementById("slider_%s").value;}onchange_%s();</script></div>'''
+def get_beginSlider(self):
+	return beg_tagSlider%(self.spacer,self.text,self.class_,self.style,self.id,self.name,self.min,self.max,self.step,self.value, b'disabled' if self.disabled else b'',self.id,self.id,self.id,self.id,self.id,self.id)
+def get_endSlider(self):
+	return b''
 def Slider(*args, **params):
 	self = Template(*(("Slider",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSlider
-		return beg_tagSlider%(self.spacer,self.text,self.class_,self.style,self.id,self.name,self.min,self.max,self.step,self.value, b'disabled' if self.disabled else b'',self.id,self.id,self.id,self.id,self.id,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSlider
+	self.get_end       = get_endSlider
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.id           = params.get("id", b"%d"%id(self))
@@ -244,18 +203,14 @@ def Slider(*args, **params):
 
 # <option %(selected)s name="%(name)s" value="%(value)s" %(disabled)s>%(text)s</option>
 beg_tagOption = b'''<option %s name="%s" value="%s" %s>%s</option>'''
+def get_beginOption(self):
+	return beg_tagOption%( b'selected' if self.selected else b'',self.name,self.value, b'disabled' if self.disabled else b'',self.text)
+def get_endOption(self):
+	return b''
 def Option(*args, **params):
 	self = Template(*(("Option",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagOption
-		return beg_tagOption%( b'selected' if self.selected else b'',self.name,self.value, b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginOption
+	self.get_end       = get_endOption
 	self.disabled     = params.get("disabled", False)
 	self.name         = params.get("name", b"%d"%id(self))
 	self.selected     = params.get("selected", b"")
@@ -271,19 +226,14 @@ def Option(*args, **params):
 # </div>
 beg_tagSelect = b'''<div class="form-group %s" ><select class="form-select %s" style="%s" id="%s" name="%s" %s %s>'''
 end_tagSelect = b'''</select></div>'''
+def get_beginSelect(self):
+	return beg_tagSelect%(self.spacer,self.class_,self.style,self.id,self.name, b'disabled' if self.disabled else b'',self.event)
+def get_endSelect(self):
+	return end_tagSelect
 def Select(*args, **params):
 	self = Template(*(("Select",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSelect
-		return beg_tagSelect%(self.spacer,self.class_,self.style,self.id,self.name, b'disabled' if self.disabled else b'',self.event)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagSelect
-		return end_tagSelect
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSelect
+	self.get_end       = get_endSelect
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.disabled     = params.get("disabled", False)
@@ -300,19 +250,14 @@ def Select(*args, **params):
 # </div>
 beg_tagFormGroup = b'''<div class="form-group %s">'''
 end_tagFormGroup = b'''</div>'''
+def get_beginFormGroup(self):
+	return beg_tagFormGroup%(self.spacer)
+def get_endFormGroup(self):
+	return end_tagFormGroup
 def FormGroup(*args, **params):
 	self = Template(*(("FormGroup",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagFormGroup
-		return beg_tagFormGroup%(self.spacer)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagFormGroup
-		return end_tagFormGroup
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginFormGroup
+	self.get_end       = get_endFormGroup
 	self.content      = params.get("content", b"")
 	self.spacer       = params.get("spacer", b"")
 	self.end_init(**params)
@@ -323,18 +268,14 @@ def FormGroup(*args, **params):
 # <input type="%(type)s" class="form-control form-label %(class_)s" style="%(style)s" id="%(id)s" pattern="%(pattern)s" placeholder="%(placeholder)s" type="%(type)s" value="%(value)s" name="%(name)s" min="%(min)s" max="%(max)s" step="%(step)s" %(disabled)s %(required)s %(event)s/>
 # </div>
 beg_tagEdit = b'''<div class="form-group %s"><label class="form-check-label">%s</label><input type="%s" class="form-control form-label %s" style="%s" id="%s" pattern="%s" placeholder="%s" type="%s" value="%s" name="%s" min="%s" max="%s" step="%s" %s %s %s/></div>'''
+def get_beginEdit(self):
+	return beg_tagEdit%(self.spacer,self.text,self.type,self.class_,self.style,self.id,self.pattern,self.placeholder,self.type,self.value,self.name,self.min,self.max,self.step, b'disabled' if self.disabled else b'', b'required' if self.required else b'',self.event)
+def get_endEdit(self):
+	return b''
 def Edit(*args, **params):
 	self = Template(*(("Edit",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagEdit
-		return beg_tagEdit%(self.spacer,self.text,self.type,self.class_,self.style,self.id,self.pattern,self.placeholder,self.type,self.value,self.name,self.min,self.max,self.step, b'disabled' if self.disabled else b'', b'required' if self.required else b'',self.event)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginEdit
+	self.get_end       = get_endEdit
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.event        = params.get("event", b"")
@@ -360,18 +301,14 @@ def Edit(*args, **params):
 # <label class="form-check-label" for="%(id)s">%(text)s</label>
 # </div>
 beg_tagSwitch = b'''<div class="form-check form-switch %s"><input type="hidden" value="0" name="%s" /><input type="checkbox" class="form-check-input %s" style="%s" id="%s" value="%s" name="%s" %s %s %s/><label class="form-check-label" for="%s">%s</label></div>'''
+def get_beginSwitch(self):
+	return beg_tagSwitch%(self.spacer,self.name,self.class_,self.style,self.id,self.value,self.name, b'checked' if self.checked else b'', b'disabled' if self.disabled else b'',self.event,self.id,self.text)
+def get_endSwitch(self):
+	return b''
 def Switch(*args, **params):
 	self = Template(*(("Switch",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSwitch
-		return beg_tagSwitch%(self.spacer,self.name,self.class_,self.style,self.id,self.value,self.name, b'checked' if self.checked else b'', b'disabled' if self.disabled else b'',self.event,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSwitch
+	self.get_end       = get_endSwitch
 	self.checked      = params.get("checked", True)
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
@@ -391,18 +328,14 @@ def Switch(*args, **params):
 # </label>
 # </div>
 beg_tagRadio = b'''<div class="form-check %s"><label class="form-check-label"><input type="radio" class="form-check-input %s" style="%s" id="%s" name="%s" %s %s %s>%s</input></label></div>'''
+def get_beginRadio(self):
+	return beg_tagRadio%(self.spacer,self.class_,self.style,self.id,self.name, b'checked' if self.checked else b'', b'disabled' if self.disabled else b'',self.event,self.text)
+def get_endRadio(self):
+	return b''
 def Radio(*args, **params):
 	self = Template(*(("Radio",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagRadio
-		return beg_tagRadio%(self.spacer,self.class_,self.style,self.id,self.name, b'checked' if self.checked else b'', b'disabled' if self.disabled else b'',self.event,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginRadio
+	self.get_end       = get_endRadio
 	self.checked      = params.get("checked", True)
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
@@ -425,19 +358,14 @@ def Radio(*args, **params):
 # </div>
 beg_tagComboBox = b'''<div class="form-group %s"><label >%s</label><input list="%s" class="form-control %s" style="%s" pattern="%s" placeholder="%s" value="%s" name="%s" %s><datalist id="%s">'''
 end_tagComboBox = b'''</datalist></input></div>'''
+def get_beginComboBox(self):
+	return beg_tagComboBox%(self.spacer,self.text,self.id,self.class_,self.style,self.pattern,self.placeholder,self.value,self.name, b'disabled' if self.disabled else b'',self.id)
+def get_endComboBox(self):
+	return end_tagComboBox
 def ComboBox(*args, **params):
 	self = Template(*(("ComboBox",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagComboBox
-		return beg_tagComboBox%(self.spacer,self.text,self.id,self.class_,self.style,self.pattern,self.placeholder,self.value,self.name, b'disabled' if self.disabled else b'',self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagComboBox
-		return end_tagComboBox
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginComboBox
+	self.get_end       = get_endComboBox
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.disabled     = params.get("disabled", False)
@@ -454,18 +382,14 @@ def ComboBox(*args, **params):
 
 # <button class="btn btn-outline-primary %(class_)s" style="%(style)s" id="%(id)s" type="%(type)s" name="%(name)s" value="%(value)s" %(disabled)s>%(text)s</button>
 beg_tagButton = b'''<button class="btn btn-outline-primary %s" style="%s" id="%s" type="%s" name="%s" value="%s" %s>%s</button>'''
+def get_beginButton(self):
+	return beg_tagButton%(self.class_,self.style,self.id,self.type,self.name,self.value, b'disabled' if self.disabled else b'',self.text)
+def get_endButton(self):
+	return b''
 def Button(*args, **params):
 	self = Template(*(("Button",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagButton
-		return beg_tagButton%(self.class_,self.style,self.id,self.type,self.name,self.value, b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginButton
+	self.get_end       = get_endButton
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.id           = params.get("id", b"%d"%id(self))
@@ -494,18 +418,14 @@ def Button(*args, **params):
 # }
 # </script>
 beg_tagUploadFile = b'''<input type="file" style="display:none" id="%s" onchange="UploadFile_%s()" name="%s" accept="%s" %s /><input type="button" id="label_%s" value="%s" onclick="document.getElementById('%s').click()" class="btn btn-outline-primary %s" style="%s" %s /><script>function UploadFile_%s(){let data = document.getElementById('%s').files[0];let entry = document.getElementById('%s').files[0];fetch('%s/' + encodeURIComponent(entry.name), {method:'PUT',body:data});if ("%s" != ""){alert('%s');}document.getElementById('%s').value = "";location.reload();}</script>'''
+def get_beginUploadFile(self):
+	return beg_tagUploadFile%(self.id,self.id,self.name,self.accept, b'disabled' if self.disabled else b'',self.id,self.text,self.id,self.class_,self.style, b'disabled' if self.disabled else b'',self.id,self.id,self.id,self.path,self.alert,self.alert,self.id)
+def get_endUploadFile(self):
+	return b''
 def UploadFile(*args, **params):
 	self = Template(*(("UploadFile",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagUploadFile
-		return beg_tagUploadFile%(self.id,self.id,self.name,self.accept, b'disabled' if self.disabled else b'',self.id,self.text,self.id,self.class_,self.style, b'disabled' if self.disabled else b'',self.id,self.id,self.id,self.path,self.alert,self.alert,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginUploadFile
+	self.get_end       = get_endUploadFile
 	self.accept       = params.get("accept", b"")
 	self.alert        = params.get("alert", b"")
 	self.class_       = params.get("class_", b"")
@@ -520,18 +440,14 @@ def UploadFile(*args, **params):
 
 # <a href="%(path)s" download="%(filename)s" class="btn btn-outline-primary %(class_)s" style="%(style)s" name="%(name)s" %(disabled)s>%(text)s</a>
 beg_tagDownloadFile = b'''<a href="%s" download="%s" class="btn btn-outline-primary %s" style="%s" name="%s" %s>%s</a>'''
+def get_beginDownloadFile(self):
+	return beg_tagDownloadFile%(self.path,self.filename,self.class_,self.style,self.name, b'disabled' if self.disabled else b'',self.text)
+def get_endDownloadFile(self):
+	return b''
 def DownloadFile(*args, **params):
 	self = Template(*(("DownloadFile",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagDownloadFile
-		return beg_tagDownloadFile%(self.path,self.filename,self.class_,self.style,self.name, b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginDownloadFile
+	self.get_end       = get_endDownloadFile
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.filename     = params.get("filename", b"")
@@ -544,18 +460,14 @@ def DownloadFile(*args, **params):
 
 # <a href="%(path)s" download="%(filename)s" class="%(class_)s" style="%(style)s" name="%(name)s" %(disabled)s>%(text)s</a>
 beg_tagDownload = b'''<a href="%s" download="%s" class="%s" style="%s" name="%s" %s>%s</a>'''
+def get_beginDownload(self):
+	return beg_tagDownload%(self.path,self.filename,self.class_,self.style,self.name, b'disabled' if self.disabled else b'',self.text)
+def get_endDownload(self):
+	return b''
 def Download(*args, **params):
 	self = Template(*(("Download",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagDownload
-		return beg_tagDownload%(self.path,self.filename,self.class_,self.style,self.name, b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginDownload
+	self.get_end       = get_endDownload
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.filename     = params.get("filename", b"")
@@ -571,19 +483,14 @@ def Download(*args, **params):
 # </form>
 beg_tagForm = b'''<form class="container %s %s" style="%s" id="%s" method="%s" action="%s" %s>'''
 end_tagForm = b'''</form>'''
+def get_beginForm(self):
+	return beg_tagForm%(self.spacer,self.class_,self.style,self.id,self.method,self.action, b'novalidate' if self.novalidate else b'')
+def get_endForm(self):
+	return end_tagForm
 def Form(*args, **params):
 	self = Template(*(("Form",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagForm
-		return beg_tagForm%(self.spacer,self.class_,self.style,self.id,self.method,self.action, b'novalidate' if self.novalidate else b'')
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagForm
-		return end_tagForm
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginForm
+	self.get_end       = get_endForm
 	self.action       = params.get("action", b"")
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
@@ -597,18 +504,14 @@ def Form(*args, **params):
 
 # <br/>
 beg_tagBr = b'''<br/>'''
+def get_beginBr(self):
+	return beg_tagBr
+def get_endBr(self):
+	return b''
 def Br(*args, **params):
 	self = Template(*(("Br",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagBr
-		return beg_tagBr
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginBr
+	self.get_end       = get_endBr
 	self.end_init(**params)
 	return self
 
@@ -617,19 +520,14 @@ def Br(*args, **params):
 # </div>
 beg_tagContainer = b'''<div class="container %s" style="%s" id="%s">'''
 end_tagContainer = b'''</div>'''
+def get_beginContainer(self):
+	return beg_tagContainer%(self.class_,self.style,self.id)
+def get_endContainer(self):
+	return end_tagContainer
 def Container(*args, **params):
 	self = Template(*(("Container",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagContainer
-		return beg_tagContainer%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagContainer
-		return end_tagContainer
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginContainer
+	self.get_end       = get_endContainer
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -640,19 +538,14 @@ def Container(*args, **params):
 # <div class="card-header %(class_)s" style="%(style)s" id="%(id)s">%(text)s %(content)s</div>
 beg_tagCardHeader = b'''<div class="card-header %s" style="%s" id="%s">%s '''
 end_tagCardHeader = b'''</div>'''
+def get_beginCardHeader(self):
+	return beg_tagCardHeader%(self.class_,self.style,self.id,self.text)
+def get_endCardHeader(self):
+	return end_tagCardHeader
 def CardHeader(*args, **params):
 	self = Template(*(("CardHeader",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagCardHeader
-		return beg_tagCardHeader%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagCardHeader
-		return end_tagCardHeader
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginCardHeader
+	self.get_end       = get_endCardHeader
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -664,19 +557,14 @@ def CardHeader(*args, **params):
 # <div class="card-body %(class_)s" style="%(style)s" id="%(id)s">%(content)s</div>
 beg_tagCardBody = b'''<div class="card-body %s" style="%s" id="%s">'''
 end_tagCardBody = b'''</div>'''
+def get_beginCardBody(self):
+	return beg_tagCardBody%(self.class_,self.style,self.id)
+def get_endCardBody(self):
+	return end_tagCardBody
 def CardBody(*args, **params):
 	self = Template(*(("CardBody",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagCardBody
-		return beg_tagCardBody%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagCardBody
-		return end_tagCardBody
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginCardBody
+	self.get_end       = get_endCardBody
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -689,19 +577,14 @@ def CardBody(*args, **params):
 # </div>
 beg_tagCard = b'''<div class="card %s" style="%s" id="%s">'''
 end_tagCard = b'''</div>'''
+def get_beginCard(self):
+	return beg_tagCard%(self.spacer,self.style,self.id)
+def get_endCard(self):
+	return end_tagCard
 def Card(*args, **params):
 	self = Template(*(("Card",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagCard
-		return beg_tagCard%(self.spacer,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagCard
-		return end_tagCard
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginCard
+	self.get_end       = get_endCard
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.spacer       = params.get("spacer", b"")
@@ -712,19 +595,14 @@ def Card(*args, **params):
 # <p class="%(class_)s" style="%(style)s" id="%(id)s">%(content)s%(text)s</p>
 beg_tagParagraph = b'''<p class="%s" style="%s" id="%s">'''
 end_tagParagraph = b'''%s</p>'''
+def get_beginParagraph(self):
+	return beg_tagParagraph%(self.class_,self.style,self.id)
+def get_endParagraph(self):
+	return end_tagParagraph%(self.text)
 def Paragraph(*args, **params):
 	self = Template(*(("Paragraph",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagParagraph
-		return beg_tagParagraph%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagParagraph
-		return end_tagParagraph%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginParagraph
+	self.get_end       = get_endParagraph
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -736,19 +614,14 @@ def Paragraph(*args, **params):
 # <li class="list-group-item %(class_)s" style="%(style)s" id="%(id)s">%(content)s%(text)s</li>
 beg_tagListItem = b'''<li class="list-group-item %s" style="%s" id="%s">'''
 end_tagListItem = b'''%s</li>'''
+def get_beginListItem(self):
+	return beg_tagListItem%(self.class_,self.style,self.id)
+def get_endListItem(self):
+	return end_tagListItem%(self.text)
 def ListItem(*args, **params):
 	self = Template(*(("ListItem",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagListItem
-		return beg_tagListItem%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagListItem
-		return end_tagListItem%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginListItem
+	self.get_end       = get_endListItem
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -760,19 +633,14 @@ def ListItem(*args, **params):
 # <button class="btn %(class_)s" style="%(style)s" id="%(id)s">%(content)s%(text)s</button><br>
 beg_tagButtonItem = b'''<button class="btn %s" style="%s" id="%s">'''
 end_tagButtonItem = b'''%s</button><br>'''
+def get_beginButtonItem(self):
+	return beg_tagButtonItem%(self.class_,self.style,self.id)
+def get_endButtonItem(self):
+	return end_tagButtonItem%(self.text)
 def ButtonItem(*args, **params):
 	self = Template(*(("ButtonItem",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagButtonItem
-		return beg_tagButtonItem%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagButtonItem
-		return end_tagButtonItem%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginButtonItem
+	self.get_end       = get_endButtonItem
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -786,19 +654,14 @@ def ButtonItem(*args, **params):
 # </ul>
 beg_tagList = b'''<ul class="list-group %s" style="%s" id="%s">'''
 end_tagList = b'''</ul>'''
+def get_beginList(self):
+	return beg_tagList%(self.class_,self.style,self.id)
+def get_endList(self):
+	return end_tagList
 def List(*args, **params):
 	self = Template(*(("List",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagList
-		return beg_tagList%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagList
-		return end_tagList
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginList
+	self.get_end       = get_endList
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -809,19 +672,14 @@ def List(*args, **params):
 # <button class="btn btn-outline-primary %(class_)s" style="%(style)s" id="%(id)s" type="submit" name="%(name)s" value="%(value)s" onclick="%(onclick)s">%(content)s%(text)s</button>
 beg_tagSubmit = b'''<button class="btn btn-outline-primary %s" style="%s" id="%s" type="submit" name="%s" value="%s" onclick="%s">'''
 end_tagSubmit = b'''%s</button>'''
+def get_beginSubmit(self):
+	return beg_tagSubmit%(self.class_,self.style,self.id,self.name,self.value,self.onclick)
+def get_endSubmit(self):
+	return end_tagSubmit%(self.text)
 def Submit(*args, **params):
 	self = Template(*(("Submit",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSubmit
-		return beg_tagSubmit%(self.class_,self.style,self.id,self.name,self.value,self.onclick)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagSubmit
-		return end_tagSubmit%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSubmit
+	self.get_end       = get_endSubmit
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -836,19 +694,14 @@ def Submit(*args, **params):
 # <a class="btn btn-outline-primary %(class_)s" style="%(style)s" id="%(id)s" href="%(href)s">%(content)s%(text)s</a>
 beg_tagCancel = b'''<a class="btn btn-outline-primary %s" style="%s" id="%s" href="%s">'''
 end_tagCancel = b'''%s</a>'''
+def get_beginCancel(self):
+	return beg_tagCancel%(self.class_,self.style,self.id,self.href)
+def get_endCancel(self):
+	return end_tagCancel%(self.text)
 def Cancel(*args, **params):
 	self = Template(*(("Cancel",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagCancel
-		return beg_tagCancel%(self.class_,self.style,self.id,self.href)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagCancel
-		return end_tagCancel%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginCancel
+	self.get_end       = get_endCancel
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.href         = params.get("href", b"")
@@ -861,19 +714,14 @@ def Cancel(*args, **params):
 # <a class="%(class_)s" style="%(style)s" id="%(id)s" href="%(href)s" onclick="%(onclick)s">%(content)s%(text)s</a>
 beg_tagLink = b'''<a class="%s" style="%s" id="%s" href="%s" onclick="%s">'''
 end_tagLink = b'''%s</a>'''
+def get_beginLink(self):
+	return beg_tagLink%(self.class_,self.style,self.id,self.href,self.onclick)
+def get_endLink(self):
+	return end_tagLink%(self.text)
 def Link(*args, **params):
 	self = Template(*(("Link",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagLink
-		return beg_tagLink%(self.class_,self.style,self.id,self.href,self.onclick)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagLink
-		return end_tagLink%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginLink
+	self.get_end       = get_endLink
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.href         = params.get("href", b"")
@@ -888,18 +736,14 @@ def Link(*args, **params):
 # <a class="dropdown-item %(active)s %(class_)s" style="%(style)s" id="%(id)s" href="%(href)s" %(disabled)s>%(text)s</a>
 # </li>
 beg_tagMenuItem = b'''<li><a class="dropdown-item %s %s" style="%s" id="%s" href="%s" %s>%s</a></li>'''
+def get_beginMenuItem(self):
+	return beg_tagMenuItem%( b'active' if self.active else b'',self.class_,self.style,self.id,self.href, b'disabled' if self.disabled else b'',self.text)
+def get_endMenuItem(self):
+	return b''
 def MenuItem(*args, **params):
 	self = Template(*(("MenuItem",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagMenuItem
-		return beg_tagMenuItem%( b'active' if self.active else b'',self.class_,self.style,self.id,self.href, b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginMenuItem
+	self.get_end       = get_endMenuItem
 	self.active       = params.get("active", False)
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
@@ -918,19 +762,14 @@ def MenuItem(*args, **params):
 # </li>
 beg_tagMenu = b'''<li class="nav-item dropdown"><a class="nav-link dropdown-toggle" href="#" id="dropdown10" data-bs-toggle="dropdown" aria-expanded=" false" %s>%s</a><ul class="dropdown-menu " aria-labelledby="dropdown10">'''
 end_tagMenu = b'''</ul></li>'''
+def get_beginMenu(self):
+	return beg_tagMenu%( b'disabled' if self.disabled else b'',self.text)
+def get_endMenu(self):
+	return end_tagMenu
 def Menu(*args, **params):
 	self = Template(*(("Menu",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagMenu
-		return beg_tagMenu%( b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagMenu
-		return end_tagMenu
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginMenu
+	self.get_end       = get_endMenu
 	self.content      = params.get("content", b"")
 	self.disabled     = params.get("disabled", False)
 	self.text         = params.get("text", b"")
@@ -951,19 +790,14 @@ def Menu(*args, **params):
 # </nav>
 beg_tagMenuBar = b'''<nav class="navbar navbar-expand-lg fixed-top navbar-light bg-light " style="%s"><div class="container-fluid"><button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#navbarCollapse" aria-controls="navbarCollapse" aria-expanded="false" aria-label="Toggle navigation"><span class="navbar-toggler-icon"></span></button><div class="collapse navbar-collapse" id="navbarCollapse"><ul class="navbar-nav me-auto mb-2 mb-md-0">'''
 end_tagMenuBar = b'''</ul></div></div></nav>'''
+def get_beginMenuBar(self):
+	return beg_tagMenuBar%(self.style)
+def get_endMenuBar(self):
+	return end_tagMenuBar
 def MenuBar(*args, **params):
 	self = Template(*(("MenuBar",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagMenuBar
-		return beg_tagMenuBar%(self.style)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagMenuBar
-		return end_tagMenuBar
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginMenuBar
+	self.get_end       = get_endMenuBar
 	self.content      = params.get("content", b"")
 	self.style        = params.get("style", b"")
 	self.end_init(**params)
@@ -971,18 +805,14 @@ def MenuBar(*args, **params):
 
 # <img src="%(src)s" class="%(class_)s" style="%(style)s" id="%(id)s" alt="%(alt)s">
 beg_tagImage = b'''<img src="%s" class="%s" style="%s" id="%s" alt="%s">'''
+def get_beginImage(self):
+	return beg_tagImage%(self.src,self.class_,self.style,self.id,self.alt)
+def get_endImage(self):
+	return b''
 def Image(*args, **params):
 	self = Template(*(("Image",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagImage
-		return beg_tagImage%(self.src,self.class_,self.style,self.id,self.alt)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginImage
+	self.get_end       = get_endImage
 	self.alt          = params.get("alt", b"")
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -997,19 +827,14 @@ def Image(*args, **params):
 # </div>
 beg_tagAlertSuccess = b'''<div class="alert alert-success alert-dismissible fade show"><button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>'''
 end_tagAlertSuccess = b'''%s</div>'''
+def get_beginAlertSuccess(self):
+	return beg_tagAlertSuccess
+def get_endAlertSuccess(self):
+	return end_tagAlertSuccess%(self.text)
 def AlertSuccess(*args, **params):
 	self = Template(*(("AlertSuccess",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagAlertSuccess
-		return beg_tagAlertSuccess
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagAlertSuccess
-		return end_tagAlertSuccess%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginAlertSuccess
+	self.get_end       = get_endAlertSuccess
 	self.content      = params.get("content", b"")
 	self.text         = params.get("text", b"")
 	self.end_init(**params)
@@ -1021,19 +846,14 @@ def AlertSuccess(*args, **params):
 # </div>
 beg_tagAlertWarning = b'''<div class="alert alert-warning alert-dismissible fade show"><button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>'''
 end_tagAlertWarning = b'''%s</div>'''
+def get_beginAlertWarning(self):
+	return beg_tagAlertWarning
+def get_endAlertWarning(self):
+	return end_tagAlertWarning%(self.text)
 def AlertWarning(*args, **params):
 	self = Template(*(("AlertWarning",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagAlertWarning
-		return beg_tagAlertWarning
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagAlertWarning
-		return end_tagAlertWarning%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginAlertWarning
+	self.get_end       = get_endAlertWarning
 	self.content      = params.get("content", b"")
 	self.text         = params.get("text", b"")
 	self.end_init(**params)
@@ -1045,36 +865,28 @@ def AlertWarning(*args, **params):
 # </div>
 beg_tagAlertError = b'''<div class="alert alert-danger alert-dismissible fade show"><button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>'''
 end_tagAlertError = b'''%s</div>'''
+def get_beginAlertError(self):
+	return beg_tagAlertError
+def get_endAlertError(self):
+	return end_tagAlertError%(self.text)
 def AlertError(*args, **params):
 	self = Template(*(("AlertError",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagAlertError
-		return beg_tagAlertError
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagAlertError
-		return end_tagAlertError%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginAlertError
+	self.get_end       = get_endAlertError
 	self.content      = params.get("content", b"")
 	self.text         = params.get("text", b"")
 	self.end_init(**params)
 	return self
 
 # %(content)s
+def get_beginTag(self):
+	return b''
+def get_endTag(self):
+	return b''
 def Tag(*args, **params):
 	self = Template(*(("Tag",) + args), **params)
-
-	def get_begin(self):
-		return b''
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTag
+	self.get_end       = get_endTag
 	self.content      = params.get("content", b"")
 	self.end_init(**params)
 	return self
@@ -1098,18 +910,14 @@ def Tag(*args, **params):
 # }
 # </script>
 beg_tagButtonCmd = b'''<button type="button" class="btn btn-outline-primary %s" style="%s" id="%s" name="%s" %s onclick="oncommand_%s()" >%s</button><script type="text/javascript">function oncommand_%s(){var confirmMessage = "%s";var execute = true;if (confirmMessage != ""){execute = confirm(confirmMessage);}if (execute){var xhttp = new XMLHttpRequest();xhttp.open("GET","%s?name="+document.getElementById("%s").name,true);xhttp.send();}}</script>'''
+def get_beginButtonCmd(self):
+	return beg_tagButtonCmd%(self.class_,self.style,self.id,self.name, b'disabled' if self.disabled else b'',self.id,self.text,self.id,self.confirm,self.path,self.id)
+def get_endButtonCmd(self):
+	return b''
 def ButtonCmd(*args, **params):
 	self = Template(*(("ButtonCmd",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagButtonCmd
-		return beg_tagButtonCmd%(self.class_,self.style,self.id,self.name, b'disabled' if self.disabled else b'',self.id,self.text,self.id,self.confirm,self.path,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginButtonCmd
+	self.get_end       = get_endButtonCmd
 	self.class_       = params.get("class_", b"")
 	self.confirm      = params.get("confirm", b"")
 	self.disabled     = params.get("disabled", False)
@@ -1142,18 +950,14 @@ def ButtonCmd(*args, **params):
 # </script>
 # </div>
 beg_tagSliderCmd = b'''<div class="form-group %s"><label >%s</label><div style="display: flex;"><input type="range" class="form-range %s" style="%s" id="slider_%s" name="%s" min="%s" max="%s" step="%s" value="%s" %s oninput="onchange_%s()" onmouseup="oncommand_%s()" /><span id="value_%s"/></div><script type="text/javascript">function onchange_%s(){document.getElementById("value_%s").innerHTML = "&nbsp;" + document.getElementById("slider_%s").value;}onchange_%s();function oncommand_%s(){var xhttp = new XMLHttpRequest();xhttp.open("GET","%s?name="+document.getElementById("slider_%s").name+"&value="+document.getElementById("slider_%s").value,true);xhttp.send();}</script></div>'''
+def get_beginSliderCmd(self):
+	return beg_tagSliderCmd%(self.spacer,self.text,self.class_,self.style,self.id,self.name,self.min,self.max,self.step,self.value, b'disabled' if self.disabled else b'',self.id,self.id,self.id,self.id,self.id,self.id,self.id,self.id,self.path,self.id,self.id)
+def get_endSliderCmd(self):
+	return b''
 def SliderCmd(*args, **params):
 	self = Template(*(("SliderCmd",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSliderCmd
-		return beg_tagSliderCmd%(self.spacer,self.text,self.class_,self.style,self.id,self.name,self.min,self.max,self.step,self.value, b'disabled' if self.disabled else b'',self.id,self.id,self.id,self.id,self.id,self.id,self.id,self.id,self.path,self.id,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSliderCmd
+	self.get_end       = get_endSliderCmd
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1185,19 +989,14 @@ def SliderCmd(*args, **params):
 # </div>
 beg_tagComboCmd = b'''<div class="form-group %s"><label >%s</label><select class="btn btn-outline-primary form-select %s" style="%s" id="%s" name="%s" %s oninput="oncommand_%s()">'''
 end_tagComboCmd = b'''</select><script type="text/javascript">function oncommand_%s(){var xhttp = new XMLHttpRequest();xhttp.open("GET","%s?name="+document.getElementById("%s").name+"&value="+document.getElementById("%s").value,true);xhttp.send();}</script></div>'''
+def get_beginComboCmd(self):
+	return beg_tagComboCmd%(self.spacer,self.text,self.class_,self.style,self.id,self.name, b'disabled' if self.disabled else b'',self.id)
+def get_endComboCmd(self):
+	return end_tagComboCmd%(self.id,self.path,self.id,self.id)
 def ComboCmd(*args, **params):
 	self = Template(*(("ComboCmd",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagComboCmd
-		return beg_tagComboCmd%(self.spacer,self.text,self.class_,self.style,self.id,self.name, b'disabled' if self.disabled else b'',self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagComboCmd
-		return end_tagComboCmd%(self.id,self.path,self.id,self.id)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginComboCmd
+	self.get_end       = get_endComboCmd
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.disabled     = params.get("disabled", False)
@@ -1225,18 +1024,14 @@ def ComboCmd(*args, **params):
 # </script>
 # </div>
 beg_tagSwitchCmd = b'''<div class="form-group %s"><div class="form-check form-switch" style="height: 1.5em;"><input type="checkbox" class="form-check-input %s" style="%s" id="%s" value="%s" name="%s" %s %s oninput="oncommand_%s()" /><label class="form-check-label" for="%s">%s</label></div><script type="text/javascript">function oncommand_%s(){var xhttp = new XMLHttpRequest();xhttp.open("GET","%s?name="+document.getElementById("%s").name+"&value="+document.getElementById("%s").checked,true);xhttp.send();}</script></div>'''
+def get_beginSwitchCmd(self):
+	return beg_tagSwitchCmd%(self.spacer,self.class_,self.style,self.id,self.value,self.name, b'checked' if self.checked else b'', b'disabled' if self.disabled else b'',self.id,self.id,self.text,self.id,self.path,self.id,self.id)
+def get_endSwitchCmd(self):
+	return b''
 def SwitchCmd(*args, **params):
 	self = Template(*(("SwitchCmd",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSwitchCmd
-		return beg_tagSwitchCmd%(self.spacer,self.class_,self.style,self.id,self.value,self.name, b'checked' if self.checked else b'', b'disabled' if self.disabled else b'',self.id,self.id,self.text,self.id,self.path,self.id,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSwitchCmd
+	self.get_end       = get_endSwitchCmd
 	self.checked      = params.get("checked", True)
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
@@ -1261,19 +1056,14 @@ def SwitchCmd(*args, **params):
 # </main>
 beg_tagModal = b'''<main class="form-signin"><div class="modal-dialog modal-dialog-centered %s" style="align-items:center;min-height:100vh; %s" id="%s"><div class="modal-content shadow-lg p-3 mb-5 bg-white rounded"><div class="modal-body" style="padding:10px 10px;">'''
 end_tagModal = b'''</div></div></div></main>'''
+def get_beginModal(self):
+	return beg_tagModal%(self.class_,self.style,self.id)
+def get_endModal(self):
+	return end_tagModal
 def Modal(*args, **params):
 	self = Template(*(("Modal",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagModal
-		return beg_tagModal%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagModal
-		return end_tagModal
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginModal
+	self.get_end       = get_endModal
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1283,18 +1073,14 @@ def Modal(*args, **params):
 
 # <span class="%(class_)s" style="%(style)s" id="%(id)s">&nbsp;</span>
 beg_tagSpace = b'''<span class="%s" style="%s" id="%s">&nbsp;</span>'''
+def get_beginSpace(self):
+	return beg_tagSpace%(self.class_,self.style,self.id)
+def get_endSpace(self):
+	return b''
 def Space(*args, **params):
 	self = Template(*(("Space",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSpace
-		return beg_tagSpace%(self.class_,self.style,self.id)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSpace
+	self.get_end       = get_endSpace
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -1303,18 +1089,14 @@ def Space(*args, **params):
 
 # <span class="%(class_)s" style="%(style)s" id="%(id)s">%(text)s</span>
 beg_tagSpan = b'''<span class="%s" style="%s" id="%s">%s</span>'''
+def get_beginSpan(self):
+	return beg_tagSpan%(self.class_,self.style,self.id,self.text)
+def get_endSpan(self):
+	return b''
 def Span(*args, **params):
 	self = Template(*(("Span",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagSpan
-		return beg_tagSpan%(self.class_,self.style,self.id,self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginSpan
+	self.get_end       = get_endSpan
 	self.class_       = params.get("class_", b"")
 	self.id           = params.get("id", b"%d"%id(self))
 	self.style        = params.get("style", b"")
@@ -1324,18 +1106,14 @@ def Span(*args, **params):
 
 # <li class="page-item"><a class="page-link %(active)s %(class_)s" style="%(style)s" id="%(id)s" href="%(href)s" %(disabled)s>%(text)s</a></li>
 beg_tagPageItem = b'''<li class="page-item"><a class="page-link %s %s" style="%s" id="%s" href="%s" %s>%s</a></li>'''
+def get_beginPageItem(self):
+	return beg_tagPageItem%( b'active' if self.active else b'',self.class_,self.style,self.id,self.href, b'disabled' if self.disabled else b'',self.text)
+def get_endPageItem(self):
+	return b''
 def PageItem(*args, **params):
 	self = Template(*(("PageItem",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagPageItem
-		return beg_tagPageItem%( b'active' if self.active else b'',self.class_,self.style,self.id,self.href, b'disabled' if self.disabled else b'',self.text)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginPageItem
+	self.get_end       = get_endPageItem
 	self.active       = params.get("active", False)
 	self.class_       = params.get("class_", b"")
 	self.disabled     = params.get("disabled", False)
@@ -1351,19 +1129,14 @@ def PageItem(*args, **params):
 # </ul>
 beg_tagPagination = b'''<ul class="pagination" id="%s" class="%s">'''
 end_tagPagination = b'''</ul>'''
+def get_beginPagination(self):
+	return beg_tagPagination%(self.id,self.class_)
+def get_endPagination(self):
+	return end_tagPagination
 def Pagination(*args, **params):
 	self = Template(*(("Pagination",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagPagination
-		return beg_tagPagination%(self.id,self.class_)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagPagination
-		return end_tagPagination
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginPagination
+	self.get_end       = get_endPagination
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1375,19 +1148,14 @@ def Pagination(*args, **params):
 # </thead>
 beg_tagThead = b'''<thead id="%s" class="%s">'''
 end_tagThead = b'''</thead>'''
+def get_beginThead(self):
+	return beg_tagThead%(self.id,self.class_)
+def get_endThead(self):
+	return end_tagThead
 def Thead(*args, **params):
 	self = Template(*(("Thead",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagThead
-		return beg_tagThead%(self.id,self.class_)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagThead
-		return end_tagThead
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginThead
+	self.get_end       = get_endThead
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1397,19 +1165,14 @@ def Thead(*args, **params):
 # <th width="%(width)s" id="%(id)s" class="%(class_)s" onclick="%(onclick)s" %(event)s style="%(style)s">%(content)s%(text)s</th>
 beg_tagTh = b'''<th width="%s" id="%s" class="%s" onclick="%s" %s style="%s">'''
 end_tagTh = b'''%s</th>'''
+def get_beginTh(self):
+	return beg_tagTh%(self.width,self.id,self.class_,self.onclick,self.event,self.style)
+def get_endTh(self):
+	return end_tagTh%(self.text)
 def Th(*args, **params):
 	self = Template(*(("Th",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTh
-		return beg_tagTh%(self.width,self.id,self.class_,self.onclick,self.event,self.style)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagTh
-		return end_tagTh%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTh
+	self.get_end       = get_endTh
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.event        = params.get("event", b"")
@@ -1424,19 +1187,14 @@ def Th(*args, **params):
 # <td width="%(width)s" id="%(id)s" class="%(class_)s" onclick="%(onclick)s" %(event)s style="%(style)s">%(content)s%(text)s</td>
 beg_tagTd = b'''<td width="%s" id="%s" class="%s" onclick="%s" %s style="%s">'''
 end_tagTd = b'''%s</td>'''
+def get_beginTd(self):
+	return beg_tagTd%(self.width,self.id,self.class_,self.onclick,self.event,self.style)
+def get_endTd(self):
+	return end_tagTd%(self.text)
 def Td(*args, **params):
 	self = Template(*(("Td",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTd
-		return beg_tagTd%(self.width,self.id,self.class_,self.onclick,self.event,self.style)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagTd
-		return end_tagTd%(self.text)
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTd
+	self.get_end       = get_endTd
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.event        = params.get("event", b"")
@@ -1453,19 +1211,14 @@ def Td(*args, **params):
 # </tr>
 beg_tagTr = b'''<tr id="%s" class="%s">'''
 end_tagTr = b'''</tr>'''
+def get_beginTr(self):
+	return beg_tagTr%(self.id,self.class_)
+def get_endTr(self):
+	return end_tagTr
 def Tr(*args, **params):
 	self = Template(*(("Tr",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTr
-		return beg_tagTr%(self.id,self.class_)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagTr
-		return end_tagTr
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTr
+	self.get_end       = get_endTr
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1477,19 +1230,14 @@ def Tr(*args, **params):
 # </tbody>
 beg_tagTbody = b'''<tbody id="%s" class="%s">'''
 end_tagTbody = b'''</tbody>'''
+def get_beginTbody(self):
+	return beg_tagTbody%(self.id,self.class_)
+def get_endTbody(self):
+	return end_tagTbody
 def Tbody(*args, **params):
 	self = Template(*(("Tbody",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTbody
-		return beg_tagTbody%(self.id,self.class_)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagTbody
-		return end_tagTbody
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTbody
+	self.get_end       = get_endTbody
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1501,19 +1249,14 @@ def Tbody(*args, **params):
 # </table>
 beg_tagTable = b'''<table id="%s" class="%s table table-striped table-hover">'''
 end_tagTable = b'''</table>'''
+def get_beginTable(self):
+	return beg_tagTable%(self.id,self.class_)
+def get_endTable(self):
+	return end_tagTable
 def Table(*args, **params):
 	self = Template(*(("Table",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagTable
-		return beg_tagTable%(self.id,self.class_)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagTable
-		return end_tagTable
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginTable
+	self.get_end       = get_endTable
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.id           = params.get("id", b"%d"%id(self))
@@ -1534,18 +1277,14 @@ def Table(*args, **params):
 # </div>
 # </div>
 beg_tagDialogFullScreen = b'''<div class="modal" id="%s" class="%s"><div class="modal-dialog modal-fullscreen"><div class="modal-content"><div class="modal-header">%s<button type="button" class="btn-close" data-bs-dismiss="modal"/></div><div class="modal-body" >%s</div></div></div></div>'''
+def get_beginDialogFullScreen(self):
+	return beg_tagDialogFullScreen%(self.id,self.class_,self.header,self.body)
+def get_endDialogFullScreen(self):
+	return b''
 def DialogFullScreen(*args, **params):
 	self = Template(*(("DialogFullScreen",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagDialogFullScreen
-		return beg_tagDialogFullScreen%(self.id,self.class_,self.header,self.body)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		return b''
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginDialogFullScreen
+	self.get_end       = get_endDialogFullScreen
 	self.body         = params.get("body", b"")
 	self.class_       = params.get("class_", b"")
 	self.header       = params.get("header", b"")
@@ -1565,19 +1304,14 @@ def DialogFullScreen(*args, **params):
 # </html>
 beg_tagPage = b'''<html lang="fr" charset="utf-8"><head><title>%s</title><meta name="viewport" content="width=device-width, initial-scale=1" charset="UTF-8"/><link rel="icon" href="data:,"></head><body class="%s" style="%s">'''
 end_tagPage = b'''</body></html>'''
+def get_beginPage(self):
+	return beg_tagPage%(self.title,self.class_,self.style)
+def get_endPage(self):
+	return end_tagPage
 def Page(*args, **params):
 	self = Template(*(("Page",) + args), **params)
-
-	def get_begin(self):
-		global beg_tagPage
-		return beg_tagPage%(self.title,self.class_,self.style)
-	self.get_begin     = get_begin
-
-	def get_end(self):
-		global end_tagPage
-		return end_tagPage
-	self.get_end       = get_end
-
+	self.get_begin     = get_beginPage
+	self.get_end       = get_endPage
 	self.class_       = params.get("class_", b"")
 	self.content      = params.get("content", b"")
 	self.style        = params.get("style", b"")
@@ -91,34 +91,30 @@ def parse(force=False):
 						py_class_file.write("""beg_tag%s = b'''%s'''\n"""%(classname,begin_tag))
 					if end_tag != "":
 						py_class_file.write("""end_tag%s = b'''%s'''\n"""%(classname,end_tag))
-					py_class_file.write("""def %s(*args, **params):\n"""%classname)
-
-					py_class_file.write("""\tself = Template(*(("%s",) + args), **params)\n\n"""%classname)
 
-					py_class_file.write("""\tdef get_begin(self):\n""")
+					# The tags are written by functions shared by all instances, only the attributes are formatted
+					py_class_file.write("""def get_begin%s(self):\n"""%classname)
 					if begin_format == "":
 						if begin_tag != "":
-							py_class_file.write("""\t\tglobal beg_tag%s\n"""%classname)
-							py_class_file.write("""\t\treturn beg_tag%s\n"""%(classname))
+							py_class_file.write("""\treturn beg_tag%s\n"""%(classname))
 						else:
-							py_class_file.write("""\t\treturn b''\n""")
+							py_class_file.write("""\treturn b''\n""")
 					else:
-						py_class_file.write("""\t\tglobal beg_tag%s\n"""%classname)
-						py_class_file.write("""\t\treturn beg_tag%s%s(%s)\n"""%(classname, "\x25",begin_format[:-1]))
-					py_class_file.write("""\tself.get_begin     = get_begin\n\n""")
+						py_class_file.write("""\treturn beg_tag%s%s(%s)\n"""%(classname, "\x25",begin_format[:-1]))
 
-					py_class_file.write("""\tdef get_end(self):\n""")
+					py_class_file.write("""def get_end%s(self):\n"""%classname)
 					if end_format == "":
 						if end_tag != "":
-							py_class_file.write("""\t\tglobal end_tag%s\n"""%classname)
-							py_class_file.write("""\t\treturn end_tag%s\n"""%(classname))
+							py_class_file.write("""\treturn end_tag%s\n"""%(classname))
 						else:
-							py_class_file.write("""\t\treturn b''\n""")
+							py_class_file.write("""\treturn b''\n""")
 					else:
-						py_class_file.write("""\t\tglobal end_tag%s\n"""%classname)
-						py_class_file.write("""\t\treturn end_tag%s%s(%s)\n"""%(classname, "\x25", end_format[:-1]))
-					py_class_file.write("""\tself.get_end       = get_end\n\n""")
+						py_class_file.write("""\treturn end_tag%s%s(%s)\n"""%(classname, "\x25", end_format[:-1]))
 
+					py_class_file.write("""def %s(*args, **params):\n"""%classname)
+					py_class_file.write("""\tself = Template(*(("%s",) + args), **params)\n"""%classname)
+					py_class_file.write("""\tself.get_begin     = get_begin%s\n"""%classname)
+					py_class_file.write("""\tself.get_end       = get_end%s\n"""%classname)
 					for attribute in classattributes:
 						if attribute in ["pattern"]:
 							py_class_file.write('\tself.{:<12} = params.get("{}", b"*")\n'.format(attribute,attribute))
@@ -3,6 +3,9 @@
 """ Base class of html templates """
 import tools.logger
 
+# Size of the blocks written, the small parts of the page are gathered before being written
+RENDER_SIZE = 1440
+
 class Template:
 	""" Base class of html templates """
 	default_spacer = b"mb-3"
@@ -31,21 +34,36 @@ class Template:
 		else:
 			self.children.append(children)
 
-	async def write(self, file):
-		""" Write to the file stream the html template (parse also all children) """
+	def render(self):
+		""" Generator of the parts of the html template and all its children, without writing anything """
 		try:
 			# pylint: disable=no-member
-			await file.write(self.get_begin(self))
+			yield self.get_begin(self)
 			for child in self.children:
 				if isinstance(child, Template):
-					await child.write(file)
+					yield from child.render()
 				elif child is not None:
 					if type(child) == type(b""):
-						await file.write(child)
+						yield child
 					elif type(child) == type([]) or type(child) == type((0,)):
 						for item in child:
 							if item is not None:
-								await item.write(file)
-			await file.write(self.get_end(self))
+								yield from item.render()
+			yield self.get_end(self)
 		except Exception as err:
-			await file.write(tools.logger.html_exception(err))
+			yield tools.logger.html_exception(err)
+
+	async def write(self, file):
+		""" Write to the file stream the html template (parse also all children).
+		The parts are gathered as they are produced, and written each time the block reaches RENDER_SIZE """
+		block = []
+		length = 0
+		for part in self.render():
+			block.append(part)
+			length += len(part)
+			if length >= RENDER_SIZE:
+				await file.write(b"".join(block))
+				block = []
+				length = 0
+		if length > 0:
+			await file.write(b"".join(block))
@@ -5,16 +5,138 @@
 import re
 import json
 import uasyncio
+import uos
 import tools.logger
 import tools.sdcard
 import tools.tasking
 import tools.filesystem
 import tools.strings
 import tools.info
+import tools.jpeg
+import tools.lang
+import tools.topic
+import server.events
 
 MAX_DAYS_DISPLAYED = 28
 MAX_DAYS_REMOVED   = 14
 MAX_MOTIONS        = 400
+INDEX_FILENAME     = "historic.idx"
+THUMBNAIL_SUFFIX   = ".thumb.jpg"
+LEDGER_FILENAME    = "historic.ldg"
+MAX_ADDED          = 50
+MAX_THUMBNAILS     = 10
+
+DROP_OLDEST = b"oldest"
+DROP_NEWEST = b"newest"
+DROP_LOWEST = b"lowest"
+
+class Ledger:
+	""" Storage ledger of the historic, it contains the files count and the bytes size of each day directory """
+	days = {}
+	loaded = [False]
+	modified = [False]
+
+	@staticmethod
+	def get_day(path):
+		""" Get the day 'yyyy/mm/dd' of a path relative to the sd card root """
+		return tools.strings.tostrings(path).strip("/")[:10]
+
+	@staticmethod
+	def add(path, count, size):
+		""" Add files in the day of path """
+		day = Ledger.get_day(path)
+		files = Ledger.days.get(day, [0,0])
+		Ledger.days[day] = [files[0] + count, files[1] + size]
+		Ledger.modified[0] = True
+
+	@staticmethod
+	def remove(day):
+		""" Remove the day of ledger """
+		if day in Ledger.days:
+			del Ledger.days[day]
+			Ledger.modified[0] = True
+
+	@staticmethod
+	async def measure(directory):
+		""" Measure the files count and the bytes size of directory """
+		count = 0
+		size  = 0
+		for fileinfo in tools.filesystem.list_directory(Historic.get_local_name(directory)):
+			if fileinfo[1] & 0xF000 == 0x4000:
+				files = await Ledger.measure(directory + "/" + fileinfo[0])
+				count += files[0]
+				size  += files[1]
+			else:
+				count += 1
+				size  += fileinfo[3] if len(fileinfo) > 3 else 0
+		if tools.filesystem.ismicropython():
+			await uasyncio.sleep_ms(2)
+		return [count, size]
+
+	@staticmethod
+	async def load():
+		""" Load the ledger and check it with the days directories, the days missing are measured """
+		root = Historic.get_root()
+		if root and Ledger.loaded[0] is False:
+			days = {}
+			try:
+				with open(Historic.get_local_name(root + "/" + LEDGER_FILENAME), "r") as file:
+					days = json.load(file)
+			except OSError:
+				pass
+			except Exception as err:
+				tools.logger.syslog(err)
+
+			existing = {}
+			for directory in await Historic.scan_days(100000, True):
+				day = directory[len(root)+1:]
+				if day in days:
+					# The files added before the loading are kept
+					added = Ledger.days.get(day, [0,0])
+					existing[day] = [days[day][0] + added[0], days[day][1] + added[1]]
+				else:
+					print("Measure historic day %s"%day)
+					existing[day] = await Ledger.measure(directory)
+			Ledger.days = existing
+			Ledger.loaded[0] = True
+			Ledger.modified[0] = True
+			Ledger.save()
+
+	@staticmethod
+	def save():
+		""" Save the ledger if it changed """
+		root = Historic.get_root()
+		if root and Ledger.loaded[0] and Ledger.modified[0]:
+			try:
+				with open(Historic.get_local_name(root + "/" + LEDGER_FILENAME), "w") as file:
+					json.dump(Ledger.days, file)
+				Ledger.modified[0] = False
+			except Exception as err:
+				tools.logger.syslog(err)
+
+	@staticmethod
+	def get_olders(required, force=False):
+		""" Get the older days to remove to free the required size, the current day is never returned """
+		result = []
+		days = sorted(Ledger.days.keys())[:-1]
+		for day in days:
+			if required <= 0 and (force is False or len(result) > 0):
+				break
+			result.append(day)
+			required -= Ledger.days[day][1]
+		return result, required
+
+	@staticmethod
+	def get_status():
+		""" Get the storage used by the historic """
+		if Ledger.loaded[0]:
+			count = 0
+			size  = 0
+			for files in Ledger.days.values():
+				count += files[0]
+				size  += files[1]
+			return b"%d days, %d files, %s"%(len(Ledger.days), count, tools.strings.size_to_bytes(size, 1))
+		return b"-"
 
 class Historic:
 	""" Manage the motion detection history file """
@@ -22,6 +144,18 @@ class Historic:
 	historic = []
 	first_extract = [False]
 	lock = uasyncio.Lock()
+	queue = []
+	queue_size = [3]
+	queue_drop = [DROP_OLDEST]
+	queue_event = [None]
+	queue_stat = {"depth":0, "dropped":0, "written":0, "failed":0, "latency":0, "latency_max":0}
+	thumbnails = []
+	version = [0]
+	added_from = [0]
+	added = []
+	removed = []
+	json_cache = [None, -1]
+	etag_prefix = [None]
 
 	@staticmethod
 	async def acquire():
@@ -46,8 +180,103 @@ class Historic:
 		return None
 
 	@staticmethod
-	async def add_motion(path, name, image, motion_info):
-		""" Add motion detection in the historic """
+	def set_queue(size, drop=DROP_OLDEST):
+		""" Configure the queue of motions waiting to be saved, drop indicates which motion is lost when the queue is full """
+		Historic.queue_size[0] = max(1, size)
+		Historic.queue_drop[0] = tools.strings.tobytes(drop)
+
+	@staticmethod
+	def get_diff_count(item):
+		""" Get the differences count of queued motion """
+		try:
+			return item[3]["diff"]["count"]
+		except:
+			return 0
+
+	@staticmethod
+	async def add_motion(path, name, image, motion_info, notify=True, thumbnail=False):
+		""" Add motion detection in the queue of motions to save, the writing is done by the historic writer task """
+		result = False
+		if Historic.get_root():
+			item = [path, name, image, motion_info, notify, thumbnail]
+
+			# If the queue is full
+			if len(Historic.queue) >= Historic.queue_size[0]:
+				Historic.queue_stat["dropped"] += 1
+				if Historic.queue_drop[0] == DROP_NEWEST:
+					item = None
+				elif Historic.queue_drop[0] == DROP_LOWEST:
+					lowest = item
+					for queued in Historic.queue:
+						if Historic.get_diff_count(queued) < Historic.get_diff_count(lowest):
+							lowest = queued
+					if lowest is item:
+						item = None
+					else:
+						Historic.queue.remove(lowest)
+				else:
+					del Historic.queue[0]
+
+			if item is not None:
+				Historic.queue.append(item)
+				if Historic.queue_event[0] is not None:
+					Historic.queue_event[0].set()
+			Historic.queue_stat["depth"] = max(Historic.queue_stat["depth"], len(Historic.queue))
+			result = True
+		return result
+
+	@staticmethod
+	async def writer():
+		""" Internal task which writes the queued motions on the sd card """
+		if Historic.queue_event[0] is None:
+			Historic.queue_event[0] = uasyncio.Event()
+		if len(Historic.queue) == 0:
+			await Historic.queue_event[0].wait()
+		Historic.queue_event[0].clear()
+
+		while len(Historic.queue) > 0:
+			path, name, image, motion_info, notify, thumbnail = Historic.queue.pop(0)
+			start = tools.strings.ticks()
+			if await Historic.write_motion(path, name, image, motion_info, thumbnail):
+				Historic.queue_stat["written"] += 1
+			else:
+				Historic.queue_stat["failed"] += 1
+				import server.notifier
+				server.notifier.Notifier.notify(topic=tools.topic.information, message=tools.lang.failed_to_save, enabled=notify)
+			latency = tools.strings.ticks_diff(tools.strings.ticks(), start)
+			Historic.queue_stat["latency"] = latency
+			Historic.queue_stat["latency_max"] = max(Historic.queue_stat["latency_max"], latency)
+			# Release the image before waiting the next one
+			image = None
+			await uasyncio.sleep_ms(0)
+
+		# The thumbnails are built with a low priority, when no motion waits to be saved
+		while len(Historic.queue) == 0 and len(Historic.thumbnails) > 0:
+			thumbnail = Historic.thumbnails.pop(0)
+			try:
+				await Historic.write_thumbnail(*thumbnail)
+			except tools.jpeg.JpegStopped:
+				# A motion waits to be saved, the thumbnail will be built later
+				Historic.thumbnails.insert(0, thumbnail)
+			thumbnail = None
+		return True
+
+	@staticmethod
+	def is_waiting():
+		""" Indicates if motions wait to be saved """
+		return len(Historic.queue) > 0
+
+	@staticmethod
+	def get_queue_status():
+		""" Get the status of queue of motions to save """
+		return b"%d/%d, %d dropped, %d written, %d failed, %d ms (max %d ms)"%(
+			len(Historic.queue), Historic.queue_stat["depth"],
+			Historic.queue_stat["dropped"], Historic.queue_stat["written"], Historic.queue_stat["failed"],
+			Historic.queue_stat["latency"], Historic.queue_stat["latency_max"])
+
+	@staticmethod
+	async def write_motion(path, name, image, motion_info, thumbnail=False):
+		""" Write motion detection on the sd card and add it in the historic, its thumbnail is built later by the writer """
 		root = Historic.get_root()
 		result = False
 		if root:
@@ -56,9 +285,18 @@ class Historic:
 				path = tools.strings.tostrings(path)
 				name = tools.strings.tostrings(name)
 				item = Historic.create_item(root + "/" + path + "/" + name +".json", motion_info)
+				content = json.dumps(item, separators=(',', ':'))
 				res1 = tools.sdcard.SdCard.save(path, name + ".jpg" , image)
-				res2 = tools.sdcard.SdCard.save(path, name + ".json", json.dumps(item, separators=(',', ':')))
+				res2 = tools.sdcard.SdCard.save(path, name + ".json", content)
+				if res1 and res2:
+					size = Historic.append_index(item) + len(image) + len(content)
+					Ledger.add(path, 2, size)
+					if thumbnail and item is not None:
+						Historic.thumbnails.append([path, name, item])
+						if len(Historic.thumbnails) > MAX_THUMBNAILS:
+							del Historic.thumbnails[0]
 				Historic.add_item(item)
+				Historic.publish()
 				result = res1 and res2
 			except Exception as err:
 				tools.logger.syslog(err)
@@ -67,15 +305,57 @@ class Historic:
 		return result
 
 	@staticmethod
-	def create_item(filename, motion_info):
+	async def write_thumbnail(path, name, item):
+		""" Build the thumbnail of a motion already saved, its building is stopped as soon as a motion waits to be saved """
+		try:
+			with open(Historic.get_local_name(item[0]), "rb") as file:
+				image = file.read()
+		except OSError:
+			# The motion was removed before
+			return
+		thumbnail = await tools.jpeg.thumbnail(image, Historic.is_waiting)
+		image = None
+		if thumbnail is not None:
+			try:
+				await Historic.acquire()
+				if tools.sdcard.SdCard.save(path, name + THUMBNAIL_SUFFIX, thumbnail):
+					# The presence of thumbnail is added in the json file and in the index of motion
+					item.append(1)
+					content = json.dumps(item, separators=(',', ':'))
+					tools.sdcard.SdCard.save(path, name + ".json", content)
+					day = Historic.get_day_directory(item[0])
+					items = Historic.load_index(day)
+					if items is not None:
+						for indexed in items:
+							if Historic.get_local_name(indexed[0]) == Historic.get_local_name(item[0]):
+								indexed.append(1)
+						Historic.write_index(day, items)
+					Ledger.add(path, 1, len(thumbnail))
+					Historic.update_item(item)
+					Historic.publish()
+			except Exception as err:
+				tools.logger.syslog(err)
+			finally:
+				await Historic.release()
+
+	@staticmethod
+	def create_item(filename, motion_info, thumbnail=False):
 		""" Create historic item """
 		name = tools.filesystem.splitext(filename)[0] + ".jpg"
 		result = None
 		if "geometry" in motion_info:
 			# Add json file to the historic
 			result = [name, motion_info["geometry"]["width"],motion_info["geometry"]["height"], motion_info["diff"]["diffs"], motion_info["diff"]["squarex"], motion_info["diff"]["squarey"]]
+			# Indicates the presence of thumbnail
+			if thumbnail:
+				result.append(1)
 		return result
 
+	@staticmethod
+	def get_thumbnail(filename):
+		""" Get the thumbnail filename of motion image """
+		return tools.filesystem.splitext(filename)[0] + THUMBNAIL_SUFFIX
+
 	@staticmethod
 	def add_item(item):
 		""" Add item in the historic """
@@ -84,82 +364,279 @@ class Historic:
 				# Remove the "/" before filename
 				item [0] = item [0].lstrip("/")
 
-			# If the differences are in an old format
-			if type(item[3]) == type(""):
-				diffs = []
-				diff_val = 0
-				i = 0
-				for diff in item[3]:
-					if diff == "#":
-						diff_val |= 1
-
-					if (i %32 == 31):
-						diffs.append(diff_val)
-						diff_val = 0
-					else:
-						diff_val <<= 1
-					i += 1
-				diff_max = len(item[3])
-				diff_val <<= (31 - (diff_max%32))
-				diffs.append(diff_val)
-				item[3] = diffs
+			Historic.convert_diffs(item)
 
 			# Add json file to the historic
 			Historic.historic.insert(0,item)
+			Historic.update_item(item)
+
+	@staticmethod
+	def update_item(item):
+		""" Keep the item added or modified in the historic, it is sent again to the pages which already have it """
+		Historic.changed()
+		Historic.added.append([Historic.version[0], item])
+		if len(Historic.added) > MAX_ADDED:
+			Historic.added_from[0] = max(Historic.added_from[0], Historic.added[0][0])
+			del Historic.added[0]
+
+	@staticmethod
+	def remove_oldest():
+		""" Remove the last item of the historic sorted, the removal is kept to answer the incremental requests """
+		item = Historic.historic.pop()
+		Historic.changed()
+		Historic.removed.append([Historic.version[0], item[0]])
+		if len(Historic.removed) > MAX_ADDED:
+			Historic.added_from[0] = max(Historic.added_from[0], Historic.removed[0][0])
+			del Historic.removed[0]
+
+	@staticmethod
+	def publish():
+		""" Publish the new version of historic, the pages displaying the historic reload it """
+		server.events.Events.publish(tools.topic.motion_historic, Historic.get_etag())
+
+	@staticmethod
+	def changed(removed=False):
+		""" Increase the version of historic, each addition or removal changes the version """
+		Historic.version[0] += 1
+		# After a complete rebuild, only the complete historic can be sent
+		if removed:
+			Historic.added_from[0] = Historic.version[0]
+			Historic.added.clear()
+			Historic.removed.clear()
+
+	@staticmethod
+	def get_etag(version=None):
+		""" Get the entity tag of the historic version, it changes at each reboot """
+		if Historic.etag_prefix[0] is None:
+			import random
+			Historic.etag_prefix[0] = b"%x"%random.getrandbits(24)
+		if version is None:
+			version = Historic.version[0]
+		return b"%s-%d"%(Historic.etag_prefix[0], version)
+
+	@staticmethod
+	def get_since(etag):
+		""" Get the version of historic from an entity tag, returns None if the tag comes from another boot """
+		try:
+			prefix, version = tools.strings.tobytes(etag).strip(b'"').split(b"-")
+			if prefix == Historic.etag_prefix[0]:
+				return int(version)
+		except:
+			pass
+		return None
+
+	@staticmethod
+	def convert_diffs(item):
+		""" Convert the differences in an old format into a list of 32 bits words """
+		if type(item[3]) == type(""):
+			diffs = []
+			diff_val = 0
+			i = 0
+			for diff in item[3]:
+				if diff == "#":
+					diff_val |= 1
+
+				if (i %32 == 31):
+					diffs.append(diff_val)
+					diff_val = 0
+				else:
+					diff_val <<= 1
+				i += 1
+			diff_max = len(item[3])
+			diff_val <<= (31 - (diff_max%32))
+			diffs.append(diff_val)
+			item[3] = diffs
 
 	@staticmethod
-	async def build(motions):
-		""" Parse the all motions files to build historic """
+	def get_day_directory(filename):
+		""" Get the day directory of a motion file """
+		return tools.filesystem.split(tools.filesystem.split(filename)[0])[0]
+
+	@staticmethod
+	def get_local_name(filename):
+		""" Get the name of file usable on the local file system """
+		if not tools.filesystem.ismicropython():
+			filename = filename.lstrip("/")
+		return filename
+
+	@staticmethod
+	def encode_index(item):
+		""" Encode the historic item into an index line : hour/name, width, height, squarex, squarey, packed diffs and thumbnail flag """
+		hour, name = tools.filesystem.split(item[0])
+		hour = tools.filesystem.split(hour)[1]
+		diffs = "".join(["%08x"%diff for diff in item[3]])
+		thumbnail = "\t1" if len(item) > 6 and item[6] else ""
+		return "%s/%s\t%d\t%d\t%d\t%d\t%s%s\n"%(hour, name, item[1], item[2], item[4], item[5], diffs, thumbnail)
+
+	@staticmethod
+	def decode_index(day, line):
+		""" Decode an index line into an historic item, raise an exception if the line is corrupted """
+		fields = line.rstrip("\n").split("\t")
+		name, width, height, squarex, squarey, packed = fields[:6]
+		if len(fields) > 7 or len(packed) % 8 != 0 or "/" not in name:
+			raise ValueError("Corrupted index %s"%day)
+		diffs = [int(packed[i:i+8], 16) for i in range(0, len(packed), 8)]
+		result = [day + "/" + name, int(width), int(height), diffs, int(squarex), int(squarey)]
+		if len(fields) == 7:
+			result.append(int(fields[6]))
+		return result
+
+	@staticmethod
+	def append_index(item):
+		""" Append the historic item in the index of its day, returns the size written """
+		result = 0
+		try:
+			line = Historic.encode_index(item)
+			with open(Historic.get_local_name(Historic.get_day_directory(item[0])) + "/" + INDEX_FILENAME, "a") as file:
+				file.write(line)
+			result = len(line)
+		except Exception as err:
+			tools.logger.syslog(err)
+		return result
+
+	@staticmethod
+	def write_index(day, items):
+		""" Write the complete index of the day """
+		with open(Historic.get_local_name(day) + "/" + INDEX_FILENAME, "w") as file:
+			for item in items:
+				file.write(Historic.encode_index(item))
+
+	@staticmethod
+	def load_index(day):
+		""" Load the index of the day, returns None if the index is missing or corrupted """
+		result = None
+		filename = Historic.get_local_name(day) + "/" + INDEX_FILENAME
+		if tools.filesystem.exists(filename):
+			try:
+				result = []
+				with open(filename, "r") as file:
+					for line in file:
+						result.append(Historic.decode_index(day, line))
+			except Exception as err:
+				tools.logger.syslog(err)
+				result = None
+		return result
+
+	@staticmethod
+	def check_index(day, items):
+		""" Remove from the index of the day the motions whose files no longer exist """
+		kept = []
+		for item in items:
+			if tools.filesystem.exists(Historic.get_local_name(item[0])):
+				kept.append(item)
+		if len(kept) != len(items):
+			try:
+				Historic.write_index(day, kept)
+			except Exception as err:
+				tools.logger.syslog(err)
+		return kept
+
+	@staticmethod
+	async def rebuild_index(day):
+		""" Rebuild the index of the day by parsing all its motions json files """
+		print("Rebuild historic index %s"%day)
+		items = []
+		for hour in await Historic.scan_dir(Historic.get_local_name(day), r"\d\dh\d\d"):
+			path_hour = Historic.get_local_name(day + "/" + hour)
+			for detection in await Historic.scan_dir(path_hour, r"\d\d.*\.json", directory=False):
+				try:
+					with open(path_hour + "/" + detection, "rb") as file:
+						item = json.load(file)
+					if tools.filesystem.exists(Historic.get_local_name(item[0])):
+						Historic.convert_diffs(item)
+						items.append(item)
+				except OSError as err:
+					tools.logger.syslog(err)
+					# If sd card not responding properly
+					if err.errno == 2:
+						tools.info.increase_issues_counter()
+				except Exception as err:
+					tools.logger.syslog(err)
+				if tools.filesystem.ismicropython():
+					await uasyncio.sleep_ms(2)
+		try:
+			Historic.write_index(day, items)
+		except Exception as err:
+			tools.logger.syslog(err)
+		return items
+
+	@staticmethod
+	def purge_index(directory):
+		""" Remove from the index of the day the motions of the hour directory no longer present """
+		day, hour = tools.filesystem.split(directory)
+		items = Historic.load_index(day)
+		if items is not None:
+			kept = []
+			for item in items:
+				if tools.filesystem.split(tools.filesystem.split(item[0])[0])[1] != hour or tools.filesystem.exists(Historic.get_local_name(item[0])):
+					kept.append(item)
+			if len(kept) != len(items):
+				if tools.filesystem.exists(Historic.get_local_name(day)):
+					Historic.write_index(day, kept)
+
+	@staticmethod
+	async def build(days):
+		""" Load the index of the days to build historic """
 		root = Historic.get_root()
 		if root:
 			try:
 				await Historic.acquire()
 				Historic.historic.clear()
-				last_day = ""
-				# For all motions
-				for motion in motions:
-					try:
-						# Parse json file
-						file = None
-						file = open(motion, "rb")
-						motion_item = json.load(file)
-						filename = motion_item[0]
-						if not tools.filesystem.ismicropython():
-							filename = filename.lstrip("/")
-						if tools.filesystem.exists(filename):
-							Historic.add_item(motion_item)
-						if last_day != motion_item[0][4:14]:
-							last_day = motion_item[0][4:14]
-							print("Build historic day %s"%last_day)
-					except OSError as err:
-						tools.logger.syslog(err)
-						# If sd card not responding properly
-						if err.errno == 2:
-							tools.info.increase_issues_counter()
-					except Exception as err:
-						tools.logger.syslog(err)
-					finally:
-						if file:
-							file.close()
+				Historic.changed(True)
+				# For all days
+				for day in days:
+					print("Build historic day %s"%day[len(root)+1:])
+					items = Historic.load_index(day)
+					# If the index is missing or corrupted
+					if items is None:
+						items = await Historic.rebuild_index(day)
+					else:
+						items = Historic.check_index(day, items)
+					# The most recent motions of the day are added first, until the maximum is reached
+					for item in reversed(items):
+						if len(Historic.historic) >= MAX_MOTIONS:
+							break
+						Historic.add_item(item)
+					if len(Historic.historic) >= MAX_MOTIONS:
+						break
 					if tools.filesystem.ismicropython():
 						await uasyncio.sleep_ms(2)
 			except Exception as err:
 				tools.logger.syslog(err)
 			finally:
 				await Historic.release()
+			Historic.publish()
 
 	@staticmethod
-	async def get_json():
-		""" Read the historic from disk """
+	async def get_json(since=None):
+		""" Get the historic json with its entity tag, if since is an entity tag of a previous version,
+		only the motions added and the names of motions removed after this version are returned and the last value is False """
 		root = Historic.get_root()
-		result = b"[]"
+		result = b"[]", Historic.get_etag(), True
 		if root:
 			await Historic.reduce_history()
 			try:
 				await Historic.acquire()
-				Historic.historic.sort()
-				Historic.historic.reverse()
-				result = tools.strings.tobytes(json.dumps(Historic.historic, separators=(',', ':')))
+				since = Historic.get_since(since) if since is not None else None
+				# If all the motions added or removed since this version are known
+				if since is not None and Historic.added_from[0] <= since <= Historic.version[0]:
+					items = []
+					for added in Historic.added:
+						if added[0] > since and added[1] not in items:
+							items.append(added[1])
+					items.sort()
+					items.reverse()
+					removed = [removed[1] for removed in Historic.removed if removed[0] > since]
+					result = tools.strings.tobytes(json.dumps({"added":items, "removed":removed}, separators=(',', ':'))), Historic.get_etag(), False
+				else:
+					# The json of the complete historic is kept until the next change
+					if Historic.json_cache[1] != Historic.version[0]:
+						Historic.json_cache[0] = None
+						Historic.historic.sort()
+						Historic.historic.reverse()
+						Historic.json_cache[0] = tools.strings.tobytes(json.dumps(Historic.historic, separators=(',', ':')))
+						Historic.json_cache[1] = Historic.version[0]
+					result = Historic.json_cache[0], Historic.get_etag(), True
 			except Exception as err:
 				tools.logger.syslog(err)
 			finally:
@@ -174,11 +651,11 @@ class Historic:
 			Historic.first_extract[0] = True
 			try:
 				tools.logger.syslog("Start historic creation")
-				# Scan sd card and get more recent motions
-				motions, lastdays = await Historic.scan_directories(MAX_DAYS_DISPLAYED, False)
+				# Scan sd card and get more recent days
+				lastdays = await Historic.scan_days(MAX_DAYS_DISPLAYED, False)
 
-				# Build historic file
-				files = await Historic.build(motions)
+				# Build historic with the index of days
+				await Historic.build(lastdays)
 				tools.logger.syslog("Historic contains :")
 				for day in lastdays:
 					tools.logger.syslog("   %s"%day)
@@ -209,6 +686,28 @@ class Historic:
 			result.reverse()
 		return result
 
+	@staticmethod
+	async def scan_days(max_days=10, older=True):
+		""" Get the list of older or newer days directories in the sd card """
+		result = []
+		root = Historic.get_root()
+		if root:
+			try:
+				await Historic.acquire()
+				for year in await Historic.scan_dir(root, r"\d\d\d\d", older):
+					path_year = root + "/" + year
+					for month in await Historic.scan_dir(path_year, r"\d\d", older):
+						path_month = path_year + "/" + month
+						for day in await Historic.scan_dir(path_month, r"\d\d", older):
+							if len(result) >= max_days:
+								return result
+							result.append(path_month + "/" + day)
+			except Exception as err:
+				tools.logger.syslog(err)
+			finally:
+				await Historic.release()
+		return result
+
 	@staticmethod
 	async def scan_directories(max_days=10, older=True):
 		""" Get the list of older or older directories in the sd card """
@@ -302,8 +801,12 @@ class Historic:
 			await Historic.acquire()
 
 			if len(Historic.historic) > MAX_MOTIONS:
+				# The oldest motions are removed
+				Historic.historic.sort()
+				Historic.historic.reverse()
 				while len(Historic.historic) > MAX_MOTIONS:
-					del Historic.historic[-1]
+					Historic.remove_oldest()
+				Historic.publish()
 
 		finally:
 			await Historic.release()
@@ -333,24 +836,79 @@ class Historic:
 			if tools.sdcard.SdCard.is_not_enough_space(low=True) or force:
 				tools.logger.syslog("Start cleanup historic")
 				Historic.first_extract[0] = False
-				olders, lastdays = await Historic.scan_directories(MAX_DAYS_REMOVED, True)
-				previous = ""
+				await Ledger.load()
 
-				for motion in olders:
+				# Select with the ledger the older days to remove
+				days, missing = Ledger.get_olders(tools.sdcard.SdCard.get_missing_space(low=False), force)
+				for day in days:
 					try:
 						await Historic.acquire()
-						directory = tools.filesystem.split(motion)[0]
-						if previous != directory:
-							await Historic.remove_files(directory, simulate=False, force=force)
-							previous = directory
+						await Historic.remove_day(root + "/" + day)
+						Ledger.remove(day)
 					except Exception as err:
 						tools.logger.syslog(err)
 					finally:
 						await Historic.release()
-					if tools.sdcard.SdCard.is_not_enough_space(low=False) is False:
-						break
+				Ledger.save()
+
+				# If the removal of whole days is not sufficient, the hours of current day are removed
+				if missing > 0 or len(days) == 0:
+					await Historic.remove_hours(force)
 				tools.logger.syslog("End cleanup historic : %s"%(tools.strings.tostrings(tools.info.flashinfo(mountpoint=tools.sdcard.SdCard.get_mountpoint()))))
 
+	@staticmethod
+	async def remove_day(directory):
+		""" Remove in bulk all files of day directory """
+		print("Remove historic day %s"%directory)
+		await Historic.remove_directory(Historic.get_local_name(directory))
+
+	@staticmethod
+	async def remove_directory(directory):
+		""" Remove the directory with all its content, without checking the space after each file """
+		# WARNING : TO AVOID CRASH, NEVER DELETE DIRECTORY OR FILE IN ilistdir LOOP
+		files = []
+		for fileinfo in tools.filesystem.list_directory(directory):
+			files.append((directory + "/" + fileinfo[0], fileinfo[1] & 0xF000 == 0x4000))
+		for filename, is_directory in files:
+			if is_directory:
+				await Historic.remove_directory(filename)
+			else:
+				uos.remove(filename)
+		uos.rmdir(directory)
+		if tools.filesystem.ismicropython():
+			await uasyncio.sleep_ms(2)
+
+	@staticmethod
+	async def remove_hours(force=False):
+		""" Remove the older hours directories until the remaining space is sufficient """
+		root = Historic.get_root()
+		olders, lastdays = await Historic.scan_directories(MAX_DAYS_REMOVED, True)
+		previous = ""
+		days = set()
+
+		for motion in olders:
+			try:
+				await Historic.acquire()
+				directory = tools.filesystem.split(motion)[0]
+				if previous != directory:
+					await Historic.remove_files(directory, simulate=False, force=force)
+					Historic.purge_index(directory)
+					days.add(tools.filesystem.split(directory)[0])
+					previous = directory
+			except Exception as err:
+				tools.logger.syslog(err)
+			finally:
+				await Historic.release()
+			if tools.sdcard.SdCard.is_not_enough_space(low=False) is False:
+				break
+
+		# Measure again the days partially removed
+		for directory in days:
+			Ledger.remove(directory[len(root)+1:])
+			if tools.filesystem.exists(Historic.get_local_name(directory)):
+				Ledger.days[directory[len(root)+1:]] = await Ledger.measure(directory)
+		Ledger.save()
+
 	@staticmethod
 	async def task():
 		""" Internal periodic task """
@@ -365,12 +923,15 @@ class Historic:
 			if tools.sdcard.SdCard.is_mounted():
 				await Historic.remove_older()
 				await Historic.extract()
+				await Ledger.load()
+				Ledger.save()
 		return True
 
 	@staticmethod
 	def start():
 		""" Start motion detection historic task """
 		tools.tasking.Tasks.create_monitor(Historic.task)
+		tools.tasking.Tasks.create_monitor(Historic.writer)
 
 	@staticmethod
 	async def test():
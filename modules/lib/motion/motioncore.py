@@ -66,6 +66,33 @@ class MotionConfig(tools.jsonconfig.JsonConfig):
 		# Empty mask is equal disable masking
 		self.mask = b""
 
+		# Compare each image only with the background reference instead of all previous images
+		self.background_detection = False
+
+		# Minimal delay in ms between two captures, used when a motion is in progress
+		self.polling_min = 10
+
+		# Maximal delay in ms between two captures, reached slowly when the scene stays quiet
+		self.polling_max = 300
+
+		# Maximal number of motion images waiting to be saved on the sd card
+		self.save_queue = 3
+
+		# Motion image lost when the saving queue is full : b"oldest", b"newest" or b"lowest" (lowest differences)
+		self.save_drop = b"oldest"
+
+		# Save a thumbnail built from each motion image, used by the historic page.
+		# Its building is slow on the device, it is done when no motion waits to be saved
+		self.thumbnail = False
+
+def compile_mask(mask):
+	""" Get the mask for the firmware, one byte per square where b"/" ignores the square, empty when nothing is masked.
+	The firmware compiles it into a bitmap when it is configured, and skips the masked squares with a bitwise operation """
+	mask = tools.strings.tobytes(mask)
+	if not b"/" in mask:
+		mask = b""
+	return mask
+
 class ImageMotion:
 	""" Class managing a motion detection image """
 	baseIndex = [0]
@@ -97,6 +124,7 @@ class ImageMotion:
 		if self.created[0] >= 32:
 			print("Destroy %d"%self.created[0])
 		if self.motion:
+			video.video.Snapshot.release(self.motion)
 			self.motion.deinit()
 
 	def set_motion_id(self, motion_id = None):
@@ -136,8 +164,8 @@ class ImageMotion:
 		return result
 
 	async def save(self):
-		""" Save the image on sd card """
-		return await motion.historic.Historic.add_motion(tools.strings.tostrings(self.path), self.get_filename(), self.motion.get_image(), self.get_informations())
+		""" Queue the image to save on sd card, the thumbnail is built from the image by the historic writer """
+		return await motion.historic.Historic.add_motion(tools.strings.tostrings(self.path), self.get_filename(), self.motion.get_image(), self.get_informations(), self.config.notify, self.config.thumbnail)
 
 	def compare(self, previous):
 		""" Compare two motion images to get differences """
@@ -190,9 +218,8 @@ class ImageMotion:
 	def refresh_config(self):
 		""" Refresh the motion detection configuration """
 		if self.motion is not None:
-			mask = tools.strings.tobytes(self.config.mask)
-			if not b"/" in mask:
-				mask = b""
+			# The mask is compiled by the firmware when the configuration changes, the masked squares are skipped during each comparison
+			mask = compile_mask(self.config.mask)
 			errorLight = tools.linearfunction.get_fx(self.config.sensitivity, tools.linearfunction.get_linear(100,8,0,64))
 			self.motion.configure(\
 				{
@@ -231,10 +258,74 @@ class SnapConfig:
 		self.diff_y = self.height // self.square_y
 		self.max = self.diff_x * self.diff_y
 
+class ImageRing:
+	""" Fixed size ring buffer of motion images, the index 0 is the most recent image """
+	def __init__(self, size):
+		""" Constructor """
+		self.slots = [None]*size
+		self.size  = size
+		self.head  = 0
+		self.count = 0
+
+	def __len__(self):
+		""" Number of images in the ring """
+		return self.count
+
+	def get(self, index):
+		""" Get the image at index, 0 is the most recent """
+		return self.slots[(self.head - index) % self.size]
+
+	def push(self, image):
+		""" Add the most recent image, the ring must not be full """
+		self.head = (self.head + 1) % self.size
+		self.slots[self.head] = image
+		self.count += 1
+
+	def pop(self):
+		""" Remove and return the oldest image """
+		result = None
+		if self.count > 0:
+			position = (self.head - self.count + 1) % self.size
+			result = self.slots[position]
+			self.slots[position] = None
+			self.count -= 1
+		return result
+
+	def contains(self, image):
+		""" Indicates if the image is in the ring """
+		for index in range(self.count):
+			if self.get(index) is image:
+				return True
+		return False
+
+	def resize(self, size):
+		""" Change the size of ring, return the oldest images which no longer fit """
+		removed = []
+		if size != self.size and size > 0:
+			while self.count > size:
+				removed.append(self.pop())
+			images = [self.get(index) for index in range(self.count)]
+			self.slots = [None]*size
+			self.size  = size
+			self.head  = 0
+			self.count = 0
+			while len(images) > 0:
+				self.push(images.pop())
+		return removed
+
+	def clear(self):
+		""" Remove all images, the slots stay allocated """
+		for index in range(self.size):
+			self.slots[index] = None
+		self.head  = 0
+		self.count = 0
+
 class MotionCore:
 	""" Class to manage the motion capture """
 	def __init__(self, config= None, pir_detection=False):
-		self.images = []
+		if config is None:
+			config = MotionConfig()
+		self.images = ImageRing(config.max_motion_images)
 		self.index  = 0
 		self.config = config
 		self.pir_detection = pir_detection
@@ -243,6 +334,7 @@ class MotionCore:
 		self.quality = 15
 		self.previous_quality = 0
 		self.flash_level = 0
+		self.motion_ids = 0
 
 	def __del__(self):
 		""" Destructor """
@@ -250,10 +342,11 @@ class MotionCore:
 
 	def cleanup(self):
 		""" Clean up all images """
-		for image in self.images:
+		for index in range(len(self.images)):
+			image = self.images.get(index)
 			if id(image) != id(self.image_background):
 				image.deinit()
-		self.images = []
+		self.images.clear()
 		if self.image_background:
 			self.image_background.deinit()
 		self.image_background = None
@@ -310,33 +403,55 @@ class MotionCore:
 	async def capture(self):
 		""" Capture motion image """
 		result = None
+		# If the size of historic changed
+		if self.must_refresh_config:
+			for image in self.images.resize(self.config.max_motion_images):
+				# The images which no longer fit are saved if a motion was detected on them
+				await self.save_image(image)
+				self.deinit_image(image)
+
 		# If enough image taken
 		if len(self.images) >= self.config.max_motion_images:
 			# Get older image
 			image = self.images.pop()
 
-			# If motion detected on image, on battery the first five images are sent
-			if image.get_motion_detected() or (self.pir_detection and image.index <= 3):
-				# Notification of motion
-				result = (image.get_message(), image)
-
-				# Save image to sdcard
-				if await image.save() is False:
-					server.notifier.Notifier.notify(topic=tools.topic.information, message=tools.lang.failed_to_save, enabled=self.config.notify)
-			else:
+			result = await self.save_image(image)
+			if result is None:
 				# Destroy image
 				self.deinit_image(image)
 
-		motion_ = video.video.Camera.motion()
+		motion_ = await video.video.Camera.amotion()
+		if motion_ is not None:
+			# The image is copied only if a snapshot is requested
+			video.video.Snapshot.set_source(motion_)
 		self.manage_flash(motion_)
 		image = ImageMotion(motion_, self.config)
 		if self.must_refresh_config:
 			image.refresh_config()
 			self.must_refresh_config = False
-		self.images.insert(0, image)
+		self.images.push(image)
 		self.index += 1
 		return result
 
+	async def save_image(self, image):
+		""" Save the image on the sd card if a motion was detected on it, returns the notification of motion or None """
+		result = None
+		# If motion detected on image, on battery the first five images are sent
+		if image.get_motion_detected() or (self.pir_detection and image.index <= 3):
+			# Notification of motion
+			result = (image.get_message(), image)
+
+			# Save image to sdcard
+			if await image.save() is False:
+				server.notifier.Notifier.notify(topic=tools.topic.information, message=tools.lang.failed_to_save, enabled=self.config.notify)
+		return result
+
+	def get_current(self):
+		""" Get the last image captured """
+		if len(self.images) > 0:
+			return self.images.get(0)
+		return None
+
 	def stop_light(self):
 		""" Stop the light """
 		# If flash led working and compensation disabled
@@ -369,6 +484,18 @@ class MotionCore:
 				return True
 		return False
 
+	def is_approaching(self):
+		""" Indicates if the last images approach a motion detection """
+		# If the history contains images different from the others
+		if self.motion_ids >= 2:
+			return True
+		current = self.get_current()
+		if current is not None:
+			# If the differences approach the detection threshold
+			if current.get_diff_count() * 2 >= self.config.differences_detection:
+				return True
+		return False
+
 	def adjust_quality(self, current):
 		""" Adjust the image quality according to the size of image (the max possible is 64K) """
 		if len(self.images) >= self.config.max_motion_images:
@@ -393,45 +520,22 @@ class MotionCore:
 		""" Compare all images captured and search differences """
 		differences = {}
 		if len(self.images) >= 2:
-			current = self.images[0]
+			current = self.images.get(0)
 
 			self.adjust_quality(current)
 
 			# Compute the motion identifier
-			for previous in self.images[1:]:
-				# # If image not already compared
-				comparison = current.compare(previous)
-
-				# If camera not stabilized
-				if self.is_stabilized() is False:
-					# Reject the differences
-					current.reset_differences()
-					break
-
-				# If image is too dark
-				if current.motion.get_light() <= 20:
-					# Reuse the motion identifier
-					current.set_motion_id(previous.motion_id)
-					break
-
-				# If image seem equal to previous
-				if not self.is_detected(comparison):
-					# Reuse the motion identifier
-					current.set_motion_id(previous.motion_id)
-					break
+			if self.config.background_detection:
+				self.compare_background(current)
 			else:
-				# Create new motion id
-				current.set_motion_id()
-
-				# Compare the image with the background if existing and extract modification
-				if self.image_background is not None:
-					comparison = current.compare(self.image_background)
+				self.compare_history(current)
 
 			# Compute the list of differences
 			diffs = b""
 			index = 0
 			mean_light = -1
-			for image in self.images:
+			for position in range(len(self.images)):
+				image = self.images.get(position)
 				if mean_light == -1:
 					mean_light = image.motion.get_light()
 				differences.setdefault(image.get_motion_id(), []).append(image.get_motion_id())
@@ -451,10 +555,76 @@ class MotionCore:
 					sys.stdout.write(line.decode("utf8"))
 		return differences
 
+	def compare_history(self, current):
+		""" Compare the current image with the previous images until a similar one is found """
+		for index in range(1, len(self.images)):
+			previous = self.images.get(index)
+			# # If image not already compared
+			comparison = current.compare(previous)
+
+			# If camera not stabilized
+			if self.is_stabilized() is False:
+				# Reject the differences
+				current.reset_differences()
+				break
+
+			# If image is too dark
+			if current.motion.get_light() <= 20:
+				# Reuse the motion identifier
+				current.set_motion_id(previous.motion_id)
+				break
+
+			# If image seem equal to previous
+			if not self.is_detected(comparison):
+				# Reuse the motion identifier
+				current.set_motion_id(previous.motion_id)
+				break
+		else:
+			# Create new motion id
+			current.set_motion_id()
+
+			# Compare the image with the background if existing and extract modification
+			if self.image_background is not None:
+				comparison = current.compare(self.image_background)
+
+	def compare_background(self, current):
+		""" Compare the current image only once with the background reference """
+		previous = self.images.get(1)
+
+		# If camera not stabilized, the images cannot become the reference
+		if self.is_stabilized() is False:
+			# Reject the differences
+			current.reset_differences()
+			return
+
+		# If no background, the previous image becomes the reference
+		if self.image_background is None:
+			self.image_background = previous
+		if self.image_background.get_motion_id() is None:
+			self.image_background.set_motion_id()
+
+		comparison = current.compare(self.image_background)
+
+		# If image is too dark
+		if current.motion.get_light() <= 20:
+			# Reuse the motion identifier
+			current.set_motion_id(previous.motion_id)
+		# If image seem equal to background
+		elif not self.is_detected(comparison):
+			# Reuse the background identifier
+			current.set_motion_id(self.image_background.motion_id)
+		# If the motion continues on the previous image
+		elif previous.motion_id is not None and previous.motion_id != self.image_background.motion_id:
+			# Reuse the motion identifier
+			current.set_motion_id(previous.motion_id)
+		else:
+			# Create new motion id
+			current.set_motion_id()
+
 	def deinit_image(self, image):
 		""" Release image allocated """
 		if image:
-			if not image in self.images:
+			if not self.images.contains(image):
 				if image != self.image_background:
 					image.deinit()
 
@@ -465,6 +635,7 @@ class MotionCore:
 
 		# Compute the list of differences
 		differences = self.compare(display)
+		self.motion_ids = len(differences)
 
 		# Too many differences found
 		if len(list(differences.keys())) >= self.config.threshold_motion:
@@ -472,9 +643,11 @@ class MotionCore:
 			change_polling = True
 		# If no differences
 		elif len(list(differences.keys())) == 1:
-			image = self.image_background
-			self.image_background = self.images[0]
-			self.deinit_image(image)
+			# The background is refreshed only with images taken after the camera stabilization
+			if self.is_stabilized():
+				image = self.image_background
+				self.image_background = self.images.get(0)
+				self.deinit_image(image)
 			detected = False
 		# If not enough differences
 		elif len(list(differences.keys())) <= self.config.threshold_glitch:
@@ -492,7 +665,8 @@ class MotionCore:
 
 		if detected:
 			# Mark all motion images
-			for image in self.images:
+			for index in range(len(self.images)):
+				image = self.images.get(index)
 				# If image seem not equal to previous
 				if self.is_detected(image.get_comparison()):
 					image.set_motion_detected()
@@ -503,13 +677,14 @@ class Detection:
 	def __init__(self, pir_detection):
 		""" Constructor """
 		self.pir_detection = pir_detection
-		self.load_config()
 		self.motion = None
 
+		# With the PIR, the first captures are taken quickly after the wake up
 		if self.pir_detection is True:
-			self.polling_frequency = 3
+			self.scheduler = PollingScheduler(delay=3)
 		else:
-			self.polling_frequency = 100
+			self.scheduler = PollingScheduler(delay=100)
+		self.load_config()
 		self.detection = None
 		self.activated = None
 		self.refresh_config_counter = 0
@@ -522,6 +697,8 @@ class Detection:
 		# Open motion configuration
 		self.motion_config      = MotionConfig()
 		self.motion_config.load_create()
+		self.scheduler.configure(self.motion_config.polling_min, self.motion_config.polling_max)
+		motion.historic.Historic.set_queue(self.motion_config.save_queue, self.motion_config.save_drop)
 		self.webhook_config      = server.webhook.WebhookConfig()
 		self.webhook_config.load_create()
 
@@ -531,6 +708,8 @@ class Detection:
 			# If configuration changed
 			if self.motion_config.refresh():
 				tools.logger.syslog("Change motion config %s"%self.motion_config.to_string(), display=False)
+				self.scheduler.configure(self.motion_config.polling_min, self.motion_config.polling_max)
+				motion.historic.Historic.set_queue(self.motion_config.save_queue, self.motion_config.save_drop)
 				if self.motion:
 					self.motion.refresh_config()
 			# If configuration changed
@@ -656,7 +835,7 @@ class Detection:
 
 		# If camera not stabilized speed start
 		if self.motion and self.motion.is_stabilized() is True:
-			await tools.tasking.Tasks.wait_resume(duration=tools.tasking.Tasks.get_slow_ratio() * self.polling_frequency, name="motion")
+			await tools.tasking.Tasks.wait_resume(duration=self.scheduler.get_delay(), name="motion")
 
 		try:
 			# Waits for the camera's availability
@@ -664,6 +843,9 @@ class Detection:
 
 			# If reserved
 			if reserved:
+				# The time spent waiting the camera is not counted
+				self.scheduler.begin()
+
 				# Initialize motion detection
 				await self.init_motion()
 
@@ -699,15 +881,9 @@ class Detection:
 				# Detect motion
 				detected, change_polling = self.motion.detect()
 
-				# If motion found
-				if change_polling is True:
-					# Speed up the polling frequency
-					self.polling_frequency = 10
-					motion.historic.Historic.set_motion_state(True)
-				else:
-					# Slow down the polling frequency
-					self.polling_frequency = 50
-					motion.historic.Historic.set_motion_state(False)
+				# Adapt the polling frequency to the activity of the scene
+				self.scheduler.end(change_polling, self.motion.is_approaching())
+				motion.historic.Historic.set_motion_state(change_polling)
 				result = True
 			else:
 				if self.last_notification_suspended + 120 < int(time.time()):
@@ -720,6 +896,79 @@ class Detection:
 				await video.video.Camera.unreserve(self)
 		return result
 
+class PollingScheduler:
+	""" Adapts the delay between two motion captures to the activity of the scene.
+	The delay is shortened as soon as the differences approach a detection,
+	and it is lengthened slowly while the scene stays quiet, to give the time back to the other tasks """
+	instance = [None]
+	def __init__(self, minimum=10, maximum=300, delay=100):
+		""" Constructor """
+		self.minimum  = minimum
+		self.maximum  = maximum
+		self.delay    = delay
+		self.started  = 0
+		self.captures = 0
+		self.busy     = 0
+		self.window   = tools.strings.ticks()
+		self.rate     = 0.
+		self.budget   = 0
+		PollingScheduler.instance[0] = self
+
+	def configure(self, minimum, maximum):
+		""" Set the bounds of delay in ms, a start delay lower than the minimum is kept until the first detection """
+		self.minimum = max(1, minimum)
+		self.maximum = max(self.minimum, maximum)
+		self.delay   = min(self.delay, self.maximum)
+
+	def get_delay(self):
+		""" Get the delay in ms before the next capture """
+		return self.delay * tools.tasking.Tasks.get_slow_ratio()
+
+	def begin(self):
+		""" Called before the capture """
+		self.started = tools.strings.ticks()
+
+	def end(self, change_polling, approaching):
+		""" Called after the detection, to compute the next delay """
+		now = tools.strings.ticks()
+		self.busy += tools.strings.ticks_diff(now, self.started)
+		self.captures += 1
+
+		# If motion found
+		if change_polling:
+			self.delay = self.minimum
+		# If the differences approach a detection
+		elif approaching:
+			self.delay = max(self.minimum, self.delay // 2)
+		# If the scene is quiet
+		else:
+			self.delay = max(self.minimum, min(self.maximum, self.delay + (self.delay >> 3) + 1))
+
+		# Compute the effective rate every 10 seconds
+		elapsed = tools.strings.ticks_diff(now, self.window)
+		if elapsed >= 10000:
+			self.rate   = (self.captures * 1000) / elapsed
+			self.budget = (self.busy * 100) // elapsed
+			self.window   = now
+			self.captures = 0
+			self.busy     = 0
+
+	def get_rate(self):
+		""" Get the effective number of captures per second """
+		return self.rate
+
+	def get_budget(self):
+		""" Get the percentage of time spent to capture and detect """
+		return self.budget
+
+	@staticmethod
+	def get_status():
+		""" Get the status of the motion polling """
+		scheduler = PollingScheduler.instance[0]
+		if scheduler is None:
+			return b""
+		return b"%d ms, %.1f/s, %d%%"%(scheduler.delay, scheduler.get_rate(), scheduler.get_budget())
+
 class MovingCounters:
 	""" Manages an event counter with a history """
 	def __init__(self, proof, step):
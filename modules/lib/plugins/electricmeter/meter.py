@@ -7,6 +7,7 @@ import collections
 import uasyncio
 import machine
 import server.notifier
+import server.events
 import plugins.electricmeter.config
 import plugins.electricmeter.lang
 import tools.filesystem
@@ -39,6 +40,8 @@ BACKUP_DIRECTORY = PULSE_DIRECTORY + "/backup"
 PULSE_HOURLY   = ".hourly"
 PULSE_DAILY    = ".daily"
 PULSE_MONTHLY  = ".monthly"
+POWER_TOPIC    = "electricmeter/power"
+POWER_EVENT    = 5
 
 def get_pulse_directory():
 	""" Return the root of pulse directory """
@@ -144,6 +147,7 @@ class HourlyCounter:
 		self.watt_hour = 0
 		self.previous_pulse_time = None
 		self.day_pulses_counter = 0
+		self.last_event = 0
 		self.pulse_sensor = PulseSensor(gpio)
 		tools.system.add_action(self.action_before_reboot)
 
@@ -183,6 +187,11 @@ class HourlyCounter:
 				self.pulses = self.load(day)
 				self.day = day
 
+		# Send the instant power to the browsers, at most every few seconds
+		if len(pulses) > 0 and time.time() >= self.last_event + POWER_EVENT:
+			self.last_event = time.time()
+			server.events.Events.publish(POWER_TOPIC, "%d"%self.watt_hour)
+
 		# Each ten minutes
 		if time.time() > (self.last_save + 1801):
 			# Save pulses file
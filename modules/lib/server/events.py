@@ -0,0 +1,100 @@
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+# pylint:disable=consider-using-f-string
+""" Live events of the device (motion, presence, camera, plugins) sent to the browsers with server-sent events.
+The events are formatted once when published, and kept in a ring shared by all clients.
+Each client has only a cursor in the ring, a client too slow loses its oldest events. """
+import json
+import uasyncio
+import tools.strings
+
+EVENTS_SIZE = 16
+MAX_CLIENTS = 4
+HEARTBEAT   = 15
+
+class Events:
+	""" Publisher of the live events """
+	ring     = []
+	last_id  = [0]
+	clients  = [0]
+	dropped  = [0]
+	event    = [None]
+
+	@staticmethod
+	def publish(topic, value=None, message=None):
+		""" Publish an event to all clients connected """
+		data = {}
+		if value is not None:
+			data["value"] = tools.strings.tostrings(value)
+		if message is not None:
+			data["message"] = tools.strings.tostrings(message)
+		Events.last_id[0] += 1
+		Events.ring.append(b"id: %d\nevent: %s\ndata: %s\n\n"%(Events.last_id[0], tools.strings.tobytes(topic), tools.strings.tobytes(json.dumps(data, separators=(",", ":")))))
+		if len(Events.ring) > EVENTS_SIZE:
+			del Events.ring[0]
+		# Wake up all clients waiting, the clients not waiting see the event with their cursor
+		if Events.event[0] is not None:
+			Events.event[0].set()
+			Events.event[0].clear()
+
+	@staticmethod
+	def get_cursor(last_event_id=None):
+		""" Get the cursor of new client, a client which reconnects receives the events missed if they are still in the ring """
+		try:
+			if last_event_id is not None:
+				cursor = int(last_event_id)
+				if cursor <= Events.last_id[0]:
+					return cursor
+		except ValueError:
+			pass
+		return Events.last_id[0]
+
+	@staticmethod
+	def get(cursor):
+		""" Get the events published after the cursor, returns the events and the new cursor """
+		first_id = Events.last_id[0] - len(Events.ring) + 1
+		if cursor + 1 < first_id:
+			# The client was too slow, the oldest events are lost
+			Events.dropped[0] += first_id - cursor - 1
+			cursor = first_id - 1
+		return Events.ring[len(Events.ring) - (Events.last_id[0] - cursor):], Events.last_id[0]
+
+	@staticmethod
+	async def wait(timeout):
+		""" Wait the next event, returns False if no event was published before the timeout """
+		if Events.event[0] is None:
+			Events.event[0] = uasyncio.Event()
+		try:
+			await uasyncio.wait_for(Events.event[0].wait(), timeout)
+			return True
+		except uasyncio.TimeoutError:
+			return False
+
+	@staticmethod
+	def is_full():
+		""" Indicates if the maximum of clients is reached, each client keeps its connection open """
+		return Events.clients[0] >= MAX_CLIENTS
+
+	@staticmethod
+	async def send(stream, last_event_id=None):
+		""" Send the events to the client until the connection is closed """
+		Events.clients[0] += 1
+		try:
+			cursor = Events.get_cursor(last_event_id)
+			await stream.write(b"retry: 5000\n\n")
+			while True:
+				events, cursor = Events.get(cursor)
+				if len(events) > 0:
+					await stream.writev(events)
+				elif await Events.wait(HEARTBEAT) is False:
+					# The comment keeps the connection open and detects the clients disconnected
+					await stream.write(b": heartbeat\n\n")
+		except OSError:
+			pass
+		finally:
+			Events.clients[0] -= 1
+
+	@staticmethod
+	def get_status():
+		""" Get the counters of events """
+		return {"clients":Events.clients[0], "published":Events.last_id[0], "dropped":Events.dropped[0]}
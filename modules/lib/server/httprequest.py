@@ -11,10 +11,13 @@ It may sound a bit more complicated, but it's a lot quick.
 """
 import hashlib
 import time
+import uos
 from binascii import hexlify, b2a_base64
 import collections
 import server.stream
 import server.urlparser
+import server.timesetting
+import tools.date
 import tools.logger
 import tools.filesystem
 import tools.strings
@@ -51,6 +54,14 @@ MIMES = {\
 	b".bin"   : b"application/octet-stream"
 }
 
+class HttpError(Exception):
+	""" Http error, the request is answered with the status """
+	# pylint:disable=super-init-not-called
+	def __init__(self, status, message=b""):
+		""" Http error constructor """
+		self.status  = status
+		self.message = message
+
 class Http:
 	""" Http request or reponse """
 	def __init__(self, request = True, remoteaddr= b"", port = 0, name=""):
@@ -70,6 +81,13 @@ class Http:
 		self.identifier = None
 		self.request    = request
 		self.chunk_size = 0
+		self.version    = b"HTTP/1.0"
+		# Length of the content not yet read in the stream
+		self.pending    = 0
+		self.chunked    = False
+		# Limits of the header size and content read before routing, None without limit
+		self.max_header  = None
+		self.max_content = None
 
 	def __del__(self):
 		if self.content_file is not None:
@@ -160,6 +178,8 @@ class Http:
 			if len(spl) >= 2:
 				self.method = urlparser.method
 				path = spl[1]
+				if len(spl) >= 3:
+					self.version = spl[2]
 				if self.request is False:
 					self.status = path
 				self.path   = urlparser.path
@@ -207,25 +227,27 @@ class Http:
 					print("  %d%% received"%(length_read*100 // length))
 			print("End upload reception")
 
-	def get_content_filename(self):
-		""" Copy the content into file """
-		if self.content is not None:
-			self.content_file = "%d.tmp"%id(self)
-			with open(self.content_file, "wb") as content:
-				content.write(self.content)
-			self.content = None
-		return self.content_file
-
 	async def unserialize_headers(self, streamio):
 		""" Extract http header """
+		size = 0
 		while True:
 			header = await streamio.readline()
+			size += len(header)
+			if self.max_header is not None and size > self.max_header:
+				raise HttpError(b"413", b"Header too large")
 			if header == b"\r\n":
 				if self.method == b"POST":
+					if self.max_content is not None and int(self.headers.get(b"Content-Length",b"0")) > self.max_content:
+						raise HttpError(b"413", b"Payload too large")
 					await self.read_content(streamio)
 					self.params = server.urlparser.UrlParser.parse_params(self.content)
-				elif self.request is False or self.method == b"PUT":
+				elif self.request is False:
 					await self.read_content(streamio)
+				elif self.method == b"PUT":
+					# The content is read by the route, it goes straight to its destination
+					self.chunked = self.headers.get(b"Transfer-Encoding",b"") == b"chunked"
+					if self.chunked is False:
+						self.pending = int(self.headers.get(b"Content-Length",b"0"))
 				break
 			name, value = header.split(b":", 1)
 			if name == b"Cookie":
@@ -236,14 +258,23 @@ class Http:
 			else:
 				self.headers[name] = value.strip()
 
+	def set_framing(self):
+		""" Set the headers which delimit the content, returns True if the content must be chunked """
+		return False
+
 	async def serialize(self, streamio, page=None):
 		""" Serialize request or response in the stream """
+		chunked = self.set_framing()
+		if chunked:
+			streamio = server.stream.Chunkedio(streamio)
 		io = server.stream.Bufferedio(streamio)
 		result = await self.serialize_header(io)
 		result += await self.serialize_body(io)
 		if page:
 			await page.write(io)
 		await io.close()
+		if chunked:
+			await streamio.close()
 		return result
 
 	async def serialize_header(self, streamio):
@@ -367,10 +398,32 @@ class ContentFile:
 		self.base64 = base64
 		if content_type is None:
 			global MIMES
-			ext = tools.filesystem.splitext(tools.strings.tostrings(self.filenames[0]))[1]
+			name = tools.strings.tostrings(self.filenames[0])
+			# The type of a compressed file is the type of its original file
+			if name[-3:] == ".gz":
+				name = name[:-3]
+			ext = tools.filesystem.splitext(name)[1]
 			self.content_type = MIMES.get(tools.strings.tobytes(ext),b"text/plain")
 		else:
 			self.content_type = content_type
+		self.range = None
+
+	def get_info(self):
+		""" Get the size and the modification time of file, or None if the file not exists or if there are several files """
+		result = None
+		if len(self.filenames) == 1:
+			try:
+				stat = uos.stat(tools.strings.tostrings(self.filenames[0]))
+				# If it is not a directory
+				if stat[0] & 0x4000 == 0:
+					result = stat[6], stat[8]
+			except OSError:
+				pass
+		return result
+
+	def set_range(self, start, length):
+		""" Select the part of file to send """
+		self.range = (start, length)
 
 	async def serialize_file(self, filename, streamio):
 		""" Serialize the content of file named filename """
@@ -389,9 +442,13 @@ class ContentFile:
 				else:
 					step = 512
 				buf = bytearray(step)
-				f.seek(0,2)
-				size = f.tell()
-				f.seek(0)
+				if self.range is None:
+					f.seek(0,2)
+					size = f.tell()
+					f.seek(0)
+				else:
+					f.seek(self.range[0])
+					size = self.range[1]
 
 				if self.base64 and step % 3 != 0:
 					step = (step//3)*3
@@ -527,6 +584,115 @@ class PartBin(PartFile):
 		fileSize = len(self.binary)
 		return headerSize + fileSize + 4 + len(identifier) + 2
 
+class MultipartParser:
+	""" Incremental parser of multipart/form-data content, the parts are split as the blocks are received.
+	Only the end of block which can contain the beginning of the next boundary is kept in memory """
+	PREAMBLE = 0
+	BOUNDARY = 1
+	HEADER   = 2
+	BODY     = 3
+	END      = 4
+	def __init__(self, boundary, open_part, max_part_size=None):
+		""" Constructor, open_part(name, filename, content_type) is called at the beginning of each part,
+		it returns the file where the part is written or None to ignore the part """
+		self.delimiter     = b"\r\n--" + boundary
+		self.buffer        = b"\r\n"
+		self.state         = MultipartParser.PREAMBLE
+		self.open_part     = open_part
+		self.max_part_size = max_part_size
+		self.part          = None
+		self.part_size     = 0
+
+	@staticmethod
+	def get_boundary(content_type):
+		""" Get the boundary of multipart/form-data content type, or None if the content is not multipart """
+		params = content_type.split(b";")
+		if params[0].strip().lower() == b"multipart/form-data":
+			for param in params[1:]:
+				if b"=" in param:
+					name, value = param.split(b"=", 1)
+					if name.strip().lower() == b"boundary":
+						return value.strip().strip(b'"')
+		return None
+
+	def is_ended(self):
+		""" Indicates if the last boundary was received """
+		return self.state == MultipartParser.END
+
+	def begin(self, header):
+		""" Parse the header of part and open it """
+		name = filename = content_type = None
+		for line in header.split(b"\r\n"):
+			if b":" in line:
+				key, value = line.split(b":", 1)
+				key = key.strip().lower()
+				if key == b"content-disposition":
+					for param in value.split(b";")[1:]:
+						if b"=" in param:
+							param_name, param_value = param.split(b"=", 1)
+							param_name = param_name.strip().lower()
+							if param_name == b"name":
+								name = param_value.strip().strip(b'"')
+							elif param_name == b"filename":
+								filename = param_value.strip().strip(b'"')
+				elif key == b"content-type":
+					content_type = value.strip()
+		self.part_size = 0
+		self.part = self.open_part(name, filename, content_type)
+
+	def write(self, data):
+		""" Write the data in the current part, returns False if the part exceeds the max size """
+		self.part_size += len(data)
+		if self.max_part_size is not None and self.part_size > self.max_part_size:
+			return False
+		if self.part is not None and len(data) > 0:
+			self.part.write(data)
+		return True
+
+	def feed(self, data):
+		""" Parse the block received, returns False if a part exceeds the max size """
+		self.buffer = self.buffer + data if len(self.buffer) > 0 else data
+		while True:
+			if self.state == MultipartParser.PREAMBLE or self.state == MultipartParser.BODY:
+				pos = self.buffer.find(self.delimiter)
+				if pos == -1:
+					# The end of block can be the beginning of delimiter, it is kept for the next block
+					keep = len(self.buffer) - len(self.delimiter) + 1
+					if keep > 0:
+						if self.state == MultipartParser.BODY:
+							if self.write(memoryview(self.buffer)[:keep]) is False:
+								return False
+						self.buffer = self.buffer[keep:]
+					break
+				if self.state == MultipartParser.BODY:
+					if self.write(memoryview(self.buffer)[:pos]) is False:
+						return False
+					self.part = None
+				self.buffer = self.buffer[pos + len(self.delimiter):]
+				self.state = MultipartParser.BOUNDARY
+			elif self.state == MultipartParser.BOUNDARY:
+				if len(self.buffer) < 2:
+					break
+				if self.buffer[:2] == b"--":
+					self.state = MultipartParser.END
+				else:
+					self.state = MultipartParser.HEADER
+			elif self.state == MultipartParser.HEADER:
+				# The header starts with the end of boundary line
+				pos = self.buffer.find(b"\r\n\r\n")
+				if pos == -1:
+					if len(self.buffer) > 2048:
+						raise ValueError("Multipart header too long")
+					break
+				self.begin(self.buffer[:pos])
+				self.buffer = self.buffer[pos + 4:]
+				self.state = MultipartParser.BODY
+			else:
+				# The epilogue is ignored
+				self.buffer = b""
+				break
+		return True
+
 class HttpResponse(Http):
 	""" Http response send to web browser client """
 	def __init__(self, streamio, remoteaddr= b"", port = 0, name = ""):
@@ -534,6 +700,43 @@ class HttpResponse(Http):
 		Http.__init__(self, request=False, remoteaddr=remoteaddr, port=port, name=name)
 		self.chunk_size = 0
 		self.streamio = streamio
+		self.keep_alive = None
+		self.framed = False
+
+	def set_keep_alive(self, timeout, max_requests):
+		""" Keep the connection alive after the response, with the idle timeout and the number of requests remaining """
+		self.keep_alive = b"timeout=%d, max=%d"%(timeout, max_requests)
+
+	def close_connection(self):
+		""" Close the connection after the response, used when the content of request is not entirely read """
+		self.keep_alive = None
+
+	def is_keep_alive(self):
+		""" Indicates if the response was delimited and the connection can be reused """
+		return self.framed and self.keep_alive is not None
+
+	def set_framing(self):
+		""" Set the headers which delimit the content, returns True if the content must be chunked """
+		chunked = False
+		if self.framed is False:
+			self.framed = True
+			if self.keep_alive is not None:
+				if b"Transfer-Encoding" in self.headers:
+					# The page delimits itself its content (video streaming), the connection cannot be reused
+					self.keep_alive = None
+				else:
+					self.headers[b"Connection"] = b"keep-alive"
+					self.headers[b"Keep-Alive"] = self.keep_alive
+					# These status have no content, and the length of content is already known
+					if self.status not in (b"204", b"304") and b"Content-Length" not in self.headers:
+						self.headers[b"Transfer-Encoding"] = b"chunked"
+						chunked = True
+			if self.keep_alive is None:
+				self.headers[b"Connection"] = b"close"
+		else:
+			# Response serialized twice, the end of content is unknown
+			self.keep_alive = None
+		return chunked
 
 	async def send(self, content=None, status=b"200", headers=None):
 		""" Send response to client web browser """
@@ -564,9 +767,40 @@ class HttpResponse(Http):
 		""" Send ok to the client web browser """
 		return await self.send_error(status=b"200", content=content)
 
-	async def send_file(self, filename, mime_type=None, headers=None, base64=False):
-		""" Send a file to the client web browser """
-		return await self.send(content=ContentFile(filename, mime_type, base64), status=b"200", headers=headers)
+	async def send_not_modified(self, headers=None):
+		""" Send not modified to the client web browser, its cached content is always valid """
+		return await self.send(status=b"304", headers=headers)
+
+	async def send_file(self, filename, mime_type=None, headers=None, base64=False, request=None):
+		""" Send a file to the client web browser.
+		With the request, the file is sent with validators, not sent if the browser cache is valid and partially sent if a range is asked """
+		content = ContentFile(filename, mime_type, base64)
+		status = b"200"
+		info = content.get_info() if request is not None else None
+		if info is not None:
+			size, modified = info
+			headers = {} if headers is None else dict(headers)
+			etag = b'"%x-%x"'%(modified, size)
+			last_modified = tools.date.date_to_http(server.timesetting.local_to_utc(modified))
+			headers[b"ETag"]          = etag
+			headers[b"Last-Modified"] = last_modified
+			if request.is_not_modified(etag, last_modified):
+				return await self.send_not_modified(headers=headers)
+			# The range applies on the file, and not on its base64 encoding
+			if base64 is False:
+				headers[b"Accept-Ranges"] = b"bytes"
+				range_ = request.get_range(size, etag, last_modified)
+				if range_ == -1:
+					headers[b"Content-Range"] = b"bytes */%d"%size
+					return await self.send(status=b"416", headers=headers)
+				elif range_ is not None:
+					start, length = range_
+					content.set_range(start, length)
+					headers[b"Content-Range"] = b"bytes %d-%d/%d"%(start, start + length - 1, size)
+					size = length
+					status = b"206"
+				headers[b"Content-Length"] = b"%d"%size
+		return await self.send(content=content, status=status, headers=headers)
 
 	async def send_buffer(self, filename, buffer, mime_type=None, headers=None):
 		""" Send a file to the client web browser """
@@ -591,6 +825,158 @@ class HttpRequest(Http):
 		Http.__init__(self, request=True, remoteaddr=remoteaddr, port=port, name=name)
 		self.streamio    = streamio
 
+	def is_not_modified(self, etag, last_modified=None):
+		""" Indicates if the content cached by the browser is still valid, according to its entity tag or its date """
+		if_none_match = self.headers.get(b"If-None-Match", None)
+		if if_none_match is not None:
+			if if_none_match.strip() == b"*":
+				return True
+			for tag in if_none_match.split(b","):
+				tag = tag.strip()
+				if tag[:2] == b"W/":
+					tag = tag[2:]
+				if tag == etag:
+					return True
+			return False
+		if last_modified is not None:
+			if_modified_since = tools.date.http_to_date(self.headers.get(b"If-Modified-Since", b""))
+			modified = tools.date.http_to_date(last_modified)
+			if if_modified_since is not None and modified is not None:
+				return modified <= if_modified_since
+		return False
+
+	def is_gzip_accepted(self):
+		""" Indicates if the browser accepts the content compressed with gzip """
+		for encoding in self.headers.get(b"Accept-Encoding", b"").split(b","):
+			params = encoding.split(b";")
+			if params[0].strip() in (b"gzip", b"*"):
+				for param in params[1:]:
+					param = param.strip()
+					if param[:2] == b"q=":
+						try:
+							return float(param[2:]) > 0
+						except ValueError:
+							return False
+				return True
+		return False
+
+	def get_range(self, size, etag=None, last_modified=None):
+		""" Get the part asked (start, length), None for the whole content, or -1 if the range cannot be satisfied.
+		Only one range is supported, several ranges or an invalid range return the whole content """
+		value = self.headers.get(b"Range", None)
+		if value is None or value[:6] != b"bytes=" or b"," in value:
+			return None
+		# If the content changed since the first part, the whole content is sent
+		if_range = self.headers.get(b"If-Range", None)
+		if if_range is not None and if_range != etag and if_range != last_modified:
+			return None
+		try:
+			start, end = value[6:].split(b"-", 1)
+			start = start.strip()
+			end   = end.strip()
+			if start == b"":
+				# Suffix range, the last bytes of content
+				suffix = int(end)
+				if suffix <= 0:
+					return -1
+				start = max(size - suffix, 0)
+				end = size - 1
+			else:
+				start = int(start)
+				if end == b"":
+					end = size - 1
+				else:
+					end = int(end)
+					if start > end:
+						return None
+					end = min(end, size - 1)
+		except ValueError:
+			return None
+		if start >= size:
+			return -1
+		return start, end - start + 1
+
+	def is_keep_alive(self):
+		""" Indicates if the client accepts to reuse the connection, and if the content of request was entirely read """
+		result = False
+		if self.version == b"HTTP/1.1":
+			if self.headers.get(b"Connection", b"").lower() != b"close":
+				if self.headers.get(b"Transfer-Encoding", None) is None:
+					if self.method in (b"POST", b"PUT") or int(self.headers.get(b"Content-Length", b"0")) == 0:
+						result = True
+		return result
+
+	def is_content_pending(self):
+		""" Indicates if the content was not entirely read by the route, the connection cannot be reused """
+		return self.pending > 0 or self.chunked
+
+	async def read_block(self, length=1440):
+		""" Read the next block of the content not yet read, returns b"" at the end of content """
+		if self.pending == 0 and self.chunked:
+			if self.chunk_size > 0:
+				# End of line of the previous chunk
+				await self.streamio.readline()
+			self.chunk_size = int(tools.strings.tostrings((await self.streamio.readline()).split(b";")[0].strip()), 16)
+			self.pending = self.chunk_size
+			if self.chunk_size == 0:
+				# The trailer is ignored
+				while (await self.streamio.readline()) not in (b"\r\n", b""):
+					pass
+				self.chunked = False
+		if self.pending == 0:
+			return b""
+		data = await self.streamio.read(min(self.pending, length))
+		if data == b"":
+			# ECONNRESET
+			raise OSError(104, "Connection closed")
+		self.pending -= len(data)
+		return data
+
+	async def receive_file(self, filename, max_size=None):
+		""" Write the content of PUT request, or the first file of multipart/form-data content, straight into the file.
+		The reception stops as soon as the size exceeds max_size, returns the size written or None if the size is exceeded.
+		Raises ValueError if the content is malformed or incomplete """
+		boundary = MultipartParser.get_boundary(self.headers.get(b"Content-Type", b""))
+		if boundary is None and max_size is not None and self.pending > max_size:
+			return None
+		files = []
+		def open_part(name, filename_, content_type):
+			if filename_ is not None and len(files) == 0:
+				files.append(open(filename, "wb"))
+				return files[0]
+			return None
+
+		result = None
+		try:
+			if boundary is None:
+				parser = None
+				open_part(None, filename, None)
+			else:
+				parser = MultipartParser(boundary, open_part, max_size)
+			size = 0
+			while True:
+				data = await self.read_block()
+				if data == b"":
+					if parser is not None and parser.is_ended() is False:
+						raise ValueError("Multipart content incomplete")
+					if len(files) == 0:
+						raise ValueError("File missing")
+					result = files[0].tell()
+					break
+				if parser is None:
+					size += len(data)
+					if max_size is not None and size > max_size:
+						break
+					files[0].write(data)
+				elif parser.feed(data) is False:
+					break
+		finally:
+			if len(files) > 0:
+				files[0].close()
+				if result is None:
+					tools.filesystem.remove(filename)
+		return result
+
 	async def receive(self, streamio=None):
 		""" Receive request from client """
 		if streamio is None:
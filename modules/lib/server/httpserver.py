@@ -54,7 +54,9 @@ class HttpServerInstance(tools.tasking.ServerInstance):
 class HttpServer:
 	""" Http main class """
 	routes       = {}
-	wildroutes   = []
+	# Trie node of routes with regular expression : [children by path segment, [(compiled expression, route)]]
+	wildroutes   = [{}, []]
+	static_re    = [None]
 	menus        = []
 	www_dir      = None
 	pages        = []
@@ -107,7 +109,7 @@ class HttpServer:
 		For the server to know the pages, it must imperatively use this decorator """
 		def add_route(function):
 			if tools.strings.tobytes(url[-1]) == ord(b"*"):
-				HttpServer.wildroutes.append([tools.strings.tobytes(url),(function, kwargs)])
+				HttpServer.add_wildroute(url, (function, kwargs))
 			else:
 				kwargs["index"] = len(HttpServer.menus)
 				HttpServer.routes[tools.strings.tobytes(url)] = (function, kwargs)
@@ -118,6 +120,40 @@ class HttpServer:
 			return function
 		return add_route
 
+	@staticmethod
+	def get_segments(path):
+		""" Get the complete segments of the path, the last segment after the last slash is excluded """
+		return path.split("/")[1:-1]
+
+	@staticmethod
+	def add_wildroute(url, route):
+		""" Add a route with regular expression, it is compiled once and indexed by the fixed segments at the start of its path """
+		pattern = tools.strings.tostrings(url)
+		fixed = pattern
+		for i in range(len(pattern)):
+			if pattern[i] in ".*+?[](){}|\\^$":
+				fixed = pattern[:i]
+				break
+		node = HttpServer.wildroutes
+		for segment in HttpServer.get_segments(fixed):
+			node = node[0].setdefault(segment, [{}, []])
+		node[1].append((re.compile(pattern), route))
+
+	@staticmethod
+	def search_wildroute(path):
+		""" Search the route with regular expression, starting with the routes with the longest fixed path """
+		nodes = [HttpServer.wildroutes]
+		for segment in HttpServer.get_segments(path):
+			node = nodes[-1][0].get(segment, None)
+			if node is None:
+				break
+			nodes.append(node)
+		for node in reversed(nodes):
+			for expression, route in node[1]:
+				if expression.match(path):
+					return route
+		return None
+
 	@staticmethod
 	def remove_route(url=None):
 		""" Remove a route of html page """
@@ -171,13 +207,12 @@ class HttpServer:
 		else:
 			found = HttpServer.routes.get(request.path,None)
 			if found is None:
-				for route, func in HttpServer.wildroutes:
-					if re.match(tools.strings.tostrings(route), tools.strings.tostrings(request.path)):
-						found = func
-						break
+				path = tools.strings.tostrings(request.path)
+				found = HttpServer.search_wildroute(path)
 				if found is None:
-					staticRe = re.compile("^/("+tools.strings.tostrings(HttpServer.www_dir)+"/.+|.+)")
-					if staticRe.match(tools.strings.tostrings(request.path)):
+					if HttpServer.static_re[0] is None:
+						HttpServer.static_re[0] = re.compile("^/("+tools.strings.tostrings(HttpServer.www_dir)+"/.+|.+)")
+					if HttpServer.static_re[0].match(path):
 						function, args = HttpServer.static_pages, {}
 				else:
 					function, args = found
@@ -185,6 +220,18 @@ class HttpServer:
 				function, args = found
 		return function, args
 
+	@staticmethod
+	def is_compressed(path):
+		""" Indicates if the compressed copy of file exists and is not older than the file """
+		try:
+			original = tools.strings.tostrings(path)
+			compressed = original + ".gz"
+			if tools.filesystem.exists(compressed):
+				return tools.filesystem.filetime(compressed) >= tools.filesystem.filetime(original)
+		except OSError:
+			pass
+		return False
+
 	@staticmethod
 	async def static_pages(request, response, args):
 		""" Treat the case of static pages """
@@ -193,7 +240,18 @@ class HttpServer:
 		if b".." in path:
 			await response.send_error(status=b"403",content=b"Forbidden")
 		else:
-			await response.send_file(path, headers=request.headers)
+			# The minified libraries never change, the other files are revalidated with their entity tag
+			if b".min." in path:
+				headers = {b"Cache-Control":b"public, max-age=604800, immutable"}
+			else:
+				headers = {b"Cache-Control":b"no-cache"}
+			# If an up to date compressed copy of file exists, it is sent instead of the file
+			if HttpServer.is_compressed(path):
+				headers[b"Vary"] = b"Accept-Encoding"
+				if request.is_gzip_accepted():
+					headers[b"Content-Encoding"] = b"gzip"
+					path += b".gz"
+			await response.send_file(path, headers=headers, request=request)
 
 	@staticmethod
 	def init():
@@ -6,11 +6,77 @@
 """
 Http server core, it instanciated only if a connection is done to the asynchronous class HttpServer then if the server not used, it not consum memory
 """
+import uasyncio
 import server.httpserver
 import server.httprequest
 import server.stream
 import tools.logger
 
+class Admission:
+	""" Admission control of http requests, limits the number of requests treated at the same time.
+	The requests above the limit wait their turn in a queue, they are rejected when the queue is full """
+	instances = []
+	def __init__(self, name):
+		""" Constructor """
+		self.name     = name
+		self.active   = 0
+		self.waiters  = []
+		self.counters = {}
+		self.reset()
+		Admission.instances.append(self)
+
+	def reset(self):
+		""" Reset the counters """
+		for counter in ("requests","queued","rejected","too_large","timeout","memory","active_max","queued_max"):
+			self.counters[counter] = 0
+
+	def count(self, counter):
+		""" Increase the counter """
+		self.counters[counter] += 1
+
+	async def enter(self, config):
+		""" Wait a place to treat the request, returns False if the request is rejected """
+		self.count("requests")
+		if self.active < config.http_max_connections and len(self.waiters) == 0:
+			self.active += 1
+		elif len(self.waiters) >= config.http_max_queued:
+			self.count("rejected")
+			return False
+		else:
+			self.count("queued")
+			event = uasyncio.Event()
+			self.waiters.append(event)
+			self.counters["queued_max"] = max(self.counters["queued_max"], len(self.waiters))
+			try:
+				await uasyncio.wait_for(event.wait(), config.http_queue_timeout)
+			except uasyncio.TimeoutError:
+				# The place can be given just before the timeout
+				if event.is_set() is False:
+					self.waiters.remove(event)
+					self.count("rejected")
+					return False
+		self.counters["active_max"] = max(self.counters["active_max"], self.active)
+		return True
+
+	def leave(self):
+		""" Release the place of request, it is given to the first request waiting """
+		if len(self.waiters) > 0:
+			self.waiters.pop(0).set()
+		else:
+			self.active -= 1
+
+	def get_text(self):
+		""" Get the counters as text line """
+		return "%-12s active %d/%d, waiting %d/%d, requests %d, queued %d, rejected %d, too large %d, timeout %d, memory %d"%(self.name,
+			self.active, self.counters["active_max"], len(self.waiters), self.counters["queued_max"],
+			self.counters["requests"], self.counters["queued"], self.counters["rejected"],
+			self.counters["too_large"], self.counters["timeout"], self.counters["memory"])
+
+	@staticmethod
+	def get_texts():
+		""" Get the counters of all http servers """
+		return "\n".join([admission.get_text() for admission in Admission.instances])
+
 class HttpServerCore:
 	""" Http server core, it instanciated only if a connection is done to the asynchronous class HttpServer then
 	if the server not used, it not consum memory """
@@ -18,21 +84,69 @@ class HttpServerCore:
 		""" Constructor """
 		self.port = kwargs.get("port",80)
 		self.name = kwargs.get("name","HttpServer")
+		self.admission = Admission(self.name)
 
 	async def on_connection(self, reader, writer):
-		""" Asynchronous connection call back """
+		""" Asynchronous connection call back, the connection is kept alive for the next requests of client """
 		remoteaddr = writer.get_extra_info('peername')[0]
 		stream    = server.stream.Stream(reader, writer)
-		request   = server.httprequest.HttpRequest (stream, remoteaddr=remoteaddr, port=self.port, name=self.name)
+		server.httpserver.HttpServer.init()
+		idle_timeout = server.httpserver.HttpServer.config.http_idle_timeout
+		max_requests = server.httpserver.HttpServer.config.http_max_requests
+		try:
+			for remaining in range(max(max_requests, 1) - 1, -1, -1):
+				if await self.on_request(stream, remoteaddr, idle_timeout if remaining > 0 else 0, remaining) is False:
+					break
+				# Wait the next request of client
+				try:
+					if await uasyncio.wait_for(stream.peek(), idle_timeout) is False:
+						break
+				except uasyncio.TimeoutError:
+					break
+		finally:
+			await stream.close()
+
+	async def on_request(self, stream, remoteaddr, idle_timeout, remaining):
+		""" Treat one request, returns True if the connection can be reused """
+		config = server.httpserver.HttpServer.config
 		response  = server.httprequest.HttpResponse(stream, remoteaddr=remoteaddr, port=self.port, name=self.name)
+		if await self.admission.enter(config) is False:
+			# The request is not read, the connection is closed after the answer
+			response.set_header(b"Retry-After", b"%d"%config.http_queue_timeout)
+			await self.send_error(response, b"503", b"Service unavailable")
+			return False
+
+		request   = server.httprequest.HttpRequest (stream, remoteaddr=remoteaddr, port=self.port, name=self.name)
+		request.max_header  = config.http_max_header
+		request.max_content = config.http_max_content
+		admitted = True
+		result = False
 		try:
-			await request.receive()
+			try:
+				await uasyncio.wait_for(request.receive(), config.http_request_timeout)
+			except uasyncio.TimeoutError:
+				raise server.httprequest.HttpError(b"408", b"Request timeout")
+			if idle_timeout > 0 and request.is_keep_alive():
+				response.set_keep_alive(idle_timeout, remaining)
 			function, args = server.httpserver.HttpServer.search_route(request)
 			if function is None:
 				await response.send_not_found()
 			else:
+				if args.get("long_lived", False):
+					# The page keeps the connection open (events or video streaming), it must not block the other requests
+					self.admission.leave()
+					admitted = False
 				if await server.httpserver.HttpServer.is_logged(request, response):
 					await function(request, response, args)
+			# The content not read by the route is still in the stream, the connection cannot be reused
+			result = response.is_keep_alive() and request.is_content_pending() is False
+		except server.httprequest.HttpError as err:
+			self.admission.count("timeout" if err.status == b"408" else "too_large")
+			await self.send_error(response, err.status, err.message)
+		except MemoryError as err:
+			self.admission.count("memory")
+			tools.logger.syslog(err)
+			await self.send_error(response, b"503", b"Service unavailable")
 		except OSError as err:
 			# If ECONNRESET or ENOTCONN
 			if err.args[0] == 104 or err.args[0] == 128:
@@ -44,4 +158,17 @@ class HttpServerCore:
 			tools.logger.syslog(err)
 			await response.send_not_found(err)
 		finally:
-			await stream.close()
+			if admitted:
+				self.admission.leave()
+		return result
+
+	async def send_error(self, response, status, message):
+		""" Answer the request which cannot be treated, the connection is closed after the answer """
+		try:
+			response.close_connection()
+			await response.send_error(status=status, content=message)
+		except OSError:
+			# The client has already closed the connection
+			pass
+		except Exception as err:
+			tools.logger.syslog(err)
@@ -8,6 +8,7 @@ import wifi.wifi
 import wifi.station
 import server.wanip
 import server.httpclient
+import server.events
 import tools.logger
 import tools.strings
 import tools.tasking
@@ -113,6 +114,9 @@ class Notifier:
 
 		tools.logger.syslog("Notification %s %s"%(message, "" if enabled else "not sent"), display=display)
 
+		# The live status of device is sent to the browsers, even if the notification is disabled
+		server.events.Events.publish(kwargs.get("topic",tools.topic.information), kwargs.get("value",None), kwargs.get("message",None))
+
 		if enabled or forced:
 			# If postponed message list too long
 			if len(Notifier.postponed) > 10:
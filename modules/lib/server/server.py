@@ -16,6 +16,17 @@ class ServerConfig(tools.jsonconfig.JsonConfig):
 		self.wanip = True
 		self.notify = True
 		self.mqtt_broker = True
+		# Idle timeout in seconds of http persistent connections, 0 to close the connection after each request
+		self.http_idle_timeout = 5
+		self.http_max_requests = 20
+		# Http requests treated at the same time, the others wait in queue or are rejected with 503 when the queue is full
+		self.http_max_connections = 4
+		self.http_max_queued = 6
+		self.http_queue_timeout = 10
+		# Limits of each http request, answered with 413 (size in bytes) or 408 (duration in seconds to receive the request)
+		self.http_max_header = 4096
+		self.http_max_content = 32768
+		self.http_request_timeout = 10
 		if tools.filesystem.ismicropython():
 			self.server_postponed = 7
 		else:
@@ -11,39 +11,69 @@ class Stream:
 	def __init__(self, reader, writer):
 		self.reader = reader
 		self.writer = writer
+		# Block received and position of the data not yet consumed
 		self.buffer = b""
+		self.position = 0
 		if tools.filesystem.ismicropython():
 			self.close      = self.close_mcp
 			self.awrite     = self.awrite_mcp
+			self.awritev    = self.awritev_mcp
 			self.is_closing = self.is_closing_mcp
 		else:
 			self.close      = self.close_pc
 			self.awrite     = self.awrite_pc
+			self.awritev    = self.awritev_pc
 			self.is_closing = self.is_closing_pc
 
-	async def readline(self):
-		""" The firt time, this method completely reads the stream.
-		It then returns only the requested row. This significantly increases read performance. """
-		pos = self.buffer.find(b"\r\n")
-		if pos == -1:
-			self.buffer += await self.reader.read(1440)
-			pos = self.buffer.find(b"\r\n")
-		if pos == -1:
+	async def fill(self, length):
+		""" Add the next block received after the data not yet consumed """
+		data = await self.reader.read(length)
+		if self.position >= len(self.buffer):
+			self.buffer = data
+		else:
+			self.buffer = self.buffer[self.position:] + data
+		self.position = 0
+
+	def consume(self, end):
+		""" Extract the data until end, the block is released when it is completely consumed """
+		if self.position == 0 and end >= len(self.buffer):
 			result = self.buffer
+		else:
+			result = self.buffer[self.position:end]
+		if end >= len(self.buffer):
 			self.buffer = b""
+			self.position = 0
 		else:
-			result = self.buffer[:pos+2]
-			self.buffer = self.buffer[pos+2:]
+			self.position = end
+		return result
+
+	async def readline(self):
+		""" The first time, this method reads a block of the stream.
+		It then returns only the requested row, the rest of block is not copied for each row """
+		pos = self.buffer.find(b"\r\n", self.position)
+		if pos == -1:
+			await self.fill(1440)
+			pos = self.buffer.find(b"\r\n", self.position)
+			if pos == -1:
+				return self.consume(len(self.buffer))
+		result = self.buffer[self.position:pos+2]
+		self.position = pos + 2
+		if self.position >= len(self.buffer):
+			self.buffer = b""
+			self.position = 0
 		return result
 
+	async def peek(self):
+		""" Wait data in the stream without consuming it, returns False if the connection is closed """
+		if self.position >= len(self.buffer):
+			await self.fill(1440)
+		return self.position < len(self.buffer)
+
 	async def read(self, length):
 		""" Read data from the stream """
-		if len(self.buffer) < length:
-			data = await self.reader.read(length - len(self.buffer))
-			self.buffer += data
-
-		data = self.buffer[:length]
-		self.buffer = self.buffer[length:]
+		if len(self.buffer) - self.position < length:
+			await self.fill(length - (len(self.buffer) - self.position))
+		data = self.consume(self.position + length)
 		if Stream.trace:
 			Stream.trace.write(b"\n# read\n")
 			Stream.trace.write(data)
@@ -65,6 +95,31 @@ class Stream:
 			result = -1
 		return result
 
+	async def writev(self, datas):
+		""" Write several buffers in the stream, they leave together with a single drain """
+		await self.awritev(datas)
+		if self.is_closing():
+			raise OSError(104,"Closed connection")
+		result = 0
+		for data in datas:
+			if Stream.trace:
+				Stream.trace.write(b"\n# write\n")
+				Stream.trace.write(data)
+				Stream.trace.flush()
+			result += len(data)
+		return result
+
+	async def awritev_mcp(self, datas):
+		""" Awritev micropython """
+		for data in datas:
+			self.writer.write(data)
+		await self.writer.drain()
+
+	async def awritev_pc(self, datas):
+		""" Awritev pc """
+		self.writer.writelines(datas)
+		await self.writer.drain()
+
 	async def awrite_mcp(self, data):
 		""" Awrite micropython """
 		return await self.writer.awrite(data)
@@ -129,6 +184,38 @@ class Bytesio:
 		""" Close the stream """
 		self.streamio.close()
 
+class Chunkedio:
+	""" Stream which encodes the body of http response in chunks, the http header is written unchanged """
+	def __init__(self, streamio):
+		""" Constructor """
+		self.streamio = streamio
+		self.header = b""
+
+	async def write(self, data):
+		""" Write data in the stream """
+		result = len(data)
+		if self.header is not None:
+			if len(self.header) > 0:
+				self.header += data
+				data = self.header
+			pos = data.find(b"\r\n\r\n")
+			if pos == -1:
+				if len(self.header) == 0:
+					self.header = bytes(data)
+				return result
+			await self.streamio.write(data[:pos+4])
+			data = memoryview(data)[pos+4:]
+			self.header = None
+		if len(data) > 0:
+			await self.streamio.writev((b"%x\r\n"%len(data), data, b"\r\n"))
+		return result
+
+	async def close(self):
+		""" Write the last chunk, the stream stays opened """
+		if self.header:
+			await self.streamio.write(self.header)
+		await self.streamio.write(b"0\r\n\r\n")
+
 class Bufferedio:
 	""" Bufferized bytes io stream """
 	memorysize = [None]
@@ -59,6 +59,12 @@ def calc_local_time(current_time, offset_time=+1, dst=True):
 	else:
 		return now+(offset_time*3600) # EST: UTC+dst*H
 
+def local_to_utc(current_time):
+	""" Convert a time of the internal clock, which is in local time, into utc time """
+	import tools.region
+	region = tools.region.RegionConfig.get()
+	return current_time - (calc_local_time(current_time, region.offset_time, region.dst) - current_time)
+
 def set_date(offset_time=+1, dst=True, display=False):
 	""" Set the date """
 	current_time = get_ntp_time()
@@ -793,6 +793,24 @@ def flashinfo(mountpoint=None):
 	""" Get flash informations """
 	tools.console.Console.print(tools.strings.tostrings(b"%s : %s"%(tools.lang.flash_label, tools.info.flashinfo(mountpoint=mountpoint))))
 
+def camstat(reset=False):
+	""" Show the metrics of camera pipeline """
+	if tools.info.iscamera():
+		import video.video
+		tools.console.Console.print(video.video.Metrics.get_text())
+		if reset:
+			video.video.Metrics.reset()
+	else:
+		tools.console.Console.print("No camera on this device")
+
+def httpstat(reset=False):
+	""" Show the counters of http requests admission """
+	import server.httpservercore
+	tools.console.Console.print(server.httpservercore.Admission.get_texts())
+	if reset:
+		for admission in server.httpservercore.Admission.instances:
+			admission.reset()
+
 def sysinfo():
 	""" Get system informations """
 	tools.console.Console.print(tools.strings.tostrings(tools.info.sysinfo()))
@@ -1037,6 +1055,8 @@ def create_shell_commands():
 		"meminfo"    :[meminfo                                 ],
 		"flashinfo"  :[flashinfo                               ],
 		"sysinfo"    :[sysinfo                                 ],
+		"camstat"    :[camstat         ,                         ("-r","reset",True)],
+		"httpstat"   :[httpstat        ,                         ("-r","reset",True)],
 		"deepsleep"  :[deepsleep       ,"seconds"              ],
 		"lightsleep" :[ligthsleep      ,"seconds"              ],
 		"ping"       :[ping            ,"host"                 ],
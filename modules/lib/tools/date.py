@@ -106,3 +106,24 @@ def date_to_path(current_date=None):
 	""" Get a path with year/month/day/hour """
 	year,month,day,hour,minute = local_time(current_date)[:5]
 	return b"%04d/%02d/%02d/%02dh%02d"%(year,month,day,hour,minute)
+
+def date_to_http(current_date=None):
+	""" Get a http date (Sun, 06 Nov 1994 08:49:37 GMT), the date given must be in utc """
+	year,month,day,hour,minute,second,weekday = local_time(current_date)[:7]
+	return b"%s, %02d %s %04d %02d:%02d:%02d GMT"%(
+		b"MonTueWedThuFriSatSun"[weekday*3:weekday*3+3], day,
+		b"JanFebMarAprMayJunJulAugSepOctNovDec"[(month-1)*3:month*3], year, hour, minute, second)
+
+def http_to_date(value):
+	""" Convert a http date (Sun, 06 Nov 1994 08:49:37 GMT) into comparable tuple (year,month,day,hour,minute,second), None if the date is invalid """
+	try:
+		_, day, month, year, clock, zone = value.split()
+		if zone != b"GMT" or len(month) != 3:
+			return None
+		month = b"JanFebMarAprMayJunJulAugSepOctNovDec".find(month)
+		if month < 0 or month % 3 != 0:
+			return None
+		hour, minute, second = clock.split(b":")
+		return int(year), month//3 + 1, int(day), int(hour), int(minute), int(second)
+	except ValueError:
+		return None
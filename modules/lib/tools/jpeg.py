@@ -0,0 +1,303 @@
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+# pylint:disable=consider-using-f-string
+""" Thumbnail of jpeg image built without decoding the pixels.
+Only the average of each 8x8 block of luminance (DC coefficient) is kept,
+the result is a small grayscale jpeg with the same geometry than the original image """
+import array
+import uasyncio
+
+class JpegError(Exception):
+	""" Jpeg not supported or corrupted """
+
+class JpegStopped(Exception):
+	""" Thumbnail building stopped to let a more urgent work """
+
+class Huffman:
+	""" Huffman table of jpeg """
+	LOOKUP = 9
+	def __init__(self, counts, symbols):
+		""" Constructor with the number of codes of each length and the symbols """
+		self.counts  = bytes(counts)
+		self.symbols = bytes(symbols)
+		# Fast decoding of the short codes : the next bits give directly the symbol and its length
+		self.lookup_symbol = bytearray(1 << Huffman.LOOKUP)
+		self.lookup_length = bytearray(1 << Huffman.LOOKUP)
+		# Canonical decoding of the long codes
+		self.maxcode = [-1]*17
+		self.valptr  = [0]*17
+		self.mincode = [0]*17
+		# Encoding of the symbols : code and length
+		self.codes   = {}
+		code = 0
+		index = 0
+		for length in range(1, 17):
+			count = self.counts[length-1]
+			if count > 0:
+				self.valptr[length]  = index
+				self.mincode[length] = code
+				for _ in range(count):
+					symbol = self.symbols[index]
+					self.codes[symbol] = (code, length)
+					if length <= Huffman.LOOKUP:
+						shift = Huffman.LOOKUP - length
+						for fill in range(code << shift, (code + 1) << shift):
+							self.lookup_symbol[fill] = symbol
+							self.lookup_length[fill] = length
+					code  += 1
+					index += 1
+				self.maxcode[length] = code - 1
+			code <<= 1
+
+class BitReader:
+	""" Read the entropy coded data of jpeg """
+	def __init__(self, data, start):
+		""" Constructor """
+		self.data  = data
+		self.pos   = start
+		self.acc   = 0
+		self.bits  = 0
+		self.marker = None
+
+	def fill(self, bits):
+		""" Fill the accumulator with at least bits available, zeros are added after a marker """
+		while self.bits < bits:
+			byte = 0
+			if self.marker is None:
+				byte = self.data[self.pos]
+				if byte == 0xFF:
+					following = self.data[self.pos + 1]
+					if following == 0x00:
+						self.pos += 2
+					else:
+						# Marker found : restart or end of scan
+						self.marker = following
+						byte = 0
+				else:
+					self.pos += 1
+			# Only the bits not yet read are kept, the value stays a small integer
+			self.acc = ((self.acc & ((1 << self.bits) - 1)) << 8) | byte
+			self.bits += 8
+
+	def read(self, bits):
+		""" Read bits """
+		if bits == 0:
+			return 0
+		self.fill(bits)
+		self.bits -= bits
+		return (self.acc >> self.bits) & ((1 << bits) - 1)
+
+	def decode(self, table):
+		""" Decode the next huffman symbol """
+		self.fill(Huffman.LOOKUP)
+		peek = (self.acc >> (self.bits - Huffman.LOOKUP)) & ((1 << Huffman.LOOKUP) - 1)
+		length = table.lookup_length[peek]
+		if length > 0:
+			self.bits -= length
+			return table.lookup_symbol[peek]
+		code = self.read(Huffman.LOOKUP)
+		length = Huffman.LOOKUP
+		while length < 16:
+			code = (code << 1) | self.read(1)
+			length += 1
+			if code <= table.maxcode[length]:
+				return table.symbols[table.valptr[length] + code - table.mincode[length]]
+		raise JpegError("Bad huffman code")
+
+	def restart(self):
+		""" Skip the restart marker """
+		self.bits = 0
+		self.acc  = 0
+		if self.marker is None and self.data[self.pos] == 0xFF:
+			self.marker = self.data[self.pos + 1]
+		if self.marker is not None and 0xD0 <= self.marker <= 0xD7:
+			self.pos += 2
+			self.marker = None
+		else:
+			raise JpegError("Restart marker missing")
+
+class BitWriter:
+	""" Write the entropy coded data of jpeg """
+	def __init__(self):
+		""" Constructor """
+		self.data = bytearray()
+		self.acc  = 0
+		self.bits = 0
+
+	def write(self, value, bits):
+		""" Write bits """
+		self.acc  = (self.acc << bits) | (value & ((1 << bits) - 1))
+		self.bits += bits
+		while self.bits >= 8:
+			self.bits -= 8
+			byte = (self.acc >> self.bits) & 0xFF
+			self.data.append(byte)
+			if byte == 0xFF:
+				self.data.append(0)
+		self.acc &= (1 << self.bits) - 1
+
+	def flush(self):
+		""" Complete the last byte with ones """
+		if self.bits > 0:
+			self.write(0xFF, 8 - self.bits)
+
+def get_category(value):
+	""" Get the number of bits to encode the value """
+	value = abs(value)
+	result = 0
+	while value > 0:
+		value >>= 1
+		result += 1
+	return result
+
+def parse(data):
+	""" Parse the segments of jpeg before the entropy coded data """
+	if data[0:2] != b"\xFF\xD8":
+		raise JpegError("Not jpeg")
+	pos = 2
+	frame = None
+	quantizations = {}
+	huffmans = {}
+	restart_interval = 0
+	while pos + 4 <= len(data):
+		if data[pos] != 0xFF:
+			raise JpegError("Marker expected")
+		marker = data[pos + 1]
+		length = (data[pos + 2] << 8) | data[pos + 3]
+		segment = pos + 4
+		end = pos + 2 + length
+		# Quantization tables
+		if marker == 0xDB:
+			while segment < end:
+				precision, identifier = data[segment] >> 4, data[segment] & 0x0F
+				size = 128 if precision else 64
+				quantizations[identifier] = data[segment:segment + 1 + size]
+				segment += 1 + size
+		# Huffman tables
+		elif marker == 0xC4:
+			while segment < end:
+				identifier = data[segment]
+				counts = data[segment + 1:segment + 17]
+				total = sum(counts)
+				huffmans[identifier] = Huffman(counts, data[segment + 17:segment + 17 + total])
+				segment += 17 + total
+		# Baseline frame
+		elif marker == 0xC0:
+			height = (data[segment + 1] << 8) | data[segment + 2]
+			width  = (data[segment + 3] << 8) | data[segment + 4]
+			components = []
+			for component in range(data[segment + 5]):
+				position = segment + 6 + component*3
+				components.append([data[position], data[position + 1] >> 4, data[position + 1] & 0x0F, data[position + 2]])
+			frame = [width, height, components]
+		# Progressive, lossless or arithmetic frames
+		elif 0xC1 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+			raise JpegError("Jpeg not baseline")
+		elif marker == 0xDD:
+			restart_interval = (data[segment] << 8) | data[segment + 1]
+		# Start of scan
+		elif marker == 0xDA:
+			if frame is None:
+				raise JpegError("Frame missing")
+			scan = []
+			for component in range(data[segment]):
+				position = segment + 1 + component*2
+				scan.append([data[position], data[position + 1] >> 4, data[position + 1] & 0x0F])
+			return frame, quantizations, huffmans, restart_interval, scan, end
+		pos = end
+	raise JpegError("Scan missing")
+
+async def thumbnail(data, stop=None):
+	""" Create the thumbnail of the jpeg image, returns None if the jpeg is not supported.
+	The stop function is called between each row of blocks, the building raises JpegStopped if it returns True """
+	result = None
+	try:
+		result = await build(data, stop)
+	except (JpegError, IndexError, KeyError) as err:
+		print("Thumbnail not created : %s"%err)
+	return result
+
+async def build(data, stop=None):
+	""" Build the thumbnail of the jpeg image """
+	frame, quantizations, huffmans, restart_interval, scan, start = parse(data)
+	width, height, components = frame
+	if len(scan) != len(components):
+		raise JpegError("Jpeg not interleaved")
+	hmax = max([component[1] for component in components])
+	vmax = max([component[2] for component in components])
+	mcux = (width  + 8*hmax - 1) // (8*hmax)
+	mcuy = (height + 8*vmax - 1) // (8*vmax)
+
+	# Tables used to decode each component of the scan
+	units = []
+	for identifier, dc_table, ac_table in scan:
+		for component in components:
+			if component[0] == identifier:
+				units.append([component[1], component[2], huffmans[dc_table], huffmans[0x10 | ac_table]])
+	luminance = units[0]
+	luminance_dc = luminance[2]
+	blocks_x = mcux*luminance[0]
+	dcs = array.array("h", bytes(2*blocks_x*mcuy*luminance[1]))
+
+	# Decode the coefficients of all blocks, only the DC of luminance is kept
+	reader = BitReader(data, start)
+	predictions = [0]*len(units)
+	mcu = 0
+	for y in range(mcuy):
+		for x in range(mcux):
+			if restart_interval and mcu > 0 and mcu % restart_interval == 0:
+				reader.restart()
+				predictions = [0]*len(units)
+			mcu += 1
+			for unit in range(len(units)):
+				horizontal, vertical, dc_table, ac_table = units[unit]
+				for block in range(horizontal*vertical):
+					category = reader.decode(dc_table)
+					diff = reader.read(category)
+					if category > 0 and diff < (1 << (category - 1)):
+						diff -= (1 << category) - 1
+					predictions[unit] += diff
+					if unit == 0:
+						dcs[(y*vertical + block // horizontal)*blocks_x + x*horizontal + block % horizontal] = predictions[unit]
+					coefficient = 1
+					while coefficient < 64:
+						symbol = reader.decode(ac_table)
+						if symbol & 0x0F == 0:
+							if symbol != 0xF0:
+								break
+							coefficient += 16
+						else:
+							reader.read(symbol & 0x0F)
+							coefficient += (symbol >> 4) + 1
+		# Let the other tasks work
+		await uasyncio.sleep_ms(0)
+		if stop is not None and stop():
+			raise JpegStopped()
+
+	# Encode the DC of luminance blocks into a grayscale jpeg, each block has only its average
+	writer = BitWriter()
+	previous = 0
+	for y in range((height + 7) // 8):
+		for x in range((width + 7) // 8):
+			dc = dcs[y*blocks_x + x]
+			diff = dc - previous
+			previous = dc
+			category = get_category(diff)
+			code, length = luminance_dc.codes[category]
+			writer.write(code, length)
+			if category > 0:
+				writer.write(diff if diff > 0 else diff + (1 << category) - 1, category)
+			# End of block
+			writer.write(0, 1)
+	writer.flush()
+
+	quantization = quantizations[components[0][3]]
+	result = bytearray(b"\xFF\xD8")
+	result += b"\xFF\xDB" + (2 + len(quantization)).to_bytes(2, "big") + bytes([quantization[0] & 0xF0]) + quantization[1:]
+	result += b"\xFF\xC0\x00\x0B\x08" + height.to_bytes(2, "big") + width.to_bytes(2, "big") + b"\x01\x01\x11\x00"
+	result += b"\xFF\xC4" + (19 + len(luminance_dc.symbols)).to_bytes(2, "big") + b"\x00" + luminance_dc.counts + luminance_dc.symbols
+	result += b"\xFF\xC4\x00\x14\x10\x01" + bytes(15) + b"\x00"
+	result += b"\xFF\xDA\x00\x08\x01\x01\x00\x00\x3F\x00"
+	result += writer.data
+	result += b"\xFF\xD9"
+	return bytes(result)
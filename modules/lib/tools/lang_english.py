@@ -65,6 +65,13 @@ notification_state                      =b"Notify state change"
 suspends_motion_detection               =b"Suspends motion detection on the presence of an occupant"
 permanent_detection                     =b"Permanently archive all motion detections including in the presence of an occupant"
 turn_on_flash                           =b"Turn on the led flash when the light goes down"
+compare_background                      =b"Compare each image with the background only"
+save_thumbnail                          =b"Save a thumbnail with each motion image"
+motion_polling_min                      =b"Minimal delay between two captures during a motion (ms)"
+motion_polling_max                      =b"Maximal delay between two captures when the scene is quiet (ms)"
+motion_polling                          =b"Capture delay, rate and time spent"
+motion_saving                           =b"Saving queue, drops, writes, failures, latency"
+historic_storage                        =b"Storage used by historic"
 pushover_on                             =b"Pushover notification on"
 pushover_off                            =b"Pushover notification off"
 notification_configuration              =b"Notification configuration"
@@ -70,6 +70,13 @@ notification_state                      =b"Notifier changement \xC3\xA9tat"
 suspends_motion_detection               =b"Suspendre la d\xC3\xA9tection de mouvement en pr\xC3\xA9sence d'occupants"
 permanent_detection                     =b"Archiver en permanence toutes les d\xC3\xA9tection de mouvements y compris en pr\xC3\xA9sence d'occupants"
 turn_on_flash                           =b"Allumer le flash LED lorsque la lumi\xC3\xA8re baisse"
+compare_background                      =b"Comparer chaque image uniquement avec l'arri\xC3\xA8re-plan"
+save_thumbnail                          =b"Enregistrer une vignette avec chaque image de mouvement"
+motion_polling_min                      =b"D\xC3\xA9lai minimal entre deux captures pendant un mouvement (ms)"
+motion_polling_max                      =b"D\xC3\xA9lai maximal entre deux captures quand la sc\xC3\xA8ne est calme (ms)"
+motion_polling                          =b"D\xC3\xA9lai, fr\xC3\xA9quence et temps de capture"
+motion_saving                           =b"File d'enregistrement, pertes, \xC3\xA9critures, \xC3\xA9checs, latence"
+historic_storage                        =b"Stockage utilis\xC3\xA9 par l'historique"
 pushover_on                             =b"Notification pushover activ\xC3\xA9e"
 pushover_off                            =b"Notification pushover d\xC3\xA9sactiv\xC3\xA9e"
 notification_configuration              =b"Configuration notification"
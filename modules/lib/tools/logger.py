@@ -43,6 +43,7 @@ def syslog(err, msg="", display=True, write=True):
 
 _max_log_size = 32*1024
 _max_log_quantity = 4
+_log_filename = "syslog.log"
 def set_size(size, quantity):
 	""" Change the size of logger
 	Parameters :
@@ -53,11 +54,16 @@ def set_size(size, quantity):
 	_max_log_size = size
 	_max_log_quantity = quantity
 
+def set_filename(filename):
+	""" Change the name of syslog file, on the device it is relative to the root """
+	global _log_filename
+	_log_filename = filename
+
 def log(msg):
 	""" Log message in syslog.log file without printing """
 	# pylint:disable=unspecified-encoding
 	try:
-		filename = "syslog.log"
+		filename = _log_filename
 		if tools.filesystem.ismicropython():
 			filename = "/" + filename
 
@@ -217,10 +217,8 @@ class SdCard:
 		return result
 
 	@staticmethod
-	def is_not_enough_space(low):
-		""" Indicates if remaining space is not sufficient """
-		free = SdCard.get_free_size()
-		total = SdCard.get_max_size()
+	def get_threshold(low):
+		""" Get the minimal percent of free space """
 		if low:
 			if SdCard.is_available():
 				threshold = 5
@@ -231,6 +229,14 @@ class SdCard:
 				threshold = 8
 			else:
 				threshold = 25
+		return threshold
+
+	@staticmethod
+	def is_not_enough_space(low):
+		""" Indicates if remaining space is not sufficient """
+		free = SdCard.get_free_size()
+		total = SdCard.get_max_size()
+		threshold = SdCard.get_threshold(low)
 
 		if free < 0 or total < 0:
 			return True
@@ -240,6 +246,16 @@ class SdCard:
 		else:
 			return ((free * 100 // total) <= threshold)
 
+	@staticmethod
+	def get_missing_space(low):
+		""" Get the size in bytes to free so that the remaining space is sufficient, returns -1 if the size is unknown """
+		free = SdCard.get_free_size()
+		total = SdCard.get_max_size()
+		if free < 0 or total < 0:
+			return -1
+		required = max(32*1024*4, ((SdCard.get_threshold(low) + 1) * total + 99) // 100)
+		return max(0, required - free)
+
 	@staticmethod
 	def save(directory, filename, data):
 		""" Save file on sd card """
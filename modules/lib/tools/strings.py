@@ -255,10 +255,14 @@ def compute_hash(string):
 
 try:
 	# pylint: disable=no-name-in-module
-	from time import ticks_ms
+	from time import ticks_ms, ticks_diff as _ticks_diff
 	def ticks():
 		""" Count tick elapsed from start """
 		return ticks_ms()
+
+	def ticks_diff(end, start):
+		""" Ticks elapsed between start and end, correct across the wraparound of ticks """
+		return _ticks_diff(end, start)
 except:
 	_ticks_init = time.monotonic()
 	def ticks():
@@ -266,6 +270,10 @@ except:
 		result = (int)((time.monotonic() - _ticks_init)*1000)
 		return result
 
+	def ticks_diff(end, start):
+		""" Ticks elapsed between start and end, correct across the wraparound of ticks """
+		return end - start
+
 def ticks_to_string():
 	""" Create a string with tick in seconds """
 	tick = ticks()
@@ -27,3 +27,5 @@ login                 = "login"
 presence_detection    = "presence/detection"
 presence_detected     = "presence/detected"
 information           = "information"
+camera_state          = "camera/state"
+motion_historic       = "motion/historic"
@@ -14,9 +14,145 @@ import tools.info
 import tools.system
 import tools.jsonconfig
 import tools.logger
+import tools.strings
+import tools.topic
+import server.events
 if tools.info.iscamera():
 	import camera
 
+# Stages of camera recovery
+STAGE_RETRY  = 0
+STAGE_REINIT = 1
+STAGE_REOPEN = 2
+STAGE_REBOOT = 3
+STAGES_NAME  = ("retry","reinit","reopen","reboot")
+STAGE_ATTEMPTS = 3
+BACKOFF_MIN    = 100
+BACKOFF_MAX    = 2000
+# Number of captures kept in the rolling metrics
+METRICS_SIZE   = 100
+
+class Metrics:
+	""" Rolling metrics of the camera pipeline : capture time, frame size, retries and reservation contention """
+	durations = []
+	sizes     = []
+	ticks     = []
+	index     = [0]
+	captures  = [0]
+	retries   = [0]
+	reserved  = [0]
+	contended = [0]
+	refused   = [0]
+	wait      = [0]
+	wait_max  = [0]
+	framesize = [b""]
+	quality   = [None]
+
+	@staticmethod
+	def capture(start, result):
+		""" Record the duration of a successful capture and the size of frame """
+		now = tools.strings.ticks()
+		if type(result) == type(b"") or type(result) == type(bytearray()):
+			size = len(result)
+		else:
+			try:
+				size = result.get_size()
+			except Exception:
+				size = 0
+		Metrics.captures[0] += 1
+		duration = tools.strings.ticks_diff(now, start)
+		if len(Metrics.durations) < METRICS_SIZE:
+			Metrics.durations.append(duration)
+			Metrics.sizes.append(size)
+			Metrics.ticks.append(now)
+		else:
+			index = Metrics.index[0]
+			Metrics.durations[index] = duration
+			Metrics.sizes[index]     = size
+			Metrics.ticks[index]     = now
+			Metrics.index[0] = (index + 1) % METRICS_SIZE
+
+	@staticmethod
+	def retry():
+		""" Record a failed capture """
+		Metrics.retries[0] += 1
+
+	@staticmethod
+	def reservation(duration, result, waited):
+		""" Record the wait of a camera reservation """
+		if result:
+			Metrics.reserved[0] += 1
+		else:
+			Metrics.refused[0] += 1
+		if waited:
+			Metrics.contended[0] += 1
+		Metrics.wait[0] += duration
+		Metrics.wait_max[0] = max(Metrics.wait_max[0], duration)
+
+	@staticmethod
+	def reset():
+		""" Reset all metrics """
+		for values in (Metrics.durations, Metrics.sizes, Metrics.ticks):
+			values.clear()
+		for counter in (Metrics.index, Metrics.captures, Metrics.retries, Metrics.reserved, Metrics.contended, Metrics.refused, Metrics.wait, Metrics.wait_max):
+			counter[0] = 0
+
+	@staticmethod
+	def summarize(values):
+		""" Get the min, average, max and percentiles of values """
+		result = {"min":0, "avg":0, "max":0, "p50":0, "p90":0, "p99":0}
+		if len(values) > 0:
+			values = sorted(values)
+			count = len(values)
+			result["min"] = values[0]
+			result["avg"] = sum(values)//count
+			result["max"] = values[-1]
+			for percent in (50, 90, 99):
+				result["p%d"%percent] = values[min((count*percent)//100, count - 1)]
+		return result
+
+	@staticmethod
+	def get():
+		""" Get the metrics of the captures kept and the counters """
+		fps = 0.
+		rate = 0
+		if len(Metrics.ticks) >= 2:
+			# The oldest capture is the next one replaced, the newest is just before it
+			oldest = Metrics.index[0]
+			duration = tools.strings.ticks_diff(Metrics.ticks[oldest - 1], Metrics.ticks[oldest])
+			if duration > 0:
+				fps  = ((len(Metrics.ticks) - 1) * 1000) / duration
+				rate = (sum(Metrics.sizes) * 1000) // duration
+		attempts = Metrics.reserved[0] + Metrics.refused[0]
+		return {
+			"framesize"  : tools.strings.tostrings(Metrics.framesize[0]),
+			"quality"    : Metrics.quality[0],
+			"window"     : len(Metrics.durations),
+			"capture_ms" : Metrics.summarize(Metrics.durations),
+			"frame_bytes": Metrics.summarize(Metrics.sizes),
+			"fps"        : round(fps, 1),
+			"bytes_per_second": rate,
+			"captures"   : Metrics.captures[0],
+			"retries"    : Metrics.retries[0],
+			"reservations": {"granted":Metrics.reserved[0], "refused":Metrics.refused[0], "contended":Metrics.contended[0],
+				"wait_avg_ms":Metrics.wait[0]//attempts if attempts > 0 else 0, "wait_max_ms":Metrics.wait_max[0]}}
+
+	@staticmethod
+	def get_text():
+		""" Get the metrics as text lines """
+		metrics = Metrics.get()
+		lines = []
+		lines.append("Framesize %s, quality %s, %.1f fps, %d bytes/s"%(metrics["framesize"], metrics["quality"], metrics["fps"], metrics["bytes_per_second"]))
+		for name, unit in (("capture_ms","ms"), ("frame_bytes","bytes")):
+			summary = metrics[name]
+			lines.append("%-11s min %d, avg %d, p50 %d, p90 %d, p99 %d, max %d %s (last %d)"%(name.split("_")[0].capitalize(),
+				summary["min"], summary["avg"], summary["p50"], summary["p90"], summary["p99"], summary["max"], unit, metrics["window"]))
+		lines.append("Captures    %d, retries %d"%(metrics["captures"], metrics["retries"]))
+		reservations = metrics["reservations"]
+		lines.append("Reservation granted %d, refused %d, contended %d, wait avg %d ms, max %d ms"%(reservations["granted"],
+			reservations["refused"], reservations["contended"], reservations["wait_avg_ms"], reservations["wait_max_ms"]))
+		return "\n".join(lines)
+
 class CameraConfig(tools.jsonconfig.JsonConfig):
 	""" Class that collects the camera rendering configuration """
 	def __init__(self):
@@ -32,6 +168,7 @@ class CameraConfig(tools.jsonconfig.JsonConfig):
 		self.hmirror    = False
 		self.vflip      = False
 		self.flash_level = 0
+		self.snapshot_age = 2000
 
 class Reservation:
 	""" Manage the camera reservation """
@@ -45,6 +182,8 @@ class Reservation:
 	async def reserve(self, object_, timeout=0, suspension=None):
 		""" Wait the ressource and reserve """
 		result = False
+		start = tools.strings.ticks()
+		waited = False
 		# Wait
 		while True:
 			result = await self.acquire(object_, suspension)
@@ -53,7 +192,9 @@ class Reservation:
 			timeout -= 1
 			if timeout < 0:
 				break
+			waited = True
 			await uasyncio.sleep_ms(1000)
+		Metrics.reservation(tools.strings.ticks_diff(tools.strings.ticks(), start), result, waited)
 		return result
 
 	async def acquire(self, object_, suspension=None):
@@ -110,6 +251,68 @@ class Reservation:
 			self.lock.release()
 		return result
 
+class Snapshot:
+	""" Last frame captured by the motion detection or the video streaming, shared with the snapshot requests """
+	image   = [None]
+	source  = [None]
+	ticks   = [0]
+	date    = [0]
+	version = [0]
+	prefix  = [None]
+
+	@staticmethod
+	def set(image):
+		""" Keep the last frame captured """
+		if image:
+			Snapshot.image[0]    = image
+			Snapshot.source[0]   = None
+			Snapshot.changed()
+
+	@staticmethod
+	def set_source(source):
+		""" Keep the object which holds the last frame captured (motion), its image is copied only if a snapshot is requested """
+		if source is not None:
+			Snapshot.image[0]    = None
+			Snapshot.source[0]   = source
+			Snapshot.changed()
+
+	@staticmethod
+	def release(source):
+		""" Forget the source of the last frame before its destruction """
+		if Snapshot.source[0] is source:
+			Snapshot.source[0] = None
+
+	@staticmethod
+	def changed():
+		""" A new frame is captured """
+		Snapshot.ticks[0]    = tools.strings.ticks()
+		Snapshot.date[0]     = int(time.time())
+		Snapshot.version[0] += 1
+
+	@staticmethod
+	def get(max_age=None):
+		""" Get the last frame if it is younger than max_age in ms (any age if None), else None """
+		if Snapshot.image[0] is None and Snapshot.source[0] is not None:
+			Snapshot.image[0]  = Snapshot.source[0].get_image()
+			Snapshot.source[0] = None
+		if Snapshot.image[0] is not None:
+			if max_age is None or tools.strings.ticks_diff(tools.strings.ticks(), Snapshot.ticks[0]) <= max_age:
+				return Snapshot.image[0]
+		return None
+
+	@staticmethod
+	def get_date():
+		""" Get the capture date of the last frame """
+		return Snapshot.date[0]
+
+	@staticmethod
+	def get_etag():
+		""" Get the entity tag of the last frame, the prefix changes at each start """
+		if Snapshot.prefix[0] is None:
+			import random
+			Snapshot.prefix[0] = b"%x"%random.getrandbits(24)
+		return b"%s-%d"%(Snapshot.prefix[0], Snapshot.version[0])
+
 class Camera:
 	""" Singleton class to manage the camera """
 	reservation = Reservation()
@@ -122,6 +325,7 @@ class Camera:
 	config = None
 	flash_enabled = [True]
 	aquisition = [False]
+	stage_failed = [0,0,0,0]
 
 	@staticmethod
 	def gpio_config(**kwargs):
@@ -159,18 +363,19 @@ class Camera:
 			camera.configure(**kwargs)
 
 	@staticmethod
-	def open():
+	def open(retry=10):
 		""" Open the camera """
 		Camera.get_config()
 		if Camera.is_activated():
 			result = True
 			if Camera.opened is False:
-				for i in range(10):
+				for i in range(retry):
 					res = camera.init()
 					if res is False:
 						# print("Camera not initialized")
 						camera.deinit()
-						time.sleep(0.5)
+						if i < retry - 1:
+							time.sleep(0.5)
 					else:
 						break
 				else:
@@ -180,6 +385,7 @@ class Camera:
 					# Photo on 800x600, motion detection / 8 (100x75), each square detection 8x8 (12.5 x 9.375)
 					Camera.opened = True
 					Camera.aquisition[0] = False
+					server.events.Events.publish(tools.topic.camera_state, tools.topic.value_on)
 		else:
 			result = False
 		return result
@@ -189,12 +395,19 @@ class Camera:
 		""" Statistic """
 		return Camera.success[0], Camera.failed[0]
 
+	@staticmethod
+	def get_stage_stat():
+		""" Get the failures count of each recovery stage """
+		return b", ".join([b"%s %d"%(tools.strings.tobytes(STAGES_NAME[stage]), Camera.stage_failed[stage]) for stage in range(STAGE_REBOOT)])
+
 	@staticmethod
 	def reset_stat():
 		""" Reset statistic """
 		Camera.success[0] = 0
 		Camera.failed [0] = 0
 		Camera.new_failed[0] = 0
+		for stage in range(len(Camera.stage_failed)):
+			Camera.stage_failed[stage] = 0
 
 	@staticmethod
 	def close():
@@ -202,6 +415,7 @@ class Camera:
 		if Camera.opened is True:
 			camera.deinit()
 			Camera.opened = False
+			server.events.Events.publish(tools.topic.camera_state, tools.topic.value_off)
 
 	@staticmethod
 	def reset():
@@ -227,6 +441,18 @@ class Camera:
 		Camera.aquisition[0] = True
 		return Camera.retry(camera.motion)
 
+	@staticmethod
+	async def acapture():
+		""" Capture an image on the camera, without blocking other tasks when the camera fails """
+		Camera.aquisition[0] = True
+		return await Camera.aretry(camera.capture)
+
+	@staticmethod
+	async def amotion():
+		""" Get the motion informations, without blocking other tasks when the camera fails """
+		Camera.aquisition[0] = True
+		return await Camera.aretry(camera.motion)
+
 	@staticmethod
 	def flash(level=0):
 		""" Start or stop the flash """
@@ -248,28 +474,90 @@ class Camera:
 			while 1:
 				if retry <= 0:
 					tools.system.reboot("Reboot forced after camera problem")
+				start = tools.strings.ticks()
 				try:
 					result = callback()
 					Camera.success[0] += 1
+					Metrics.capture(start, result)
 					break
 				except ValueError:
 					Camera.failed[0] += 1
 					Camera.new_failed[0] += 1
+					Metrics.retry()
 					if retry <= 3:
 						tools.logger.syslog("Failed to get image %d retry before reset"%retry)
 					retry -= 1
 					time.sleep(0.5)
-			total = Camera.success[0] + Camera.failed[0]
-			STAT_CAMERA=20000
-			if (total % STAT_CAMERA) == 0:
-				if Camera.success[0] != 0:
-					new_failed = 100.-((Camera.new_failed[0]*100)/STAT_CAMERA)
-					failed    = 100.-((Camera.failed[0]*100)/total)
-				else:
-					new_failed = 0.
-					failed    = 0.
-				tools.logger.syslog("Camera stat : last %-3.1f%%, total %-3.1f%% success on %d"%(new_failed, failed, total))
-				Camera.new_failed[0] = 0
+			Camera.show_stat()
+		return result
+
+	@staticmethod
+	def show_stat():
+		""" Show periodically the camera statistic """
+		total = Camera.success[0] + Camera.failed[0]
+		STAT_CAMERA=20000
+		if (total % STAT_CAMERA) == 0:
+			if Camera.success[0] != 0:
+				new_failed = 100.-((Camera.new_failed[0]*100)/STAT_CAMERA)
+				failed    = 100.-((Camera.failed[0]*100)/total)
+			else:
+				new_failed = 0.
+				failed    = 0.
+			tools.logger.syslog("Camera stat : last %-3.1f%%, total %-3.1f%% success on %d"%(new_failed, failed, total))
+			Camera.new_failed[0] = 0
+
+	@staticmethod
+	def recover(stage):
+		""" Try to recover the camera according to the stage reached """
+		tools.logger.syslog("Camera recovery stage %s"%STAGES_NAME[stage])
+		server.events.Events.publish(tools.topic.camera_state, tools.topic.value_failed, "Recovery stage %s"%STAGES_NAME[stage])
+		if stage == STAGE_REINIT:
+			# Reset the sensor, the camera configuration must be restored
+			try:
+				camera.reset()
+			except ValueError as err:
+				tools.logger.syslog(err)
+			Camera.modified[0] = True
+		elif stage == STAGE_REOPEN:
+			Camera.close()
+			Camera.open(retry=1)
+			Camera.modified[0] = True
+		elif stage == STAGE_REBOOT:
+			tools.system.reboot("Reboot forced after camera problem, failures %s"%tools.strings.tostrings(Camera.get_stage_stat()))
+
+	@staticmethod
+	async def aretry(callback):
+		""" Retry camera action with an exponential backoff, yielding to the other tasks between attempts.
+		The recovery escalates through sensor reinit, camera reopen and reboot """
+		result = None
+		if Camera.opened:
+			stage = STAGE_RETRY
+			attempt = 0
+			delay = BACKOFF_MIN
+			while 1:
+				start = tools.strings.ticks()
+				try:
+					result = callback()
+					Camera.success[0] += 1
+					Metrics.capture(start, result)
+					break
+				except ValueError:
+					Camera.failed[0] += 1
+					Camera.new_failed[0] += 1
+					Camera.stage_failed[stage] += 1
+					Metrics.retry()
+					attempt += 1
+					if attempt >= STAGE_ATTEMPTS:
+						attempt = 0
+						stage += 1
+						Camera.recover(stage)
+						if stage >= STAGE_REBOOT:
+							break
+						# After the recovery action, the camera is retried quickly
+						delay = BACKOFF_MIN
+					await uasyncio.sleep_ms(delay)
+					delay = min(delay * 2, BACKOFF_MAX)
+			Camera.show_stat()
 		return result
 
 	@staticmethod
@@ -317,6 +605,8 @@ class Camera:
 		elif resolution == b"QVGA"  or resolution == b"320x240"   :val = camera.FRAMESIZE_QVGA
 		elif resolution == b"HQVGA" or resolution == b"240x176"   :val = camera.FRAMESIZE_HQVGA
 		elif resolution == b"QQVGA" or resolution == b"160x120"   :val = camera.FRAMESIZE_QQVGA
+		if val is not None:
+			Metrics.framesize[0] = resolution
 		if Camera.opened:
 			# print("Framesize %s"%strings.tostrings(resolution))
 			result = camera.framesize(val)
@@ -352,6 +642,8 @@ class Camera:
 		""" Configure the compression """
 		result = None
 		Camera.modified[0] = modified
+		if val is not None:
+			Metrics.quality[0] = val
 		if Camera.opened:
 			# print("Quality %d"%val)
 			result = camera.quality(val)
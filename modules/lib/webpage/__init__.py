@@ -15,6 +15,7 @@ import webpage.systempage
 import webpage.webhookpage
 import webpage.mqttpage
 import webpage.fileexplorer
+import webpage.eventspage
 import tools.info
 import tools.support
 
@@ -1,15 +1,18 @@
 # Distributed under Pycameresp License
 # Copyright (c) 2023 Remi BERTHOLET
 """ Function define the web page to see the camera streaming """
+import json
 import server.httprequest
 from htmltemplate          import *
 import webpage.mainpage
 import webpage.streamingpage
 import video.video
+import server.timesetting
 import tools.lang
 import tools.info
 import tools.tasking
 import tools.features
+import tools.date
 
 @server.httpserver.HttpServer.add_route(b'/camera', menu=tools.lang.menu_camera, item=tools.lang.item_camera, available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.camera)
 async def camera_page(request, response, args):
@@ -106,3 +109,55 @@ async def camera_on_off(request, response, args):
 			Submit(text=tools.lang.camera_off if config.activated else tools.lang.camera_on,  name=b"action", value=b"off" if config.activated else b"on" ), alert
 		]))
 	await response.send_page(page)
+
+async def get_snapshot(max_age):
+	""" Get the last frame captured by the motion detection or the streaming if it is younger than max_age,
+	otherwise capture a new frame """
+	image = video.video.Snapshot.get(max_age)
+	if image is None:
+		reserved = await video.video.Camera.reserve(video.video.Snapshot, timeout=5)
+		try:
+			if reserved:
+				# A frame may have been captured during the wait of camera
+				image = video.video.Snapshot.get(max_age)
+				if image is None:
+					if video.video.Camera.is_opened() is False:
+						video.video.Camera.open()
+						video.video.Camera.configure(video.video.Camera.get_config())
+					image = await video.video.Camera.acapture()
+					video.video.Snapshot.set(image)
+			else:
+				# The camera is busy, the last frame is better than nothing
+				image = video.video.Snapshot.get()
+		finally:
+			if reserved:
+				await video.video.Camera.unreserve(video.video.Snapshot)
+	return image
+
+@server.httpserver.HttpServer.add_route(b'/camera/snapshot', available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.camera)
+async def camera_snapshot(request, response, args):
+	""" Send a still image of camera, a recent frame is reused instead of capturing a new one """
+	tools.tasking.Tasks.slow_down()
+	config = video.video.Camera.get_config()
+	try:
+		max_age = int(request.params.get(b"max_age", config.snapshot_age))
+	except ValueError:
+		max_age = config.snapshot_age
+	image = await get_snapshot(max_age)
+	if image is None:
+		await response.send_error(status=b"503")
+	else:
+		etag = b'"%s"'%video.video.Snapshot.get_etag()
+		last_modified = tools.date.date_to_http(server.timesetting.local_to_utc(video.video.Snapshot.get_date()))
+		headers = {b"ETag":etag, b"Last-Modified":last_modified, b"Cache-Control":b"no-cache"}
+		if request.is_not_modified(etag, last_modified):
+			await response.send_not_modified(headers=headers)
+		else:
+			await response.send_buffer(b"snapshot.jpg", image, headers=headers)
+
+@server.httpserver.HttpServer.add_route(b'/camera/metrics', available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.camera)
+async def camera_metrics(request, response, args):
+	""" Send the metrics of camera pipeline, the parameter reset clears them """
+	if request.params.get(b"reset", None) is not None:
+		video.video.Metrics.reset()
+	await response.send_buffer(b"metrics.json", json.dumps(video.video.Metrics.get()))
@@ -0,0 +1,19 @@
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Function define the web page which sends the live events of the device """
+import server.httpserver
+import server.events
+
+@server.httpserver.HttpServer.add_route(b'/events', long_lived=True)
+async def events_page(request, response, args):
+	""" Send the live events to the browser with server-sent events, the connection stays open """
+	# The events stream ends only when the connection is closed
+	response.close_connection()
+	if server.events.Events.is_full():
+		await response.send_error(status=b"503", content=b"Too many event clients")
+	else:
+		response.set_status(b"200")
+		response.set_header(b"Content-Type" , b"text/event-stream")
+		response.set_header(b"Cache-Control", b"no-cache")
+		await response.serialize(response.streamio)
+		await server.events.Events.send(response.streamio, request.headers.get(b"Last-Event-ID", None))
@@ -151,7 +151,7 @@ async def download_file_browser(request, response, args):
 	""" Download file """
 	path = tools.strings.tostrings(request.params.get(b"path", b""))
 	tools.tasking.Tasks.slow_down()
-	await response.send_file(path, headers=request.headers)
+	await response.send_file(path, request=request)
 
 @server.httpserver.HttpServer.add_route(FILE_EXPLORER+b'/text_file')
 async def text_file_page(request, response, args):
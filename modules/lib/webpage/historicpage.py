@@ -98,9 +98,14 @@ async def historic(request, response, args):
 			var current_day = '%s';
 
 			var historic = null;
+			var historic_etag = null;
+			var loading = false;
 			var last_id = 0;
+			const HISTORIC_POLLING = 30000;
+			var polling = null;
 			var historic_request = new XMLHttpRequest();
 			var image_request    = new XMLHttpRequest();
+			var zoom_request     = new XMLHttpRequest();
 
 			const MOTION_FILENAME =0;
 			const MOTION_WIDTH    =1;
@@ -108,11 +113,39 @@ async def historic(request, response, args):
 			const MOTION_DIFFS    =3;
 			const MOTION_SQUAREX  =4;
 			const MOTION_SQUAREY  =5;
+			const MOTION_THUMBNAIL=6;
+
+			if (window.EventSource)
+			{
+				// The device announces each new version of historic, the polling remains if the connection is lost
+				var events = new EventSource("events");
+				events.addEventListener("motion/historic", load_historic);
+			}
 
 			function load_historic()
 			{
+				// The historic is already loading
+				if (historic_request.readyState > XMLHttpRequest.UNSENT && historic_request.readyState < XMLHttpRequest.DONE)
+				{
+					return;
+				}
+				clearTimeout(polling);
+				// The historic is not changed while its images are loading
+				if (loading)
+				{
+					polling = setTimeout(load_historic, HISTORIC_POLLING);
+					return;
+				}
 				historic_request.onreadystatechange = historic_loaded;
-				historic_request.open("GET","historic/historic.json",true);
+				if (historic_etag === null)
+				{
+					historic_request.open("GET","historic/historic.json",true);
+				}
+				else
+				{
+					historic_request.open("GET","historic/historic.json?since=" + encodeURIComponent(historic_etag.replaceAll('"','')),true);
+					historic_request.setRequestHeader("If-None-Match", historic_etag);
+				}
 				historic_request.send();
 			}
 
@@ -122,20 +155,78 @@ async def historic(request, response, args):
 				{
 					if (historic_request.status === 200)
 					{
-						historic = JSON.parse(historic_request.responseText);
-						select_day();
-						load_image();
+						var motions = JSON.parse(historic_request.responseText);
+						var refresh = true;
+						historic_etag = historic_request.getResponseHeader("ETag");
+						if (historic !== null && historic_request.getResponseHeader("X-Historic") === "since")
+						{
+							// The motions modified since (thumbnail added) replace the previous ones
+							for (i = historic.length - 1; i >= 0; i--)
+							{
+								for (j = 0; j < motions.added.length; j++)
+								{
+									if (motions.added[j][MOTION_FILENAME] === historic[i][MOTION_FILENAME])
+									{
+										historic.splice(i, 1);
+										break;
+									}
+								}
+							}
+							historic = motions.added.concat(historic);
+							refresh = false;
+							for (i = 0; i < motions.added.length; i++)
+							{
+								if (get_day(i) == current_day)
+								{
+									refresh = true;
+								}
+							}
+							// The oldest motions removed from the historic of the device
+							for (i = historic.length - 1; i >= 0; i--)
+							{
+								if (motions.removed.includes(historic[i][MOTION_FILENAME]))
+								{
+									if (get_day(i) == current_day)
+									{
+										refresh = true;
+									}
+									historic.splice(i, 1);
+								}
+							}
+						}
+						else
+						{
+							historic = motions;
+						}
+						if (refresh)
+						{
+							document.getElementById('motions').replaceChildren();
+							last_id = 0;
+							select_day();
+							load_image();
+						}
 					}
+					polling = setTimeout(load_historic, HISTORIC_POLLING);
 				}
 			}
 
 			function load_image()
 			{
+				loading = false;
 				if (historic.length > 0)
 				{
 					var motion = historic[last_id];
+					loading = true;
 					image_request.onreadystatechange = image_loaded;
-					image_request.open("GET","/historic/images/" + motion[MOTION_FILENAME],true);
+					// The grid shows the thumbnail when it exists, the full image is loaded only in the zoom
+					if (motion.length > MOTION_THUMBNAIL && motion[MOTION_THUMBNAIL])
+					{
+						image_request.open("GET","/historic/thumbnails/" + motion[MOTION_FILENAME],true);
+					}
+					else
+					{
+						image_request.open("GET","/historic/images/" + motion[MOTION_FILENAME],true);
+					}
 					image_request.send();
 				}
 			}
@@ -222,6 +313,10 @@ async def historic(request, response, args):
 										view.width     = motion[MOTION_WIDTH ] * get_quality();
 										view.height    = motion[MOTION_HEIGHT] * get_quality();
 										destCtx.drawImage(canvas, 0, 0);
+										if (motion.length > MOTION_THUMBNAIL && motion[MOTION_THUMBNAIL])
+										{
+											zoom_motion(view, motion);
+										}
 									};
 
 							var image = new Image();
@@ -245,6 +340,14 @@ async def historic(request, response, args):
 							{
 								setTimeout(load_image, 1);
 							}
+							else
+							{
+								loading = false;
+							}
+						}
+						else
+						{
+							loading = false;
 						}
 					}
 					else 
@@ -280,13 +383,32 @@ async def historic(request, response, args):
 				}
 			}
 
+			function zoom_motion(view, motion)
+			{
+				zoom_request.abort();
+				zoom_request.onreadystatechange = function()
+				{
+					if (zoom_request.readyState === XMLHttpRequest.DONE && zoom_request.status === 200)
+					{
+						var image = new Image();
+							image.src        = 'data:image/jpeg;base64,' + zoom_request.response;
+							image.onload     = function(){draw_motion(view, motion, image);};
+					}
+				};
+				zoom_request.open("GET","/historic/images/" + motion[MOTION_FILENAME],true);
+				zoom_request.send();
+			}
+
 			function show_motion(id, image)
+			{
+				draw_motion(document.getElementById(id), historic[id], image);
+			}
+
+			function draw_motion(canvas, motion, image)
 			{
 				var x;
 				var y;
 
-				var motion = historic[id];
-				var canvas = document.getElementById(id);
 				var ctx = canvas.getContext('2d');
 
 				var squarex = motion[MOTION_SQUAREX] * get_quality();
@@ -294,7 +416,7 @@ async def historic(request, response, args):
 				var maxx = (motion[MOTION_WIDTH] /squarex) * get_quality();
 				var maxy = (motion[MOTION_HEIGHT]/squarey) * get_quality();
 
-				ctx.drawImage(image, 0, 0, motion[MOTION_WIDTH ]  , motion[MOTION_HEIGHT], 0, 0, motion[MOTION_WIDTH ] * get_quality(), motion[MOTION_HEIGHT] * get_quality());
+				ctx.drawImage(image, 0, 0, image.width, image.height, 0, 0, motion[MOTION_WIDTH ] * get_quality(), motion[MOTION_HEIGHT] * get_quality());
 
 				ctx.strokeStyle = "red";
 				ctx.lineWidth =  1 * get_quality();
@@ -391,10 +513,16 @@ async def historic(request, response, args):
 
 @server.httpserver.HttpServer.add_route(b'/historic/historic.json', available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.motion)
 async def historic_json(request, response, args):
-	""" Send historic json file """
+	""" Send historic json file, the parameter since asks only the motions added and removed after this entity tag """
 	tools.tasking.Tasks.slow_down()
 	try:
-		await response.send_buffer(b"historic.json", await motion.historic.Historic.get_json())
+		etag = b'"%s"'%motion.historic.Historic.get_etag()
+		if request.headers.get(b"If-None-Match", None) == etag:
+			await response.send_not_modified(headers={b"ETag":etag})
+		else:
+			content, etag, full = await motion.historic.Historic.get_json(request.params.get(b"since", None))
+			headers = {b"ETag":b'"%s"'%etag, b"Cache-Control":b"no-cache", b"X-Historic":b"full" if full else b"since"}
+			await response.send_buffer(b"historic.json", content, headers=headers)
 	except Exception as err:
 		await response.send_not_found(err)
 
@@ -406,7 +534,23 @@ async def historic_image(request, response, args):
 	try:
 		if reserved:
 			await motion.historic.Historic.acquire()
-			await response.send_file(tools.strings.tostrings(request.path[len("/historic/images/"):]), base64=True)
+			await response.send_file(tools.strings.tostrings(request.path[len("/historic/images/"):]), base64=True, request=request)
+		else:
+			await response.send_not_found()
+	finally:
+		if reserved:
+			await motion.historic.Historic.release()
+			await video.video.Camera.unreserve(motion.historic.Historic)
+
+@server.httpserver.HttpServer.add_route(b'/historic/thumbnails/.*', available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.motion)
+async def historic_thumbnail(request, response, args):
+	""" Send historic thumbnail of image """
+	tools.tasking.Tasks.slow_down()
+	reserved = await video.video.Camera.reserve(motion.historic.Historic, timeout=5, suspension=10)
+	try:
+		if reserved:
+			await motion.historic.Historic.acquire()
+			await response.send_file(motion.historic.Historic.get_thumbnail(tools.strings.tostrings(request.path[len("/historic/thumbnails/"):])), base64=True, request=request)
 		else:
 			await response.send_not_found()
 	finally:
@@ -422,7 +566,7 @@ async def download_image(request, response, args):
 	try:
 		if reserved:
 			await motion.historic.Historic.acquire()
-			await response.send_file(tools.strings.tostrings(request.path[len("/historic/download/"):]), base64=False)
+			await response.send_file(tools.strings.tostrings(request.path[len("/historic/download/"):]), base64=False, request=request)
 		else:
 			await response.send_not_found()
 	finally:
@@ -7,6 +7,7 @@ import webpage.mainpage
 import webpage.streamingpage
 import video.video
 import motion.motioncore
+import motion.historic
 import tools.lang
 import tools.info
 import tools.features
@@ -188,6 +189,13 @@ async def motion_page(request, response, args):
 			Switch(text=tools.lang.suspends_motion_detection,                name=b"suspend_on_presence",     checked=config.suspend_on_presence, disabled=disabled),
 			Switch(text=tools.lang.permanent_detection,                      name=b"permanent_detection",     checked=config.permanent_detection, disabled=disabled),
 			Switch(text=tools.lang.turn_on_flash,                            name=b"light_compensation",      checked=config.light_compensation,  disabled=disabled),
+			Switch(text=tools.lang.compare_background,                       name=b"background_detection",    checked=config.background_detection, disabled=disabled),
+			Switch(text=tools.lang.save_thumbnail,                           name=b"thumbnail",               checked=config.thumbnail,           disabled=disabled),
+			Slider(text=tools.lang.motion_polling_min,          name=b"polling_min",        min=b"1",  max=b"100", step=b"1",  value=b"%d"%config.polling_min,         disabled=disabled),
+			Slider(text=tools.lang.motion_polling_max,          name=b"polling_max",        min=b"50",  max=b"2000", step=b"50",  value=b"%d"%config.polling_max,         disabled=disabled),
+			Edit(text=tools.lang.motion_polling, value=motion.motioncore.PollingScheduler.get_status(), disabled=True),
+			Edit(text=tools.lang.motion_saving, value=motion.historic.Historic.get_queue_status(), disabled=True),
+			Edit(text=tools.lang.historic_storage, value=motion.historic.Ledger.get_status(), disabled=True),
 			submit
 		]))
 	await response.send_page(page)
@@ -1,6 +1,7 @@
 # Distributed under Pycameresp License
 # Copyright (c) 2023 Remi BERTHOLET
 """ Function define the web page to see the camera streaming """
+import json
 import uasyncio
 import server.httpserver
 import server.httprequest
@@ -11,6 +12,19 @@ import tools.tasking
 import tools.info
 import tools.watchdog
 import tools.features
+import tools.filesystem
+import tools.strings
+
+# Target duration in ms of the writing of one frame
+STREAM_LATENCY     = 200
+# Maximal delay in ms between two frames of a client
+STREAM_DELAY_MAX   = 2000
+# Maximal increase of jpeg compression when clients are congested
+STREAM_QUALITY_MAX = 30
+# Duration in ms of the window used to compute the frames and bytes per second
+STREAM_WINDOW      = 2000
+# Maximal number of clients of the video streaming, each client keeps its connection open
+STREAM_CLIENTS_MAX = 6
 
 class Streaming:
 	""" Management class of video streaming of the camera via an html page """
@@ -44,7 +58,6 @@ class Streaming:
 	def get_html(request):
 		""" Return streaming html part with javascript code """
 		Streaming.activity()
-		Streaming.streaming_id[0] += id(request)
 		return Tag(b"""
 		<div style="position: relative;">
 			<img id="video-stream" src="" width="100%%"/>
@@ -73,71 +86,250 @@ class Streaming:
 		""" Stop streaming """
 		Streaming.streaming_id[0] += 1
 
-@server.httpserver.HttpServer.add_route(b'/camera/start', available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.camera)
+class MjpegFrame:
+	""" Header of mjpeg frames, preallocated and reused for all frames of a client.
+	It contains the end of previous chunk, the multipart boundary, the part header and the chunk size of image """
+	def __init__(self, identifier):
+		""" Constructor """
+		header = b'36\r\nContent-Type: image/jpeg\r\nContent-Length:         \r\n\r\n\r\n00000000\r\n'
+		self.first = bytearray(header)
+		self.next  = bytearray(b"\r\n%x\r\n\r\n--%s\r\n\r\n"%(len(identifier) + 6, identifier) + header)
+		self.length_end = len(header) - len(b'\r\n\r\n\r\n00000000\r\n')
+		self.chunk_end  = len(header) - 2
+		self.is_first   = True
+
+	@staticmethod
+	def set_number(buffer, end, value, width, base, fill):
+		""" Write the number in the buffer, right aligned before end """
+		for position in range(end - 1, end - width - 1, -1):
+			if value > 0 or position == end - 1:
+				buffer[position] = 0x30 + value % base if value % base < 10 else 0x57 + value % base
+				value //= base
+			else:
+				buffer[position] = fill
+
+	def get(self, length):
+		""" Get the header of the frame with the image length """
+		if self.is_first:
+			buffer = self.first
+			self.is_first = False
+		else:
+			buffer = self.next
+		offset = len(buffer) - len(self.first)
+		MjpegFrame.set_number(buffer, offset + self.length_end, length, 8, 10, 0x20)
+		MjpegFrame.set_number(buffer, offset + self.chunk_end,  length, 8, 16, 0x30)
+		return buffer
+
+	def get_end(self):
+		""" Get the end of stream """
+		return self.next[:len(self.next) - len(self.first)]
+
+class StreamClient:
+	""" Client of the video streaming, with its counters """
+	def __init__(self, request, writer, streaming_id):
+		""" Constructor """
+		self.remoteaddr   = request.remoteaddr
+		self.writer       = writer
+		self.streaming_id = streaming_id
+		self.sequence     = 0
+		self.sent         = 0
+		self.dropped      = 0
+		self.bytes        = 0
+		self.latency      = 0
+		self.delay        = 0
+		self.fps          = 0.
+		self.rate         = 0
+		self.window       = [tools.strings.ticks(), 0, 0]
+
+	def update(self, length, duration):
+		""" Update the counters after the writing of a frame, and adapt the delay between frames to hold the target latency """
+		self.sent    += 1
+		self.bytes   += length
+		self.latency  = duration
+		if duration > STREAM_LATENCY:
+			self.delay = min(self.delay * 2 + 20, STREAM_DELAY_MAX)
+		elif duration < STREAM_LATENCY//2:
+			self.delay = self.delay * 3 // 4
+
+		now = tools.strings.ticks()
+		elapsed = tools.strings.ticks_diff(now, self.window[0])
+		if elapsed >= STREAM_WINDOW:
+			self.fps  = (self.sent  - self.window[1]) * 1000 / elapsed
+			self.rate = (self.bytes - self.window[2]) * 1000 // elapsed
+			self.window = [now, self.sent, self.bytes]
+
+	def get_status(self):
+		""" Get the counters of client """
+		return {"address":tools.strings.tostrings(self.remoteaddr), "sent":self.sent, "dropped":self.dropped, "bytes":self.bytes,
+			"fps":round(self.fps, 1), "bytes_per_second":self.rate, "latency":self.latency, "delay":self.delay}
+
+class Broadcaster:
+	""" Capture each frame once and share it with all the clients of the video streaming.
+	A slow client skips the frames captured during its writing, without stalling the others """
+	clients  = []
+	task     = [None]
+	frame    = [None]
+	sequence = [0]
+	event    = [None]
+	quality  = [0]
+
+	@staticmethod
+	def publish(image):
+		""" Publish the frame captured and wake up the clients """
+		Broadcaster.frame[0] = image
+		Broadcaster.sequence[0] += 1
+		event = Broadcaster.event[0]
+		Broadcaster.event[0] = uasyncio.Event()
+		if event is not None:
+			event.set()
+
+	@staticmethod
+	async def wait(client):
+		""" Wait the next frame of the client, returns None if the capture stopped """
+		while client.sequence == Broadcaster.sequence[0]:
+			if Broadcaster.event[0] is None:
+				Broadcaster.event[0] = uasyncio.Event()
+			await Broadcaster.event[0].wait()
+		if client.sequence != 0:
+			client.dropped += Broadcaster.sequence[0] - client.sequence - 1
+		client.sequence = Broadcaster.sequence[0]
+		return Broadcaster.frame[0]
+
+	@staticmethod
+	def add(client):
+		""" Add client and start the capture if not yet started """
+		client.sequence = Broadcaster.sequence[0]
+		Broadcaster.clients.append(client)
+		if Broadcaster.task[0] is None:
+			Broadcaster.task[0] = uasyncio.create_task(Broadcaster.capture())
+
+	@staticmethod
+	def is_full():
+		""" Indicates if the maximum of clients is reached """
+		return len(Broadcaster.clients) >= STREAM_CLIENTS_MAX
+
+	@staticmethod
+	def remove(client):
+		""" Remove client, the capture stops with the last client """
+		if client in Broadcaster.clients:
+			Broadcaster.clients.remove(client)
+
+	@staticmethod
+	def get_status():
+		""" Get the jpeg compression increase and the counters of all clients """
+		return {"quality":Broadcaster.quality[0], "clients":[client.get_status() for client in Broadcaster.clients]}
+
+	@staticmethod
+	def adapt_quality():
+		""" Increase the jpeg compression when a client is congested, and decrease it slowly when all clients are fluid """
+		congested = False
+		fluid = True
+		for client in Broadcaster.clients:
+			if client.latency > STREAM_LATENCY:
+				congested = True
+			if client.latency >= STREAM_LATENCY//2:
+				fluid = False
+		quality = Broadcaster.quality[0]
+		if congested:
+			quality = min(quality + 5, STREAM_QUALITY_MAX)
+		elif fluid:
+			quality = max(quality - 1, 0)
+		if quality != Broadcaster.quality[0]:
+			Broadcaster.quality[0] = quality
+			Broadcaster.set_quality()
+
+	@staticmethod
+	def set_quality():
+		""" Set the jpeg compression of capture """
+		config = Streaming.get_config()
+		if config is None:
+			config = video.video.Camera.get_config()
+		video.video.Camera.quality(min(config.quality + Broadcaster.quality[0], 63))
+
+	@staticmethod
+	async def capture():
+		""" Capture the frames while clients are connected """
+		reserved = False
+		try:
+			reserved = await video.video.Camera.reserve(Broadcaster, timeout=5, suspension=10)
+			if reserved:
+				video.video.Camera.open()
+				while len(Broadcaster.clients) > 0:
+					if Streaming.is_durty():
+						video.video.Camera.configure(Streaming.get_config())
+						Streaming.reset_durty()
+						if Broadcaster.quality[0] > 0:
+							Broadcaster.set_quality()
+					image = await video.video.Camera.acapture()
+					if image is None:
+						break
+					Broadcaster.publish(image)
+					video.video.Snapshot.set(image)
+					Broadcaster.adapt_quality()
+					if tools.filesystem.ismicropython():
+						await uasyncio.sleep_ms(0)
+					else:
+						await uasyncio.sleep(0.1)
+		except Exception as err:
+			tools.logger.syslog(err)
+		finally:
+			Broadcaster.task[0] = None
+			Broadcaster.publish(None)
+			if reserved:
+				await video.video.Camera.unreserve(Broadcaster)
+
+@server.httpserver.HttpServer.add_route(b'/camera/start', long_lived=True, available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.camera)
 async def camera_start_streaming(request, response, args):
 	""" Start video streaming """
 	tools.tasking.Tasks.slow_down()
 	if request.name != "HttpStreaming":
 		return
 
+	# The clients are bounded by the broadcaster, the connection does not hold a place of the server admission
+	if Broadcaster.is_full():
+		response.close_connection()
+		await response.send_error(status=b"503", content=b"Too many streaming clients")
+		return
+
+	client = None
+	writer = None
 	try:
-		writer = None
-		currentstreaming_id = int(request.params[b"streaming_id"])
-		reserved = await video.video.Camera.reserve(request, timeout=5, suspension=10)
-		if reserved:
-			failed = False
-			video.video.Camera.open()
-
-			response.set_status(b"200")
-			response.set_header(b"Content-Type"               ,b"multipart/x-mixed-replace")
-			response.set_header(b"Transfer-Encoding"          ,b"chunked")
-			response.set_header(b"Access-Control-Allow-Origin",b"*")
-
-			await response.serialize(response.streamio)
-			writer = response.streamio
-			identifier = b"\r\n%x\r\n\r\n--%s\r\n\r\n"%(len(response.identifier) + 6, response.identifier)
-			frame = b'%s36\r\nContent-Type: image/jpeg\r\nContent-Length: %8d\r\n\r\n\r\n%x\r\n'
-
-			if tools.filesystem.ismicropython():
-				micropython = True
-			else:
-				micropython = False
+		response.set_status(b"200")
+		response.set_header(b"Content-Type"               ,b"multipart/x-mixed-replace")
+		response.set_header(b"Transfer-Encoding"          ,b"chunked")
+		response.set_header(b"Access-Control-Allow-Origin",b"*")
 
-			if Streaming.is_durty():
-				video.video.Camera.configure(Streaming.get_config())
-				Streaming.reset_durty()
+		await response.serialize(response.streamio)
+		writer = response.streamio
+		frame = MjpegFrame(response.identifier)
 
-			image = video.video.Camera.capture()
+		client = StreamClient(request, writer, int(request.params[b"streaming_id"]))
+		Broadcaster.add(client)
+		while client.streaming_id == Streaming.get_streaming_id():
+			image = await Broadcaster.wait(client)
+			if image is None:
+				break
 			length = len(image)
-			try:
-				await writer.write(frame%(b"", length, length))
-				await writer.write(image)
-			except Exception as err:
-				failed = True
-				currentstreaming_id = 0
-
-			while currentstreaming_id == Streaming.get_streaming_id():
-				if Streaming.is_durty():
-					video.video.Camera.configure(Streaming.get_config())
-					Streaming.reset_durty()
-				image = video.video.Camera.capture()
-				length = len(image)
-				try:
-					await writer.write(frame%(identifier, length, length))
-					await writer.write(image)
-				except Exception as err:
-					failed = True
-					break
-				if micropython is False:
-					await uasyncio.sleep(0.1)
-			if failed is False:
-				await writer.write(identifier)
-		else:
-			pass
+			start = tools.strings.ticks()
+			# The header and the image leave together
+			await writer.writev((frame.get(length), image))
+			client.update(length, tools.strings.ticks_diff(tools.strings.ticks(), start))
+
+			# Slow down the client if the writing is too long
+			if client.delay > 0:
+				await uasyncio.sleep_ms(client.delay)
+		await writer.write(frame.get_end())
+	except OSError:
+		pass
 	except Exception as err:
 		tools.logger.syslog(err)
 	finally:
-		if reserved:
-			await video.video.Camera.unreserve(request)
+		if client:
+			Broadcaster.remove(client)
 		if writer:
 			await writer.close()
+
+@server.httpserver.HttpServer.add_route(b'/camera/streams', available=tools.info.iscamera() and video.video.Camera.is_activated() and tools.features.features.camera)
+async def camera_streams(request, response, args):
+	""" Send the counters of all video streaming clients """
+	await response.send_buffer(b"streams.json", json.dumps(Broadcaster.get_status()))
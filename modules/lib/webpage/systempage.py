@@ -8,10 +8,32 @@ import webpage.mainpage
 import tools.lang
 import tools.archiver
 import tools.filesystem
+import tools.info
 import tools.logger
 import tools.system
 import tools.tasking
 
+UPLOAD_FILENAME = "upload.tmp"
+MAX_CONFIG_SIZE = 64*1024
+
+async def upload_archive(request, response, max_size):
+	""" Receive the archive straight into a file and extract it, returns False if the archive is too large or malformed """
+	try:
+		size = await request.receive_file(UPLOAD_FILENAME, max_size)
+	except ValueError:
+		response.close_connection()
+		await response.send_error(status=b"400", content=b"Bad request")
+		return False
+	if size is None:
+		response.close_connection()
+		await response.send_error(status=b"413", content=b"Payload too large")
+		return False
+	try:
+		tools.archiver.upload_files(UPLOAD_FILENAME)
+	finally:
+		tools.filesystem.remove(UPLOAD_FILENAME)
+	return True
+
 @server.httpserver.HttpServer.add_route(b'/system', menu=tools.lang.menu_system, item=tools.lang.item_system)
 async def system_page(request, response, args):
 	""" Function define the web page to manage system of the board """
@@ -43,38 +65,38 @@ async def system_page(request, response, args):
 async def upload_config(request, response, args):
 	""" Upload configuration """
 	tools.tasking.Tasks.slow_down()
-	file = request.get_content_filename()
-	tools.archiver.upload_files(file)
-	await response.send_ok()
+	if await upload_archive(request, response, MAX_CONFIG_SIZE):
+		await response.send_ok()
 
 @server.httpserver.HttpServer.add_route(b'/system/download_config')
 async def download_config(request, response, args):
 	""" Download configuration """
 	tools.tasking.Tasks.slow_down()
 	tools.archiver.download_files("config.cfg", path="./config", pattern="*.json", excludes=["*.tmp","sd/*",".DS_Store"], recursive=False)
-	await response.send_file(b"config.cfg", headers=request.headers)
+	await response.send_file(b"config.cfg", request=request)
 	tools.filesystem.remove("config.cfg")
 
 @server.httpserver.HttpServer.add_route(b'/system/upload_file_system')
 async def upload_file_system(request, response, args):
 	""" Upload file system """
 	tools.tasking.Tasks.slow_down()
-	tools.archiver.upload_files(request.get_content_filename())
-	await reboot(request, response, args)
+	# The archive must fit in the free space of flash
+	if await upload_archive(request, response, tools.info.flash_size()[2]):
+		await reboot(request, response, args)
 
 @server.httpserver.HttpServer.add_route(b'/system/download_file_system')
 async def download_file_system(request, response, args):
 	""" Download file system """
 	tools.tasking.Tasks.slow_down()
 	tools.archiver.download_files("fileSystem.cfs", path="./",pattern="*.*", excludes=["*.tmp","config/*","sd/*","syslog.*","www/bootstrap.*",".DS_Store"], recursive=True)
-	await response.send_file(b"fileSystem.cfs", headers=request.headers)
+	await response.send_file(b"fileSystem.cfs", request=request)
 	tools.filesystem.remove("fileSystem.cfs")
 
 @server.httpserver.HttpServer.add_route(b'/system/download_syslog')
 async def download_syslog(request, response, args):
 	""" Download syslog """
 	tools.tasking.Tasks.slow_down()
-	await response.send_file([b"syslog.log.4",b"syslog.log.3",b"syslog.log.2",b"syslog.log.1",b"syslog.log"], headers=request.headers)
+	await response.send_file([b"syslog.log.4",b"syslog.log.3",b"syslog.log.2",b"syslog.log.1",b"syslog.log"], request=request)
 
 @server.httpserver.HttpServer.add_route(b'/system/reboot')
 async def reboot(request, response, args):
@@ -1,8 +1,17 @@
 # Distributed under Pycameresp License
 # Copyright (c) 2023 Remi BERTHOLET
 """ Simulation ESP32CAM camera class, used on desktop to debug with vscode """
+try:
+	from PIL import Image
+except ImportError:
+	Image = None
+import io
+_frames = ["Test2.jpg","Test1.jpg"]
+_loop = True
 _current = 0
 _opened = False
+_faults = 0
+_faults_until = None
 _pixformat     = 0
 _aec_value     = 0
 _framesize     = 0
@@ -72,7 +81,9 @@ def init():
 
 def deinit():
 	""" Stop camera """
-	global _opened
+	global _opened, _faults_until
+	if _faults_until in ("reinit", "reopen"):
+		_faults_until = None
 	if _opened is True:
 		_opened = False
 		return True
@@ -80,19 +91,47 @@ def deinit():
 
 def reset():
 	""" Reset camera """
-	pass
+	global _faults_until
+	if _faults_until == "reinit":
+		_faults_until = None
+	return True
+
+def fault(count=1, until=None):
+	""" Simulate a faulty camera (desktop only) : the next count captures fail,
+	if until is "reinit" or "reopen" the captures fail until the camera is reset or reopened """
+	global _faults, _faults_until
+	_faults = count
+	_faults_until = until
+
+def _check_fault():
+	""" Raise the error of firmware if a fault is simulated """
+	global _faults
+	if _faults_until is not None:
+		raise ValueError("Camera capture Failed")
+	if _faults > 0:
+		_faults -= 1
+		raise ValueError("Camera capture Failed")
+
+def replay(filenames, loop=True):
+	""" Replace the captured images by a recorded sequence of jpeg files (desktop only) """
+	global _frames, _current, _loop
+	_frames  = list(filenames)
+	_current = 0
+	_loop    = loop
 
 def capture():
 	""" Capture image """
 	global _opened
 	global _current
 	if _opened:
-		if _current == 0:
-			data = open("Test2.jpg","rb").read()
-			_current = 1
-		else:
-			data = open("Test1.jpg","rb").read()
+		_check_fault()
+		if _current >= len(_frames):
+			if _loop is False:
+				return None
 			_current = 0
+		with open(_frames[_current],"rb") as file:
+			data = file.read()
+		_current += 1
 		return data
 	return None
 
@@ -124,52 +163,134 @@ def configure(**kwargs):
 		- flash_led          : GPIO pin for flash led or 0 to disable
 	"""
 
+def get_geometry(data):
+	""" Get the width and height of jpeg image """
+	pos = 2
+	while pos + 9 < len(data):
+		if data[pos] != 0xFF:
+			break
+		marker = data[pos+1]
+		# Start of frame baseline or progressive
+		if marker in (0xC0, 0xC1, 0xC2):
+			return (data[pos+7]<<8) | data[pos+8], (data[pos+5]<<8) | data[pos+6]
+		pos += 2 + ((data[pos+2]<<8) | data[pos+3])
+	return 800, 600
+
+def get_squares(width, height):
+	""" Get the size of squares detection, same rules than the firmware """
+	square_x = 64 if ((width  // 8) % 8) == 0 else 40
+	square_y = 64 if ((height // 8) % 8) == 0 else 40
+	return square_x, square_y
+
 class Motion:
 	""" Class motion detection returned by the detect function """
-	size_base = [10*1024]
-	size_direction = [1]
-	def __init__(self, motion_):
+	mask = [None, 0]
+	error_lights = [[[0,10],[30,10],[128,32],[256,32]]]
+	def __init__(self, image):
 		""" Constructor of motion """
-		self.size = self.size_base[0]
-		if self.size_direction[0] == 1:
-			self.size_base[0] += 1024
-			if self.size_base[0] > 66*1024:
-				self.size_direction[0] = 0
+		if image is None:
+			image = b""
+		self.image = image
+		self.width, self.height = get_geometry(image)
+		self.square_x, self.square_y = get_squares(self.width, self.height)
+		self.diff_x = self.width  // self.square_x
+		self.diff_y = self.height // self.square_y
+		self.max    = self.diff_x * self.diff_y
+		self.lights = self.get_lights()
+		if self.max > 0:
+			self.light = sum(self.lights) // self.max
 		else:
-			self.size_base[0] -= 1024
-			if self.size_base[0] < 10*1024:
-				self.size_direction[0] = 1
+			self.light = 0
+
+	def get_lights(self):
+		""" Compute the mean light of each square of detection """
+		if Image is not None and len(self.image) > 0:
+			try:
+				image = Image.open(io.BytesIO(self.image)).convert("L")
+				# pylint:disable=no-member
+				return list(image.resize((self.diff_x, self.diff_y), Image.BOX).getdata())
+			except Exception:
+				pass
+		# Without jpeg decoder, the entropy coded data is splitted in squares
+		lights = []
+		length = len(self.image) // self.max if self.max > 0 else 0
+		for square in range(self.max):
+			part = self.image[square*length:(square+1)*length]
+			lights.append(sum(part) // length if length > 0 else 0)
+		return lights
 
 	def deinit (self):
 		""" Deinit motion """
+		self.image = None
+
+	def get_error(self, light):
+		""" Get the error tolerated for the light level """
+		previous = None
+		for point in self.error_lights[0]:
+			if light <= point[0]:
+				if previous is None or point[0] == previous[0]:
+					return point[1]
+				return previous[1] + ((point[1] - previous[1]) * (light - previous[0])) // (point[0] - previous[0])
+			previous = point
+		return previous[1]
 
 	def compare(self, other):
 		""" Compare two motion detection """
+		# The mask applies only if it has the same squares count than the image, like the firmware
+		mask  = self.mask[0] if self.mask[1] == self.max else None
+		count = 0
+		diffs = []
+		diff_val = 0
+		total = 0
+		for square in range(self.max):
+			diff_val <<= 1
+			if square < len(other.lights):
+				delta = abs(self.lights[square] - other.lights[square])
+				total += delta
+				# The masked square is skipped with one bitwise operation
+				if mask is None or (mask[square >> 5] & (0x80000000 >> (square & 31))) == 0:
+					if delta > self.get_error(self.lights[square]):
+						diff_val |= 1
+						count += 1
+			if square % 32 == 31:
+				diffs.append(diff_val)
+				diff_val = 0
+		if self.max % 32 != 0:
+			diff_val <<= (32 - (self.max % 32))
+			diffs.append(diff_val)
+		diffhisto = 256 - (total // self.max if self.max > 0 else 0)
 		return {
-			'feature': {'light': 37, 'saturation': 13},
-			'path': '2021-04-25 11-37-00',
-			'diff': {'squarex': 40, 'squarey': 40, 'width': 20, 'height': 15, 'max': 300, 'count': 0, 'light': 94, 'errhisto':256, 'diffhisto':256},
-			'index': 5417,
-			'image': '21-04-25 11-37-01 Id=5417 D=129.jpg',
-			'date': '2021-04-25 11-37-01',
-			'motion_id': 46,
-			'geometry': {'height': 600, 'width': 800}
+			'feature': {'light': self.light, 'saturation': 13},
+			'diff': {'squarex': self.square_x, 'squarey': self.square_y, 'width': self.diff_x, 'height': self.diff_y, 'max': self.max, 'count': count, 'light': self.light, 'errhisto':256, 'diffhisto':diffhisto, 'diffs':diffs},
+			'geometry': {'height': self.height, 'width': self.width}
 		}
 
 	def configure(self, config):
 		""" Configure motion detection """
+		Motion.mask[0] = None
+		Motion.mask[1] = 0
+		mask = config.get("mask", b"")
+		if len(mask) > 0:
+			# The mask is compiled once in a bitmap of 32 squares per word, with the same layout as the differences
+			bits = [0]*((len(mask) + 31) // 32)
+			for square in range(len(mask)):
+				if mask[square] == 0x2F:
+					bits[square >> 5] |= 0x80000000 >> (square & 31)
+			Motion.mask[0] = bits
+			Motion.mask[1] = len(mask)
+		Motion.error_lights[0] = config.get("errorLights", Motion.error_lights[0])
 
 	def get_image(self):
 		""" Get the image from motion """
-		return b""
+		return self.image
 
 	def get_size(self):
 		""" Get the size of image """
-		return self.size
+		return len(self.image)
 
 	def get_light(self):
 		""" Get light level """
-		return 128
+		return self.light
 
 	def extract(self):
 		""" Extract the motion informations """
@@ -177,15 +298,15 @@ class Motion:
 
 	def get_max_light(self):
 		""" Get maximal light detected """
-		return 256
+		return max(self.lights) if self.lights else 0
 
 	def get_min_light(self):
 		""" Get minimal light detected """
-		return 0
+		return min(self.lights) if self.lights else 0
 
 def motion():
 	""" Get motion detection """
-	return Motion(None)
+	return Motion(capture())
 
 def pixformat(val=None):
 	""" Set or get pixformat """
@@ -186,7 +186,8 @@ const mp_obj_type_t Motion_type;
 
 typedef struct 
 {
-	uint8_t * mask_data;
+	// Mask compiled in a bitmap of 32 squares per word, with the same layout as the differences
+	uint32_t * mask_bits;
 	uint16_t  mask_length;
 	Line_t errorLights[MAX_LINES];
 	Line_t errorHistos[MAX_LINES];
@@ -1180,9 +1181,26 @@ STATIC int Motion_computeDiff(Motion_t *self, Motion_t *previous, mp_obj_t resul
 	// Compute the error histo according to the curves configured
 	errHisto = Lines_getY(motionConfiguration->errorHistos, MAX_LINES, diffHisto);
 
+	// The mask applies only if it has the same squares count than the image
+	uint32_t       *pMaskBits       = 0;
+	if (motionConfiguration->mask_length > 0 && motionConfiguration->mask_length == self->diffMax)
+	{
+		pMaskBits = motionConfiguration->mask_bits;
+	}
+
 	// For all square detection
 	for (i = 0; i < self->diffMax; i++)
 	{
+		// The masked square is skipped with one bitwise operation
+		if (pMaskBits && (pMaskBits[i >> 5] & (0x80000000 >> (i & 31))))
+		{
+			*pDiffs = 0x00;
+			pDiffs ++;
+			pCurrentLights ++;
+			pPreviousLights ++;
+			continue;
+		}
+
 		// Get the current max light of the selected square for two motion images
 		light = max(*pCurrentLights, *pPreviousLights);
 
@@ -1208,84 +1226,33 @@ STATIC int Motion_computeDiff(Motion_t *self, Motion_t *previous, mp_obj_t resul
 	u_int32_t diffVal = 0;
 
 	char * diffs = (char*)_malloc(sizeof(char) * self->diffMax + 1);
-	if (motionConfiguration->mask_length > 0 && motionConfiguration->mask_length == self->diffMax)
+	pDiffs = self->diffs;
+	for (i = 0; i < self->diffMax; i++)
 	{
-		int ignored = 0;
-		uint8_t * pMask = motionConfiguration->mask_data;
-		pDiffs         = self->diffs;
-		for (i = 0; i < self->diffMax; i++)
+		if (*pDiffs)
 		{
-			if (*pDiffs)
-			{
-				if (*pMask == '/')
-				{
-					diffs[i] = ' ';
-					diffDetected --;
-					ignored ++;
-					*pDiffs = 0;
-					// ESP_LOGE(TAG,"ignored = %d %c %d", i, *pMask, diffDetected);
-				}
-				else
-				{
-					diffs[i] = '#';
-					diffVal |= 1;
-				}
-			}
-			else
-			{
-				diffs[i] = ' ';
-			}
-
-			if (i %32 == 31)
-			{
-				mp_obj_list_append(diffsVal, mp_obj_new_int(diffVal));
-				diffVal = 0;
-			}
-			else
-			{
-				diffVal <<= 1;
-			}
-
-			pDiffs++;
-			pMask++;
+			diffs[i] = '#';
+			diffVal |= 1;
 		}
-
-		diffVal <<= (31 - (self->diffMax%32));
-		mp_obj_list_append(diffsVal, mp_obj_new_int(diffVal));
-		//ESP_LOGE(TAG,"ignored=%d diff=%d",  ignored, diffDetected);
-	}
-	else
-	{
-		int count = 0;
-		pDiffs    = self->diffs;
-		for (i = 0; i < self->diffMax; i++)
+		else
 		{
-			if (*pDiffs)
-			{
-				diffs[i] = '#';
-				diffVal |= 1;
-				count ++;
-			}
-			else
-			{
-				diffs[i] = ' ';
-			}
-
-			if (i %32 == 31)
-			{
-				mp_obj_list_append(diffsVal, mp_obj_new_int(diffVal));
-				diffVal = 0;
-			}
-			else
-			{
-				diffVal <<= 1;
-			}
+			diffs[i] = ' ';
+		}
 
-			pDiffs++;
+		if (i %32 == 31)
+		{
+			mp_obj_list_append(diffsVal, mp_obj_new_int(diffVal));
+			diffVal = 0;
 		}
-		diffVal <<= (31 - (self->diffMax%32));
-		mp_obj_list_append(diffsVal, mp_obj_new_int(diffVal));
+		else
+		{
+			diffVal <<= 1;
+		}
+
+		pDiffs++;
 	}
+	diffVal <<= (31 - (self->diffMax%32));
+	mp_obj_list_append(diffsVal, mp_obj_new_int(diffVal));
 
 	mp_obj_t diffdict = mp_obj_new_dict(0);
 		mp_obj_dict_store(diffdict, mp_obj_new_str("count"     , strlen("count"))     ,  mp_obj_new_int(diffDetected));
@@ -1364,22 +1331,28 @@ STATIC mp_obj_t Motion_configure(mp_obj_t self_in, mp_obj_t params_in)
 		if (mp_obj_is_str_or_bytes(mask_in))
 		{
 			GET_STR_DATA_LEN(mask_in, mask_data, mask_length);
-			if (motionConfiguration->mask_data)
+			if (motionConfiguration->mask_bits)
 			{
-				_free((void**)&motionConfiguration->mask_data);
-				motionConfiguration->mask_data = 0;
+				_free((void**)&motionConfiguration->mask_bits);
+				motionConfiguration->mask_bits = 0;
 				motionConfiguration->mask_length = 0;
 			}
 
 			if (mask_length > 0)
 			{
-				motionConfiguration->mask_data = _malloc(mask_length + 1);
-				if (motionConfiguration->mask_data)
+				// The mask is compiled once, each '/' ignores its square
+				motionConfiguration->mask_bits = (uint32_t*)_malloc(sizeof(uint32_t) * ((mask_length + 31) / 32));
+				if (motionConfiguration->mask_bits)
 				{
-					memcpy(motionConfiguration->mask_data, mask_data, mask_length);
+					size_t i;
+					for (i = 0; i < mask_length; i++)
+					{
+						if (mask_data[i] == '/')
+						{
+							motionConfiguration->mask_bits[i >> 5] |= 0x80000000 >> (i & 31);
+						}
+					}
 					motionConfiguration->mask_length = mask_length;
-					motionConfiguration->mask_data[mask_length] = '\0';
-					//ESP_LOGE(TAG,"|%s|",motionConfiguration->mask_data);
 				}
 			}
 		}
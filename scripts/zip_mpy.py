@@ -4,6 +4,9 @@
 # pylint:disable=consider-using-f-string
 import os
 import sys
+import glob
+import gzip
+import tempfile
 from zipfile import ZipFile, ZIP_DEFLATED
 import useful
 
@@ -42,6 +45,20 @@ excludeds_shell = excludeds + [
 	"*/wifi/*",
 	"*/htmltemplate/*"]
 
+def gzip_www(pycameresp_dir, build_dir):
+	""" Create into the build directory the compressed copy of the static css and js files, the http server sends it to the browsers which accept gzip """
+	result = []
+	for filename in sorted(glob.glob("%s/modules/www/*.css"%pycameresp_dir) + glob.glob("%s/modules/www/*.js"%pycameresp_dir)):
+		with open(filename, "rb") as file:
+			content = file.read()
+		compressed = os.path.join(build_dir, os.path.basename(filename) + ".gz")
+		# The date is not stored, so the compressed file only changes with its content
+		with open(compressed, "wb") as file:
+			file.write(gzip.compress(content, compresslevel=9, mtime=0))
+		print("Gzip %s %d -> %d bytes"%(os.path.basename(filename), len(content), os.path.getsize(compressed)))
+		result.append(compressed)
+	return result
+
 def zip_mpy():
 	""" Zip micropython compiled """
 	useful.zip_dir("%s/delivery/shell.zip"%PYCAMERESP,MPY_DIRECTORY,  ["*.mpy"], excludeds_shell, False, [["frozen_mpy","lib"]])
@@ -51,6 +68,10 @@ def zip_mpy():
 	z.write(os.path.normpath("%s/modules/pycameresp.py"%PYCAMERESP),"pycameresp.py")
 	z.write(os.path.normpath("%s/modules/www/bootstrap.bundle.min.js"%PYCAMERESP),"www/bootstrap.bundle.min.js")
 	z.write(os.path.normpath("%s/modules/www/bootstrap.min.css"%PYCAMERESP),"www/bootstrap.min.css")
+	# The compressed files are added after the originals, so they are extracted later and are not older
+	with tempfile.TemporaryDirectory() as build_dir:
+		for filename in gzip_www(PYCAMERESP, build_dir):
+			z.write(os.path.normpath(filename),"www/%s"%os.path.basename(filename))
 	z.close()
 
 def zip_editor():
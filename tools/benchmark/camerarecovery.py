@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Measure the recovery of camera failures with the simulated faulty camera.
+For each scenario, it reports the time to get an image, the recovery stages reached
+and the maximal latency seen by another task of the event loop (http, mqtt, watchdog...).
+Example : python3 camerarecovery.py --failures 4 """
+import sys
+import os
+import os.path
+import time
+import tempfile
+import argparse
+MODULES = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/../../modules")
+sys.path.append(MODULES + "/lib")
+sys.path.append(MODULES + "/simul")
+# pylint:disable=wrong-import-position
+# pylint:disable=import-error
+# pylint:disable=consider-using-f-string
+import tools.logger
+# The logs of the run are written in the temporary directory, out of the source tree
+tools.logger.set_filename(os.path.join(tempfile.gettempdir(), "syslog.log"))
+import uasyncio
+import camera
+import video.video
+
+class Ticker:
+	""" Task which measures the latency of the event loop """
+	def __init__(self, period):
+		""" Constructor """
+		self.period = period
+		self.latency = 0
+		self.running = True
+
+	async def run(self):
+		""" Wake up periodically and measure the lateness """
+		while self.running:
+			begin = time.perf_counter()
+			await uasyncio.sleep_ms(self.period)
+			self.latency = max(self.latency, (time.perf_counter() - begin)*1000 - self.period)
+
+async def scenario(failures, until, synchronous):
+	""" Run one scenario of camera failures """
+	video.video.Camera.reset_stat()
+	ticker = Ticker(10)
+	task = uasyncio.create_task(ticker.run())
+	await uasyncio.sleep_ms(20)
+
+	camera.fault(failures, until)
+	begin = time.perf_counter()
+	if synchronous:
+		image = video.video.Camera.capture()
+	else:
+		image = await video.video.Camera.acapture()
+	duration = time.perf_counter() - begin
+
+	await uasyncio.sleep_ms(20)
+	ticker.running = False
+	await task
+	return image is not None, duration, ticker.latency, video.video.Camera.get_stage_stat()
+
+def main():
+	""" Main recovery measure """
+	parser = argparse.ArgumentParser(description="Measure the camera recovery with simulated failures")
+	parser.add_argument("--failures", type=int, default=2, help="number of consecutive failures of transient scenario")
+	args = parser.parse_args()
+
+	current_dir = os.getcwd()
+	os.chdir(MODULES)
+	try:
+		video.video.Camera.open()
+		scenarios = [
+			("transient sync",  args.failures, None,     True),
+			("transient async", args.failures, None,     False),
+			("until reinit",    0,             "reinit", False),
+			("until reopen",    0,             "reopen", False)]
+		print("%-16s %8s %12s %14s  %s"%("Scenario", "Image", "Duration ms", "Max latency ms", "Failures per stage"))
+		for name, failures, until, synchronous in scenarios:
+			success, duration, latency, stages = uasyncio.run(scenario(failures, until, synchronous))
+			print("%-16s %8s %12.1f %14.1f  %s"%(name, "yes" if success else "no", duration*1000, latency, stages.decode("utf8")))
+	finally:
+		os.chdir(current_dir)
+
+if __name__ == "__main__":
+	main()
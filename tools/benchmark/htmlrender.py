@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Measure the rendering of the html pages built with the templates.
+The pages are built by the routes of the main pages and of the electric meter plugin,
+and written in the buffered and chunked streams used by the http server.
+It compares the previous rendering, which awaited a write for each tag, with the rendering
+which gathers the tags of the page and writes them by blocks.
+Example : python3 htmlrender.py --loops 200 /system /rate """
+import sys
+import os
+import os.path
+import io
+import time
+import tempfile
+import argparse
+import tracemalloc
+MODULES = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/../../modules")
+sys.path.append(MODULES + "/lib")
+sys.path.append(MODULES + "/simul")
+# pylint:disable=wrong-import-position
+# pylint:disable=import-error
+# pylint:disable=consider-using-f-string
+import tools.logger
+# The logs of the run are written in the temporary directory, out of the source tree
+tools.logger.set_filename(os.path.join(tempfile.gettempdir(), "syslog.log"))
+import uasyncio
+import server.httpserver
+import server.httprequest
+import server.stream
+import htmltemplate
+import webpage
+import plugins.electricmeter.webpage
+import plugins.electricmeter.config
+
+PAGES = [b"/", b"/system", b"/server", b"/changepassword", b"/geolocation", b"/rate", b"/time_slots"]
+
+class PageResponse(server.httprequest.HttpResponse):
+	""" Response which keeps the page built by the route instead of sending it """
+	def __init__(self):
+		""" Constructor """
+		server.httprequest.HttpResponse.__init__(self, None)
+		self.page = None
+
+	async def send_page(self, page):
+		""" Keep the page """
+		self.page = page
+
+class CountingStream:
+	""" Socket stream which counts the writes, on the device each write is followed by a drain """
+	def __init__(self):
+		""" Constructor """
+		self.writes = 0
+		self.length = 0
+		self.content = io.BytesIO()
+
+	async def write(self, data):
+		""" Count the write """
+		self.writes += 1
+		self.length += len(data)
+		self.content.write(data)
+		return len(data)
+
+	async def writev(self, datas):
+		""" Count the writes """
+		for data in datas:
+			await self.write(data)
+
+	def clear(self):
+		""" Forget the content written """
+		self.content = io.BytesIO()
+
+def open_stream(stream, memory_low):
+	""" Open the streams used to send a page, when the memory is low each part of the page reaches the socket """
+	chunked = server.stream.Chunkedio(stream)
+	chunked.header = None
+	server.stream.Bufferedio.memorysize[0] = 0 if memory_low else 256*1024
+	return chunked, server.stream.Bufferedio(chunked)
+
+async def write_previous(template, file):
+	""" Previous rendering : a write is awaited for each tag and each child """
+	try:
+		await file.write(template.get_begin(template))
+		for child in template.children:
+			if isinstance(child, htmltemplate.Template):
+				await write_previous(child, file)
+			elif child is not None:
+				if type(child) == type(b""):
+					await file.write(child)
+		await file.write(template.get_end(template))
+	except Exception as err:
+		await file.write(tools.logger.html_exception(err))
+
+async def write_current(template, file):
+	""" Current rendering """
+	await template.write(file)
+
+async def build(path):
+	""" Build the page with its route """
+	request  = server.httprequest.HttpRequest(None, remoteaddr=b"127.0.0.1")
+	request.path = path
+	response = PageResponse()
+	function, args = server.httpserver.HttpServer.search_route(request)
+	await function(request, response, args)
+	return response.page
+
+async def measure_build(path, loops, memory):
+	""" Measure the time and the memory to build the page """
+	allocated = 0
+	begin = time.perf_counter()
+	for _ in range(loops):
+		if memory:
+			tracemalloc.reset_peak()
+			current = tracemalloc.get_traced_memory()[0]
+		page = await build(path)
+		if memory:
+			allocated += tracemalloc.get_traced_memory()[1] - current
+		del page
+	return (time.perf_counter() - begin)/loops, allocated/loops
+
+async def measure_render(page, method, loops, memory, memory_low):
+	""" Measure the time, the writes and the memory to render the page """
+	allocated = 0
+	stream = CountingStream()
+	begin = time.perf_counter()
+	for _ in range(loops):
+		if memory:
+			tracemalloc.reset_peak()
+			current = tracemalloc.get_traced_memory()[0]
+		chunked, file = open_stream(stream, memory_low)
+		await method(page, file)
+		await file.close()
+		await chunked.close()
+		stream.clear()
+		if memory:
+			allocated += tracemalloc.get_traced_memory()[1] - current
+	return (time.perf_counter() - begin)/loops, allocated/loops, stream.writes//loops, stream.length//loops
+
+async def get_content(page, method):
+	""" Get the content of the page rendered, without the chunks which differ with the size of writes """
+	stream = CountingStream()
+	await method(page, stream)
+	return stream.content.getvalue()
+
+async def main_measure(paths, loops, memory_low):
+	""" Measure all pages """
+	print("Memory %s : %s"%("low" if memory_low else "enough", "each part reaches the socket" if memory_low else "the page is buffered"))
+	print("%-15s %7s %6s %9s %9s %8s %8s %9s %9s %11s"%("Page", "bytes", "nodes", "build us", "build B",
+		"writes", "writes", "render us", "render us", "render B"))
+	print("%-15s %7s %6s %9s %9s %8s %8s %9s %9s %11s"%("", "", "", "", "",
+		"previous", "current", "previous", "current", "prev/cur"))
+	for path in paths:
+		page = await build(path)
+		if await get_content(page, write_previous) != await get_content(page, write_current):
+			print("%-15s rendering differs"%path.decode("utf8"))
+			continue
+		nodes = count_nodes(page)
+		build_duration, _ = await measure_build(path, loops, False)
+		tracemalloc.start()
+		_, build_allocated = await measure_build(path, loops, True)
+		tracemalloc.stop()
+
+		result = {}
+		for name, method in (("previous", write_previous), ("current", write_current)):
+			duration, _, writes, length = await measure_render(page, method, loops, False, memory_low)
+			tracemalloc.start()
+			_, allocated, _, _ = await measure_render(page, method, loops, True, memory_low)
+			tracemalloc.stop()
+			result[name] = (duration, allocated, writes, length)
+		print("%-15s %7d %6d %9.1f %9.0f %8d %8d %9.1f %9.1f %5.0f/%-5.0f"%(path.decode("utf8"), result["current"][3], nodes,
+			build_duration*1000000, build_allocated,
+			result["previous"][2], result["current"][2],
+			result["previous"][0]*1000000, result["current"][0]*1000000,
+			result["previous"][1], result["current"][1]))
+
+def count_nodes(template):
+	""" Count the templates of the page """
+	result = 1
+	for child in template.children:
+		if isinstance(child, htmltemplate.Template):
+			result += count_nodes(child)
+	return result
+
+def main():
+	""" Main rendering measure """
+	parser = argparse.ArgumentParser(description="Measure the rendering of html pages")
+	parser.add_argument("pages", nargs="*", default=[page.decode("utf8") for page in PAGES], help="paths of pages")
+	parser.add_argument("--loops", type=int, default=100, help="number of renderings of each page")
+	parser.add_argument("--memory_low", action="store_true", help="simulate a device with low memory, the page is not buffered")
+	args = parser.parse_args()
+
+	# The routes read the web files relatively to the modules directory
+	current_dir = os.getcwd()
+	os.chdir(MODULES)
+	try:
+		uasyncio.run(main_measure([page.encode("utf8") for page in args.pages], args.loops, args.memory_low))
+	finally:
+		os.chdir(current_dir)
+
+if __name__ == "__main__":
+	main()
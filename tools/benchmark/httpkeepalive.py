@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Measure the requests per second of the http server on a local tcp connection.
+It compares a new connection for each request, with the persistent connections of http/1.1.
+Several clients load the server at the same time, like a browser loading the resources of a page.
+Example : python3 httpkeepalive.py --requests 2000 --clients 4 --size 4096 """
+import sys
+import os
+import os.path
+import time
+import tempfile
+import argparse
+MODULES = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/../../modules")
+sys.path.append(MODULES + "/lib")
+sys.path.append(MODULES + "/simul")
+# pylint:disable=wrong-import-position
+# pylint:disable=import-error
+# pylint:disable=consider-using-f-string
+import tools.logger
+# The logs of the run are written in the temporary directory, out of the source tree
+tools.logger.set_filename(os.path.join(tempfile.gettempdir(), "syslog.log"))
+import uasyncio
+import server.server
+import server.httpserver
+import server.httpservercore
+
+CONTENT = [b""]
+
+@server.httpserver.HttpServer.add_route(b'/benchmark')
+async def benchmark_page(request, response, args):
+	""" Page sent to the clients """
+	await response.send_buffer(b"benchmark.txt", CONTENT[0])
+
+async def read_response(reader):
+	""" Read one http response, returns the length of content and True if the connection is kept alive """
+	status = await reader.readline()
+	if status == b"":
+		raise OSError(104, "Connection closed")
+	headers = {}
+	while True:
+		line = await reader.readline()
+		if line == b"\r\n":
+			break
+		name, value = line.split(b":", 1)
+		headers[name.strip().lower()] = value.strip().lower()
+	length = 0
+	if headers.get(b"transfer-encoding") == b"chunked":
+		while True:
+			size = int((await reader.readline()).strip(), 16)
+			await reader.readexactly(size + 2)
+			if size == 0:
+				break
+			length += size
+	elif b"content-length" in headers:
+		length = len(await reader.readexactly(int(headers[b"content-length"])))
+	else:
+		length = len(await reader.read())
+	return length, headers.get(b"connection") == b"keep-alive"
+
+async def client(port, count, keep_alive, result):
+	""" Send count requests, with a new connection for each request or by reusing the connection """
+	reader = writer = None
+	request = b"GET /benchmark HTTP/1.1\r\nHost: localhost\r\nConnection: %s\r\n\r\n"%(b"keep-alive" if keep_alive else b"close")
+	for _ in range(count):
+		if writer is None:
+			reader, writer = await uasyncio.open_connection("127.0.0.1", port)
+			result["connections"] += 1
+		writer.write(request)
+		await writer.drain()
+		length, alive = await read_response(reader)
+		result["received"] += length
+		result["requests"] += 1
+		if alive is False:
+			writer.close()
+			reader = writer = None
+	if writer is not None:
+		writer.close()
+
+async def measure(requests, clients, keep_alive):
+	""" Load the server with clients sending all the requests """
+	core = server.httpservercore.HttpServerCore(port=0, name="Benchmark")
+	service = await uasyncio.start_server(core.on_connection, "127.0.0.1", 0, backlog=5)
+	port = service.sockets[0].getsockname()[1]
+	result = {"requests":0, "connections":0, "received":0}
+	begin = time.perf_counter()
+	await uasyncio.gather(*[client(port, requests//clients, keep_alive, result) for _ in range(clients)])
+	result["duration"] = time.perf_counter() - begin
+	service.close()
+	return result
+
+def main():
+	""" Main http load test """
+	parser = argparse.ArgumentParser(description="Measure the http persistent connections")
+	parser.add_argument("--requests", type=int, default=1000, help="total number of requests")
+	parser.add_argument("--clients",  type=int, default=4,    help="number of clients at the same time")
+	parser.add_argument("--size",     type=int, default=2048, help="size of content sent")
+	args = parser.parse_args()
+	CONTENT[0] = b"x"*args.size
+
+	# The configuration is not saved, the server uses its default values
+	server.httpserver.HttpServer.config = server.server.ServerConfig()
+	server.httpserver.HttpServer.www_dir = b"www"
+
+	print("%-11s %12s %12s %12s"%("Mode", "requests/s", "connections", "received"))
+	for name, keep_alive in (("close", False), ("keep-alive", True)):
+		result = uasyncio.run(measure(args.requests, args.clients, keep_alive))
+		print("%-11s %12.1f %12d %12d"%(name, result["requests"]/result["duration"], result["connections"], result["received"]))
+
+if __name__ == "__main__":
+	main()
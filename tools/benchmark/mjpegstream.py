@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Measure the mjpeg streaming with the simulated camera on a local tcp connection.
+It compares the frames written with separate writes (header then image), with the frames
+written with the preallocated header and a single gathered write.
+The writer behaves like the micropython one : each awrite is followed by a drain.
+Example : python3 mjpegstream.py --frames 2000 """
+import sys
+import os
+import os.path
+import time
+import tempfile
+import argparse
+import tracemalloc
+MODULES = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/../../modules")
+sys.path.append(MODULES + "/lib")
+sys.path.append(MODULES + "/simul")
+# pylint:disable=wrong-import-position
+# pylint:disable=import-error
+# pylint:disable=consider-using-f-string
+import tools.logger
+# The logs of the run are written in the temporary directory, out of the source tree
+tools.logger.set_filename(os.path.join(tempfile.gettempdir(), "syslog.log"))
+import uasyncio
+import camera
+import server.stream
+import webpage.streamingpage
+
+IDENTIFIER = b"0123456789abcdef0123456789abcdef"
+
+class MicroWriter:
+	""" Asyncio writer which behaves like the micropython writer, and counts the writes and the drains """
+	def __init__(self, writer):
+		""" Constructor """
+		self.writer = writer
+		self.writes = 0
+		self.drains = 0
+
+	def write(self, data):
+		""" Write without drain """
+		self.writes += 1
+		self.writer.write(data)
+
+	async def drain(self):
+		""" Wait the end of writing """
+		self.drains += 1
+		await self.writer.drain()
+
+	async def awrite(self, data):
+		""" Write and drain """
+		self.write(data)
+		await self.drain()
+
+	async def aclose(self):
+		""" Close """
+		self.writer.close()
+
+def get_stream(reader, writer):
+	""" Create a stream with the micropython behavior """
+	stream = server.stream.Stream(reader, MicroWriter(writer))
+	stream.awrite     = stream.awrite_mcp
+	stream.awritev    = stream.awritev_mcp
+	stream.close      = stream.close_mcp
+	stream.is_closing = stream.is_closing_mcp
+	return stream
+
+async def send_separate(stream, images):
+	""" Previous streaming : the header is formatted for each frame then written before the image """
+	identifier = b"\r\n%x\r\n\r\n--%s\r\n\r\n"%(len(IDENTIFIER) + 6, IDENTIFIER)
+	frame = b'%s36\r\nContent-Type: image/jpeg\r\nContent-Length: %8d\r\n\r\n\r\n%x\r\n'
+	separator = b""
+	for image in images:
+		length = len(image)
+		await stream.write(frame%(separator, length, length))
+		await stream.write(image)
+		separator = identifier
+	await stream.write(identifier)
+
+async def send_coalesced(stream, images):
+	""" Current streaming : the header is preallocated and leaves with the image """
+	frame = webpage.streamingpage.MjpegFrame(IDENTIFIER)
+	for image in images:
+		await stream.writev((frame.get(len(image)), image))
+	await stream.write(frame.get_end())
+
+async def measure(method, count, memory):
+	""" Stream count frames with the method on a local connection """
+	result = {}
+	done = uasyncio.Event()
+
+	async def on_connection(reader, writer):
+		stream = get_stream(reader, writer)
+		# The frames are captured before, only the streaming is measured
+		captured = [camera.capture() for i in range(len(camera._frames))]
+		images = (captured[i % len(captured)] for i in range(count))
+		if memory:
+			tracemalloc.reset_peak()
+			allocated = tracemalloc.get_traced_memory()[0]
+		begin = time.perf_counter()
+		await method(stream, images)
+		result["duration"] = time.perf_counter() - begin
+		if memory:
+			result["allocated"] = tracemalloc.get_traced_memory()[1] - allocated
+		result["writes"] = stream.writer.writes
+		result["drains"] = stream.writer.drains
+		await stream.close()
+		done.set()
+
+	service = await uasyncio.start_server(on_connection, "127.0.0.1", 0)
+	port = service.sockets[0].getsockname()[1]
+	reader, writer = await uasyncio.open_connection("127.0.0.1", port)
+	received = 0
+	while True:
+		data = await reader.read(65536)
+		if not data:
+			break
+		received += len(data)
+	await done.wait()
+	writer.close()
+	service.close()
+	result["received"] = received
+	return result
+
+def main():
+	""" Main streaming measure """
+	parser = argparse.ArgumentParser(description="Measure the mjpeg streaming with the simulated camera")
+	parser.add_argument("--frames", type=int, default=1000, help="number of frames streamed")
+	args = parser.parse_args()
+
+	current_dir = os.getcwd()
+	os.chdir(MODULES)
+	try:
+		camera.init()
+		print("%-10s %10s %12s %12s %14s %12s"%("Method", "fps", "writes/frame", "drains/frame", "alloc/frame", "received"))
+		for name, method in (("separate", send_separate), ("coalesced", send_coalesced)):
+			timing = uasyncio.run(measure(method, args.frames, False))
+			tracemalloc.start()
+			allocation = uasyncio.run(measure(method, args.frames, True))
+			tracemalloc.stop()
+			print("%-10s %10.1f %12.2f %12.2f %14.1f %12d"%(name,
+				args.frames/timing["duration"],
+				timing["writes"]/args.frames,
+				timing["drains"]/args.frames,
+				allocation["allocated"]/args.frames,
+				timing["received"]))
+	finally:
+		os.chdir(current_dir)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Replay a recorded sequence of jpeg images through the motion detection with the simulated camera.
+It reports the frames per second, the differences of each frame and the memory allocated by the detection.
+Example : python3 motionreplay.py --sensitivity 60 ~/records/garden/*.jpg """
+import sys
+import os
+import os.path
+import glob
+import time
+import tempfile
+import argparse
+import tracemalloc
+MODULES = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/../../modules")
+sys.path.append(MODULES + "/lib")
+sys.path.append(MODULES + "/simul")
+# pylint:disable=wrong-import-position
+# pylint:disable=import-error
+# pylint:disable=consider-using-f-string
+import tools.logger
+# The logs of the run are written in the temporary directory, out of the source tree
+tools.logger.set_filename(os.path.join(tempfile.gettempdir(), "syslog.log"))
+import uasyncio
+import camera
+import video.video
+import motion.motioncore
+
+def get_frames(names):
+	""" Get the list of jpeg files from files or directories """
+	result = []
+	for name in names:
+		if os.path.isdir(name):
+			result += sorted(glob.glob(os.path.join(name, "*.jpg")) + glob.glob(os.path.join(name, "*.jpeg")))
+		else:
+			result += sorted(glob.glob(name))
+	return [os.path.abspath(filename) for filename in result]
+
+def get_config(args):
+	""" Create the motion configuration from command line """
+	config = motion.motioncore.MotionConfig()
+	config.activated             = True
+	config.sensitivity           = args.sensitivity
+	config.differences_detection = args.differences_detection
+	config.max_motion_images     = args.max_motion_images
+	config.threshold_motion      = args.threshold_motion
+	config.threshold_glitch      = args.threshold_glitch
+	config.stabilization_camera  = args.stabilization_camera
+	config.background_detection  = args.background_detection
+	config.mask                  = args.mask.encode("utf8")
+	return config
+
+async def replay(config, count, memory=False, verbose=False):
+	""" Feed the images in the motion detection, return the statistics of each frame """
+	core = motion.motioncore.MotionCore(config)
+	core.open()
+	frames = []
+	for frame in range(count):
+		begin = time.perf_counter()
+		result = await core.capture()
+		captured = time.perf_counter()
+
+		if memory:
+			tracemalloc.reset_peak()
+			allocated = tracemalloc.get_traced_memory()[0]
+		detected, change_polling = core.detect(display=False)
+		end = time.perf_counter()
+		if memory:
+			allocated = tracemalloc.get_traced_memory()[1] - allocated
+		else:
+			allocated = 0
+
+		# Release the image like the detection task
+		if result is not None:
+			core.deinit_image(result[1])
+
+		current = core.get_current()
+		frames.append((captured - begin, end - captured, current.get_diff_count(), detected, allocated))
+		if verbose:
+			print("%4d: capture %6.2f ms, detect %6.3f ms, diff %3d%s"%(frame, (captured - begin)*1000, (end - captured)*1000, current.get_diff_count(), " detected" if detected else ""))
+	core.cleanup()
+	return frames
+
+def show(title, values, unit, ratio=1):
+	""" Show the min, average and max of values """
+	if len(values) > 0:
+		print("  %-20s min %10.3f  avg %10.3f  max %10.3f %s"%(title, min(values)*ratio, (sum(values)/len(values))*ratio, max(values)*ratio, unit))
+
+def main():
+	""" Main replay """
+	parser = argparse.ArgumentParser(description="Replay jpeg images through the motion detection")
+	parser.add_argument("frames", nargs="*", default=[MODULES + "/Test1.jpg", MODULES + "/Test2.jpg"], help="jpeg files or directories")
+	parser.add_argument("--loops",                 type=int, default=1,  help="number of replay of the sequence")
+	parser.add_argument("--sensitivity",           type=int, default=80, help="sensitivity in percent")
+	parser.add_argument("--differences_detection", type=int, default=4,  help="minimum differences to detect movement")
+	parser.add_argument("--max_motion_images",     type=int, default=10, help="max images in motion historic")
+	parser.add_argument("--threshold_motion",      type=int, default=3,  help="threshold of minimum image to detect motion")
+	parser.add_argument("--threshold_glitch",      type=int, default=2,  help="glitch threshold of image ignored")
+	parser.add_argument("--stabilization_camera",  type=int, default=8,  help="number of images before camera stabilization")
+	parser.add_argument("--mask",                  default="", help="zone mask, one character per square, '/' to ignore the square")
+	parser.add_argument("--background_detection", action="store_true", help="compare each image only with the background")
+	parser.add_argument("--verbose", action="store_true", help="display the result of each frame")
+	args = parser.parse_args()
+
+	frames = get_frames(args.frames)
+	if len(frames) == 0:
+		print("No jpeg image found")
+		return
+	count = len(frames) * args.loops
+
+	# The images detected are saved in a temporary directory
+	current_dir = os.getcwd()
+	with tempfile.TemporaryDirectory(prefix="motionreplay") as directory:
+		os.chdir(directory)
+		os.mkdir("sd")
+		try:
+			video.video.Camera.open()
+
+			camera.replay(frames)
+			timings = uasyncio.run(replay(get_config(args), count, verbose=args.verbose))
+
+			camera.replay(frames)
+			tracemalloc.start()
+			allocations = uasyncio.run(replay(get_config(args), count, memory=True))
+			tracemalloc.stop()
+		finally:
+			os.chdir(current_dir)
+
+	duration = sum(frame[0] + frame[1] for frame in timings)
+	detect   = sum(frame[1] for frame in timings)
+	print("Replay of %d frames (%d images)"%(count, len(frames)))
+	print("  %-20s %10.1f fps"%("Capture and detect", count/duration if duration > 0 else 0))
+	print("  %-20s %10.1f fps"%("Detect only", count/detect if detect > 0 else 0))
+	show("Capture",      [frame[0] for frame in timings], "ms", 1000)
+	show("Detect",       [frame[1] for frame in timings], "ms", 1000)
+	show("Differences",  [frame[2] for frame in timings], "squares")
+	show("Allocated",    [frame[4] for frame in allocations], "bytes/frame")
+	print("  %-20s %10d"%("Detections", len([frame for frame in timings if frame[3]])))
+
+if __name__ == "__main__":
+	main()
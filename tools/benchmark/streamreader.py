@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# Distributed under Pycameresp License
+# Copyright (c) 2023 Remi BERTHOLET
+""" Measure the parsing of http requests with the line reader of server.stream.Stream.
+It compares the previous reader, which copied the rest of block for each line, with the reader with a cursor.
+The requests are received by blocks of tcp segment, a corpus of recorded requests can be given,
+the requests in the files are separated by an empty line (the recorded requests must not have content).
+Example : python3 streamreader.py --loops 500 requests.txt """
+import sys
+import os.path
+import time
+import tempfile
+import argparse
+import tracemalloc
+MODULES = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/../../modules")
+sys.path.append(MODULES + "/lib")
+sys.path.append(MODULES + "/simul")
+# pylint:disable=wrong-import-position
+# pylint:disable=import-error
+# pylint:disable=consider-using-f-string
+import tools.logger
+# The logs of the run are written in the temporary directory, out of the source tree
+tools.logger.set_filename(os.path.join(tempfile.gettempdir(), "syslog.log"))
+import uasyncio
+import server.stream
+
+# Requests sent by a browser when it loads the pages of the device
+CORPUS = [
+	b"GET / HTTP/1.1\r\nHost: 192.168.1.28\r\nConnection: keep-alive\r\nCache-Control: max-age=0\r\nUpgrade-Insecure-Requests: 1\r\n"
+	b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36\r\n"
+	b"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8\r\n"
+	b"Accept-Encoding: gzip, deflate\r\nAccept-Language: fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7\r\nCookie: session=1f3c5e7a9b\r\n\r\n",
+	b"GET /bootstrap.min.css HTTP/1.1\r\nHost: 192.168.1.28\r\nConnection: keep-alive\r\n"
+	b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36\r\n"
+	b"Accept: text/css,*/*;q=0.1\r\nReferer: http://192.168.1.28/\r\nAccept-Encoding: gzip, deflate\r\n"
+	b"Accept-Language: fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7\r\nCookie: session=1f3c5e7a9b\r\n"
+	b'If-None-Match: "6ad3c0f3-b3ca"\r\nIf-Modified-Since: Sat, 17 Oct 2026 16:39:47 GMT\r\n\r\n',
+	b"GET /historic/historic.json?since=343c09-12 HTTP/1.1\r\nHost: 192.168.1.28\r\nConnection: keep-alive\r\n"
+	b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36\r\n"
+	b'Accept: */*\r\nReferer: http://192.168.1.28/historic\r\nAccept-Encoding: gzip, deflate\r\nIf-None-Match: "343c09-12"\r\n'
+	b"Accept-Language: fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7\r\nCookie: session=1f3c5e7a9b\r\n\r\n",
+	b"GET /historic/images/sd/2023/10/17/16h30/2023-10-17_16-34-49.6.jpg HTTP/1.1\r\nHost: 192.168.1.28\r\nConnection: keep-alive\r\n"
+	b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36\r\n"
+	b"Accept: */*\r\nReferer: http://192.168.1.28/historic\r\nAccept-Encoding: gzip, deflate\r\n"
+	b"Accept-Language: fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7\r\nCookie: session=1f3c5e7a9b\r\n\r\n",
+]
+
+class BlockReader:
+	""" Reader which gives the data by block, like a tcp connection """
+	def __init__(self, data, block=1440):
+		""" Constructor """
+		self.data = data
+		self.position = 0
+		self.block = block
+
+	async def read(self, length):
+		""" Read the next block """
+		length = min(length, self.block)
+		result = self.data[self.position:self.position + length]
+		self.position += len(result)
+		return result
+
+class PreviousStream:
+	""" Previous line reader, the rest of block was copied after each line """
+	def __init__(self, reader):
+		""" Constructor """
+		self.reader = reader
+		self.buffer = b""
+
+	async def readline(self):
+		""" Read line """
+		pos = self.buffer.find(b"\r\n")
+		if pos == -1:
+			self.buffer += await self.reader.read(1440)
+			pos = self.buffer.find(b"\r\n")
+		if pos == -1:
+			result = self.buffer
+			self.buffer = b""
+		else:
+			result = self.buffer[:pos+2]
+			self.buffer = self.buffer[pos+2:]
+		return result
+
+def get_corpus(filenames):
+	""" Load the recorded requests, the requests are separated by an empty line """
+	result = []
+	for filename in filenames:
+		with open(filename, "rb") as file:
+			content = file.read().replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+		for request in content.split(b"\r\n\r\n"):
+			if request.strip() != b"":
+				result.append(request.strip() + b"\r\n\r\n")
+	return result
+
+async def parse(stream, count, memory):
+	""" Read all lines of requests, returns the number of lines and the bytes allocated """
+	lines = 0
+	allocated = 0
+	for _ in range(count):
+		if memory:
+			tracemalloc.reset_peak()
+			current = tracemalloc.get_traced_memory()[0]
+		line = await stream.readline()
+		if memory:
+			allocated += tracemalloc.get_traced_memory()[1] - current
+		if line == b"":
+			break
+		lines += 1
+	return lines, allocated
+
+def measure(create, data, count, memory):
+	""" Parse the data with the reader created """
+	stream = create(BlockReader(data))
+	begin = time.perf_counter()
+	lines, allocated = uasyncio.run(parse(stream, count, memory))
+	return lines, time.perf_counter() - begin, allocated
+
+def main():
+	""" Main reader measure """
+	parser = argparse.ArgumentParser(description="Measure the line reader of http requests")
+	parser.add_argument("corpus", nargs="*", help="files of recorded requests")
+	parser.add_argument("--loops", type=int, default=200, help="number of times the corpus is received on the same connection")
+	args = parser.parse_args()
+
+	corpus = get_corpus(args.corpus) if len(args.corpus) > 0 else CORPUS
+	# All requests on a persistent connection, the blocks contain several lines and several requests
+	data = b"".join(corpus) * args.loops
+	count = data.count(b"\r\n")
+
+	print("%d requests, %d lines, %d bytes"%(len(corpus) * args.loops, count, len(data)))
+	print("%-10s %12s %14s"%("Reader", "lines/s", "alloc/line"))
+	for name, create in (("previous", PreviousStream), ("cursor", lambda reader: server.stream.Stream(reader, None))):
+		lines, duration, _ = measure(create, data, count, False)
+		tracemalloc.start()
+		_, _, allocated = measure(create, data, count, True)
+		tracemalloc.stop()
+		print("%-10s %12.0f %14.1f"%(name, lines/duration, allocated/lines))
+
+if __name__ == "__main__":
+	main()